@@ -0,0 +1,14 @@
+import json
+
+from django.core.management.base import BaseCommand
+from jobs import queue
+
+
+class Command(BaseCommand):
+    help = 'Print background job queue depth and latency as JSON.'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--sample', type=int, default=1000, help='Recently finished jobs to measure latency over.')
+    
+    def handle(self, *args, **options):
+        self.stdout.write(json.dumps(queue.stats(sample=options['sample']), indent=2))
\ No newline at end of file
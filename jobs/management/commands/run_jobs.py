@@ -0,0 +1,64 @@
+import os
+import socket
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+from jobs import queue
+
+
+class Command(BaseCommand):
+    help = 'Run queued background jobs in worker threads until interrupted.'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=2, help='Worker threads.')
+        parser.add_argument('--batch-size', type=int, default=100, help='Jobs claimed by a worker at a time.')
+        parser.add_argument('--poll-interval', type=float, default=1.0, help='Seconds to wait when the queue is empty.')
+        parser.add_argument('--once', action='store_true', help='Exit once no jobs are due instead of polling.')
+    
+    def handle(self, *args, **options):
+        stop = threading.Event()
+        totals = {'succeeded': 0, 'failed': 0}
+        lock = threading.Lock()
+        prefix = f'{socket.gethostname()}:{os.getpid()}'
+        
+        def worker(position):
+            name = f'{prefix}:{position}'
+            try:
+                while not stop.is_set():
+                    jobs = queue.claim(name, options['batch_size'])
+                    if jobs:
+                        succeeded, failed = queue.run(jobs)
+                        with lock:
+                            totals['succeeded'] += succeeded
+                            totals['failed'] += failed
+                        continue
+                    if options['once']:
+                        break
+                    # Idle time goes to clearing out old finished jobs
+                    if position == 0:
+                        queue.prune()
+                    stop.wait(options['poll_interval'])
+            finally:
+                connections.close_all()
+        
+        started = time.perf_counter()
+        pool = [threading.Thread(target=worker, args=(position,), daemon=True) for position in range(max(options['threads'], 1))]
+        for thread in pool:
+            thread.start()
+        try:
+            while any(thread.is_alive() for thread in pool):
+                for thread in pool:
+                    thread.join(0.5)
+        except KeyboardInterrupt:
+            stop.set()
+            for thread in pool:
+                thread.join()
+        
+        elapsed = time.perf_counter() - started
+        done = totals['succeeded'] + totals['failed']
+        self.stdout.write(self.style.SUCCESS(
+            f"Ran {done} jobs in {elapsed:.1f}s ({done / elapsed if elapsed else 0:.0f}/s): "
+            f"{totals['succeeded']} succeeded, {totals['failed']} failed or were rescheduled."
+        ))
\ No newline at end of file
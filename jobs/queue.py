@@ -0,0 +1,184 @@
+"""
+Database-backed background jobs.
+
+Side effects that need not finish before a response, such as notifications
+and activity logs, are queued as Job rows with one INSERT; inside a
+transaction the jobs commit or roll back with the change that caused them.
+``run_jobs`` workers claim due jobs with a conditional UPDATE, run the jobs
+of one task together as a batch, and retry failures with exponential
+backoff. With ``JOBS_SYNC`` enabled, tasks run inline when they are
+enqueued, which is what tests and single-process setups want.
+"""
+import logging
+import statistics
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.db.models import Count, F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+
+def task(batch=False, max_attempts=None):
+    """
+    Mark a function as a job task.
+    
+    Batch tasks are called with a list of payloads, everything claimed for
+    them at once; other tasks are called once per job with the payload as
+    keyword arguments.
+    """
+    def decorate(func):
+        func.job_batch = batch
+        func.job_max_attempts = max_attempts
+        return func
+    return decorate
+
+
+def task_name(func):
+    return f'{func.__module__}.{func.__qualname__}'
+
+
+def _task(name):
+    func = import_string(name)
+    if not hasattr(func, 'job_batch'):
+        raise ImproperlyConfigured(f'{name} is not a job task.')
+    return func
+
+
+def _call(func, payloads):
+    if func.job_batch:
+        func(payloads)
+    else:
+        for payload in payloads:
+            func(**payload)
+
+
+def enqueue(func, **payload):
+    """Queue one call of ``func``."""
+    enqueue_many(func, [payload])
+
+
+def enqueue_many(func, payloads):
+    """Queue one job per payload, with a single INSERT."""
+    if not payloads:
+        return
+    if settings.JOBS_SYNC:
+        _call(func, payloads)
+        return
+    name = task_name(func)
+    max_attempts = func.job_max_attempts or settings.JOBS_MAX_ATTEMPTS
+    Job.objects.bulk_create([Job(task=name, payload=payload, max_attempts=max_attempts) for payload in payloads])
+
+
+def claim(worker, limit):
+    """Lock up to ``limit`` due jobs for ``worker`` and return them."""
+    now = timezone.now()
+    # Jobs whose worker died while running them become due again
+    Job.objects.filter(
+        status='running', locked_at__lt=now - timedelta(seconds=settings.JOBS_LOCK_TIMEOUT)
+    ).update(status='queued', locked_by='')
+    
+    due = Job.objects.filter(status='queued', run_after__lte=now).order_by('run_after', 'id')
+    job_ids = list(due.values_list('id', flat=True)[:limit])
+    if not job_ids:
+        return []
+    # Another worker may claim some of the same rows first; each row goes to exactly one
+    Job.objects.filter(id__in=job_ids, status='queued').update(
+        status='running', locked_by=worker, locked_at=now, started_at=now, attempts=F('attempts') + 1,
+    )
+    return list(Job.objects.filter(id__in=job_ids, status='running', locked_by=worker, locked_at=now))
+
+
+def run(jobs):
+    """Run claimed jobs, one batch per task. Returns ``(succeeded, failed)``."""
+    by_task = defaultdict(list)
+    for job in jobs:
+        by_task[job.task].append(job)
+    
+    succeeded = failed = 0
+    for name, group in by_task.items():
+        try:
+            func = _task(name)
+            with transaction.atomic():
+                _call(func, [job.payload for job in group])
+        except Exception as exc:
+            if len(group) > 1:
+                # Rerun one at a time so a single bad payload does not fail the rest
+                results = [run([job]) for job in group]
+                succeeded += sum(result[0] for result in results)
+                failed += sum(result[1] for result in results)
+            else:
+                _retry_or_fail(group[0], exc)
+                failed += 1
+            continue
+        Job.objects.filter(id__in=[job.id for job in group]).update(
+            status='done', finished_at=timezone.now(), locked_by='', last_error='',
+        )
+        succeeded += len(group)
+    return succeeded, failed
+
+
+def _retry_or_fail(job, exc):
+    error = f'{type(exc).__name__}: {exc}'
+    if job.attempts >= job.max_attempts:
+        logger.error('Job %s (%s) failed after %s attempts: %s', job.id, job.task, job.attempts, error)
+        Job.objects.filter(id=job.id).update(status='failed', finished_at=timezone.now(), locked_by='', last_error=error)
+        return
+    delay = settings.JOBS_RETRY_DELAY * 2 ** (job.attempts - 1)
+    Job.objects.filter(id=job.id).update(
+        status='queued', run_after=timezone.now() + timedelta(seconds=delay), locked_by='', last_error=error,
+    )
+
+
+def prune(older_than=None, batch_size=1000):
+    """Delete one batch of jobs that finished more than ``older_than`` ago. Returns the number deleted."""
+    older_than = older_than or timedelta(days=settings.JOBS_RETENTION_DAYS)
+    old = Job.objects.filter(status='done', finished_at__lt=timezone.now() - older_than)
+    job_ids = list(old.values_list('id', flat=True)[:batch_size])
+    return Job.objects.filter(id__in=job_ids).delete()[0] if job_ids else 0
+
+
+def _summary(values):
+    if not values:
+        return None
+    values = sorted(values)
+    return {
+        'p50': round(statistics.median(values), 1),
+        'p95': round(values[int(0.95 * (len(values) - 1))], 1),
+        'max': round(values[-1], 1),
+    }
+
+
+def stats(sample=1000):
+    """
+    Queue depth per status, the age of the oldest due job, and wait and run
+    times (in ms) of the ``sample`` most recently finished jobs.
+    """
+    now = timezone.now()
+    depth = dict.fromkeys((status for status, label in Job.STATUS_CHOICES), 0)
+    depth.update(Job.objects.values_list('status').annotate(count=Count('id')).order_by())
+    
+    oldest_due = (
+        Job.objects.filter(status='queued', run_after__lte=now)
+        .order_by('run_after', 'id').values_list('run_after', flat=True).first()
+    )
+    recent = list(
+        Job.objects.filter(status='done').order_by('-finished_at')
+        .values_list('task', 'created_at', 'started_at', 'finished_at')[:sample]
+    )
+    waits = [(started - created).total_seconds() * 1000 for name, created, started, finished in recent]
+    runs = [(finished - started).total_seconds() * 1000 for name, created, started, finished in recent]
+    return {
+        'depth': depth,
+        'oldest_due_seconds': round((now - oldest_due).total_seconds(), 1) if oldest_due else 0,
+        'recent_jobs': len(recent),
+        'recent_tasks': dict(sorted(Counter(name for name, *times in recent).items())),
+        'wait_ms': _summary(waits),
+        'run_ms': _summary(runs),
+    }
\ No newline at end of file
@@ -0,0 +1,8 @@
+from django.urls import path
+from . import views
+
+app_name = 'jobs'
+
+urlpatterns = [
+    path('stats/', views.queue_stats, name='queue_stats'),
+]
\ No newline at end of file
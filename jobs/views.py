@@ -0,0 +1,11 @@
+from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
+from . import queue
+
+
+@login_required
+def queue_stats(request):
+    """Queue depth and latency metrics (staff only)."""
+    if not request.user.is_staff:
+        return JsonResponse({'error': 'Staff only.'}, status=403)
+    return JsonResponse(queue.stats())
\ No newline at end of file
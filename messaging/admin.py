@@ -1,14 +1,16 @@
 from django.contrib import admin
-from .models import Conversation, Message, PlatformMessage, UserMessageRead
+from .models import AnnouncementWatermark, Conversation, ConversationReadCursor, Message, PlatformMessage, UserMessageRead
 
 
 @admin.register(Conversation)
 class ConversationAdmin(admin.ModelAdmin):
-    list_display = ['id', 'participants_display', 'created_at', 'updated_at']
+    list_display = ['id', 'participants_display', 'last_message_preview', 'last_message_at', 'updated_at']
     list_filter = ['created_at', 'updated_at']
     search_fields = ['participants__email', 'participants__username']
     ordering = ['-updated_at']
-    readonly_fields = ['created_at', 'updated_at']
+    readonly_fields = [
+        'created_at', 'updated_at', 'last_message', 'last_message_at', 'last_message_preview', 'low_user', 'high_user',
+    ]
     
     def participants_display(self, obj):
         return ', '.join([user.email for user in obj.participants.all()])
@@ -22,7 +24,7 @@ class MessageAdmin(admin.ModelAdmin):
     search_fields = ['sender__email', 'content', 'conversation__participants__email']
     ordering = ['-created_at']
     readonly_fields = ['created_at']
-
+    
     def content_preview(self, obj):
         return obj.content[:50] + '...' if len(obj.content) > 50 else obj.content
     content_preview.short_description = 'Content'
@@ -43,4 +45,20 @@ class UserMessageReadAdmin(admin.ModelAdmin):
     list_filter = ['read_at']
     search_fields = ['user__email', 'platform_message__title']
     ordering = ['-read_at']
-    readonly_fields = ['read_at'] 
\ No newline at end of file
+    readonly_fields = ['read_at']
+
+
+@admin.register(AnnouncementWatermark)
+class AnnouncementWatermarkAdmin(admin.ModelAdmin):
+    list_display = ['user', 'seen_up_to', 'updated_at']
+    search_fields = ['user__email']
+    ordering = ['-updated_at']
+    readonly_fields = ['updated_at']
+
+
+@admin.register(ConversationReadCursor)
+class ConversationReadCursorAdmin(admin.ModelAdmin):
+    list_display = ['user', 'conversation', 'last_read_message_id', 'unread_count', 'updated_at']
+    search_fields = ['user__email']
+    ordering = ['-updated_at']
+    readonly_fields = ['updated_at']
\ No newline at end of file
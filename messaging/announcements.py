@@ -0,0 +1,177 @@
+"""
+Platform announcements, fanned out on read.
+
+An announcement is stored once as a PlatformMessage, however many members
+there are. Each user's AnnouncementWatermark records the newest announcement
+they have seen: active announcements created after it are unread, unless the
+user opened one on its own, which leaves a UserMessageRead row. Users without
+a watermark start from the day they joined. NotificationFeed merges the
+announcements into a user's notifications at read time. The per-user
+Notification rows written before this are folded in by ``absorb_legacy``.
+"""
+import heapq
+from itertools import islice
+
+from django.utils import timezone
+from .models import AnnouncementWatermark, PlatformMessage, UserMessageRead
+from users.models import Notification
+from skillexchange import badges
+
+PREVIEW_LENGTH = 100
+
+
+def active():
+    return PlatformMessage.objects.filter(is_active=True)
+
+
+def visible(user):
+    """Announcements that belong in the user's feed: the active ones posted since they joined."""
+    return active().filter(created_at__gt=user.date_joined)
+
+
+def watermark(user):
+    """The time up to which the user has seen every announcement."""
+    seen_up_to = AnnouncementWatermark.objects.filter(user=user).values_list('seen_up_to', flat=True).first()
+    return max(seen_up_to, user.date_joined) if seen_up_to else user.date_joined
+
+
+def unread(user, seen_up_to=None):
+    """Active announcements the user has not seen."""
+    return active().filter(created_at__gt=seen_up_to or watermark(user)).exclude(read_by__user=user)
+
+
+def unread_count(user):
+    return unread(user).count()
+
+
+def mark_seen(user, up_to=None):
+    """Move the user's watermark forward to ``up_to``, by default the newest active announcement."""
+    if up_to is None:
+        up_to = active().order_by('-created_at').values_list('created_at', flat=True).first()
+        if up_to is None:
+            return
+    
+    # Conditional so that concurrent requests never move the watermark back
+    behind = AnnouncementWatermark.objects.filter(user=user, seen_up_to__lt=up_to)
+    moved = behind.update(seen_up_to=up_to, updated_at=timezone.now())
+    if not moved:
+        _, moved = AnnouncementWatermark.objects.get_or_create(user=user, defaults={'seen_up_to': up_to})
+        if not moved:
+            moved = behind.update(seen_up_to=up_to, updated_at=timezone.now())
+    if moved:
+        badges.bump(f'announcements:{user.id}')
+
+
+def mark_read(user, platform_message):
+    """Record that the user opened one announcement."""
+    if platform_message.created_at > watermark(user):
+        _, created = UserMessageRead.objects.get_or_create(user=user, platform_message=platform_message)
+        if created:
+            badges.bump(f'announcements:{user.id}')
+
+
+def as_notification(user, platform_message, is_read):
+    """An unsaved Notification presenting an announcement in the user's feed."""
+    content = platform_message.content
+    return Notification(
+        user=user,
+        notification_type='announcement',
+        title=platform_message.title,
+        message=content[:PREVIEW_LENGTH] + '...' if len(content) > PREVIEW_LENGTH else content,
+        is_read=is_read,
+        related_object_id=platform_message.id,
+        related_object_type='PlatformMessage',
+        created_at=platform_message.created_at,
+        last_event_at=platform_message.created_at,
+    )
+
+
+def _as_notifications(user, platform_messages):
+    seen_up_to = watermark(user)
+    unseen_ids = [message.id for message in platform_messages if message.created_at > seen_up_to]
+    read_ids = set(
+        UserMessageRead.objects.filter(user=user, platform_message_id__in=unseen_ids)
+        .values_list('platform_message_id', flat=True)
+    ) if unseen_ids else set()
+    return [
+        as_notification(user, message, message.created_at <= seen_up_to or message.id in read_ids)
+        for message in platform_messages
+    ]
+
+
+def _own(user, notifications):
+    """Attach the already loaded user, so rendering a notification does not fetch it again."""
+    notifications = list(notifications)
+    for notification in notifications:
+        notification.user = user
+    return notifications
+
+
+def _merge(notifications, announcements, limit):
+    merged = heapq.merge(notifications, announcements, key=lambda notification: notification.last_event_at, reverse=True)
+    return list(islice(merged, limit))
+
+
+class NotificationFeed:
+    """
+    A user's notifications and announcements, newest first.
+    
+    Supports ``count()`` and slicing, so Paginator can page it like a
+    queryset. A slice reads at most ``stop`` rows from each source and merges
+    them, which is what an OFFSET query over a UNION would cost.
+    """
+    
+    def __init__(self, user):
+        self.user = user
+        self.notifications = Notification.objects.filter(user=user).order_by('-last_event_at', '-id')
+        self.announcements = visible(user).order_by('-created_at', '-id')
+    
+    def count(self):
+        return self.notifications.count() + self.announcements.count()
+    
+    def __len__(self):
+        return self.count()
+    
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        start, stop = index.start or 0, index.stop
+        if stop is None:
+            stop = self.count()
+        announcements = _as_notifications(self.user, list(self.announcements[:stop]))
+        return _merge(_own(self.user, self.notifications[:stop]), announcements, stop)[start:]
+
+
+def unread_feed(user, limit):
+    """The newest ``limit`` unread notifications and announcements, merged."""
+    notifications = Notification.objects.filter(user=user, is_read=False).order_by('-last_event_at', '-id')[:limit]
+    announcements = [as_notification(user, message, False) for message in unread(user).order_by('-created_at')[:limit]]
+    return _merge(_own(user, notifications), announcements, limit)
+
+
+def absorb_legacy(batch_size=1000):
+    """
+    Replace the per-user announcement Notifications written by the old fan-out.
+    
+    Those rows would otherwise be listed and counted next to the announcement
+    itself. Read ones become UserMessageRead rows so the announcement stays
+    read; then every legacy row is deleted. Returns the number of rows removed.
+    """
+    legacy = Notification.objects.filter(notification_type='announcement', related_object_type='PlatformMessage')
+    removed = 0
+    while True:
+        rows = list(legacy.order_by('id').values('id', 'user_id', 'related_object_id', 'is_read')[:batch_size])
+        if not rows:
+            break
+        announcement_ids = set(
+            PlatformMessage.objects.filter(id__in={row['related_object_id'] for row in rows}).values_list('id', flat=True)
+        )
+        UserMessageRead.objects.bulk_create([
+            UserMessageRead(user_id=row['user_id'], platform_message_id=row['related_object_id'])
+            for row in rows
+            if row['is_read'] and row['related_object_id'] in announcement_ids
+        ], ignore_conflicts=True)
+        Notification.objects.filter(id__in=[row['id'] for row in rows]).delete()
+        badges.bump(*{f'announcements:{row["user_id"]}' for row in rows})
+        removed += len(rows)
+    return removed
\ No newline at end of file
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from messaging.announcements import absorb_legacy
+
+
+class Command(BaseCommand):
+    help = 'Replace the per-user announcement notifications of the old fan-out with read markers, so announcements are not listed twice.'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Notifications converted per batch.')
+    
+    def handle(self, *args, **options):
+        removed = absorb_legacy(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Removed {removed} legacy announcement notifications.'))
\ No newline at end of file
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from messaging.reads import backfill
+
+
+class Command(BaseCommand):
+    help = 'Create conversation read cursors from the legacy per-message is_read flags.'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Conversations processed per batch.')
+    
+    def handle(self, *args, **options):
+        created = backfill(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Created {created} read cursors.'))
\ No newline at end of file
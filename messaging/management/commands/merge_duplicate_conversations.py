@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from messaging.pairs import merge_duplicates
+
+
+class Command(BaseCommand):
+    help = 'Key one-to-one conversations by their pair of users and merge duplicate conversations of a pair.'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Conversations scanned per batch.')
+        parser.add_argument('--dry-run', action='store_true', help='Only count what would be keyed and merged.')
+    
+    def handle(self, *args, **options):
+        keyed, merged = merge_duplicates(batch_size=options['batch_size'], dry_run=options['dry_run'])
+        if options['dry_run']:
+            self.stdout.write(f'Would key {keyed} conversations and merge {merged} duplicates.')
+            return
+        self.stdout.write(self.style.SUCCESS(f'Keyed {keyed} conversations and merged {merged} duplicates.'))
\ No newline at end of file
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from messaging import summaries
+
+
+class Command(BaseCommand):
+    help = 'Recompute every conversation\'s last message preview and every participant\'s unread count from the messages.'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Conversations updated per batch.')
+    
+    def handle(self, *args, **options):
+        conversations = summaries.rebuild(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt the summaries of {conversations} conversations.'))
\ No newline at end of file
@@ -3,15 +3,28 @@ from django.contrib.auth import get_user_model
 
 User = get_user_model()
 
+PREVIEW_LENGTH = 100
+
 
 class Conversation(models.Model):
     """Conversations between users."""
     participants = models.ManyToManyField(User, related_name='conversations')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Summary of the newest message, kept by messaging.summaries so the inbox needs no per-row queries
+    last_message = models.ForeignKey('Message', on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    last_message_at = models.DateTimeField(null=True, blank=True)
+    last_message_preview = models.CharField(max_length=PREVIEW_LENGTH, blank=True)
+    # Canonical key of a one-to-one conversation, lower user id first; unset for group conversations
+    low_user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    high_user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
     
     class Meta:
         ordering = ['-updated_at']
+        constraints = [
+            models.UniqueConstraint(fields=['low_user', 'high_user'], name='messaging_conversation_pair_uniq'),
+            models.CheckConstraint(check=models.Q(low_user__lt=models.F('high_user')), name='messaging_conversation_pair_order'),
+        ]
     
     def __str__(self):
         participant_names = [user.get_full_name() or user.email for user in self.participants.all()]
@@ -19,7 +32,8 @@ class Conversation(models.Model):
     
     def get_other_participant(self, user):
         """Get the other participant in a two-person conversation."""
-        return self.participants.exclude(id=user.id).first()
+        # Iterating all() uses prefetched participants when the inbox loaded them
+        return next((participant for participant in self.participants.all() if participant.id != user.id), None)
 
 
 class Message(models.Model):
@@ -28,15 +42,42 @@ class Message(models.Model):
     sender = models.ForeignKey(User, on_delete=models.CASCADE, related_name='sent_messages')
     content = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
+    # Superseded by ConversationReadCursor; only read by the backfill_read_cursors command
     is_read = models.BooleanField(default=False)
     
     class Meta:
         ordering = ['created_at']
+        indexes = [
+            # Unread counts are range reads past a participant's read cursor
+            models.Index(fields=['conversation', 'id'], name='messaging_message_cursor_idx'),
+            models.Index(fields=['conversation', 'created_at'], name='messaging_message_thread_idx'),
+        ]
     
     def __str__(self):
         return f"{self.sender.email}: {self.content[:50]}..."
 
 
+class ConversationReadCursor(models.Model):
+    """How far one participant has read a conversation: every message up to ``last_read_message_id``."""
+    conversation = models.ForeignKey(Conversation, on_delete=models.CASCADE, related_name='read_cursors')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='conversation_read_cursors')
+    last_read_message_id = models.PositiveBigIntegerField(default=0)
+    # Messages from other participants past the cursor
+    unread_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['conversation', 'user'], name='messaging_read_cursor_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['user', 'unread_count'], name='messaging_read_cursor_user_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.user.email} read {self.conversation_id} up to {self.last_read_message_id}"
+
+
 class PlatformMessage(models.Model):
     """Platform-wide announcements and messages."""
     MESSAGE_TYPES = [
@@ -57,6 +98,9 @@ class PlatformMessage(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['is_active', '-created_at'], name='messaging_platform_active_idx'),
+        ]
     
     def __str__(self):
         return f"{self.title} - {self.message_type}"
@@ -72,4 +116,14 @@ class UserMessageRead(models.Model):
         unique_together = ['user', 'platform_message']
     
     def __str__(self):
-        return f"{self.user.email} read {self.platform_message.title}" 
\ No newline at end of file
+        return f"{self.user.email} read {self.platform_message.title}"
+
+
+class AnnouncementWatermark(models.Model):
+    """Newest platform message a user has seen; everything up to it counts as read."""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='announcement_watermark')
+    seen_up_to = models.DateTimeField()
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.user.email} seen up to {self.seen_up_to}"
\ No newline at end of file
@@ -0,0 +1,163 @@
+"""
+One-to-one conversations keyed by their pair of users.
+
+A conversation between two users stores both ids as (low_user, high_user),
+lower id first, under a unique constraint. Finding the conversation between
+two users is a point read on that index instead of joining the participants
+table to itself, and starting one is an INSERT that the constraint lets only
+one concurrent request win. ``merge_duplicates`` keys the conversations
+created before this and folds duplicates of a pair into the oldest one.
+"""
+from collections import defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Max, Min
+from . import reads, summaries
+from .models import Conversation, ConversationReadCursor, Message
+from users.models import COALESCING, Notification
+
+
+def key(user, other):
+    """The ``(low_user_id, high_user_id)`` of a pair of users."""
+    return tuple(sorted((user.id, other.id)))
+
+
+def between(user, other):
+    """The conversation between two users, or None."""
+    low_user_id, high_user_id = key(user, other)
+    return Conversation.objects.filter(low_user_id=low_user_id, high_user_id=high_user_id).first()
+
+
+def get_or_start(user, other):
+    """Return ``(conversation, created)`` for the conversation between two users, starting it if needed."""
+    conversation = between(user, other)
+    if conversation:
+        return conversation, False
+    low_user_id, high_user_id = key(user, other)
+    try:
+        with transaction.atomic():
+            conversation = Conversation.objects.create(low_user_id=low_user_id, high_user_id=high_user_id)
+            conversation.participants.add(user, other)
+            reads.start(conversation, [user, other])
+    except IntegrityError:
+        # Another request started it first
+        return between(user, other), False
+    return conversation, True
+
+
+def _pairs(batch_size):
+    """
+    Map each pair of users to the ids of their two-person conversations,
+    oldest first. Also returns the ids of the conversations already keyed.
+    """
+    Participant = Conversation.participants.through
+    pairs = defaultdict(list)
+    keyed = set()
+    last_id = 0
+    while True:
+        batch = list(Conversation.objects.filter(id__gt=last_id).order_by('id').values_list('id', 'low_user_id')[:batch_size])
+        if not batch:
+            break
+        last_id = batch[-1][0]
+        conversation_ids = [conversation_id for conversation_id, low_user_id in batch]
+        keyed.update(conversation_id for conversation_id, low_user_id in batch if low_user_id)
+        rows = (
+            Participant.objects.filter(conversation_id__in=conversation_ids)
+            .values('conversation_id').annotate(users=Count('user_id'), low=Min('user_id'), high=Max('user_id'))
+            .filter(users=2).order_by('conversation_id')
+        )
+        for row in rows:
+            pairs[(row['low'], row['high'])].append(row['conversation_id'])
+    return pairs, keyed
+
+
+def _merged_cursors(keeper, duplicates):
+    """
+    Collapse each participant's cursors into one on ``keeper``.
+    
+    A participant with unread messages anywhere keeps the earliest such
+    position, so nothing unread becomes read; otherwise the furthest one.
+    """
+    cursors = ConversationReadCursor.objects.filter(conversation_id__in=[keeper, *duplicates])
+    by_user = defaultdict(list)
+    for cursor in cursors:
+        by_user[cursor.user_id].append(cursor)
+    cursors.filter(conversation_id__in=duplicates).delete()
+    
+    merged = []
+    for user_id, positions in by_user.items():
+        unread = [cursor.last_read_message_id for cursor in positions if cursor.unread_count]
+        merged.append(ConversationReadCursor(
+            conversation_id=keeper, user_id=user_id,
+            last_read_message_id=min(unread) if unread else max(cursor.last_read_message_id for cursor in positions),
+        ))
+    ConversationReadCursor.objects.bulk_create(
+        merged, update_conflicts=True, unique_fields=['conversation', 'user'], update_fields=['last_read_message_id'],
+    )
+
+
+def _merged_notifications(keeper, duplicates):
+    """
+    Point the duplicates' notifications at ``keeper``.
+    
+    Each user's unread coalesced notifications about the pair fold into
+    their latest one, which keeps the total event count, as if every event
+    had been sent to ``keeper`` in the first place.
+    """
+    keys = [f'Conversation:{conversation_id}' for conversation_id in (keeper, *duplicates)]
+    by_user = defaultdict(list)
+    for unread in Notification.objects.filter(COALESCING, coalesce_key__in=keys).order_by('-last_event_at', '-id'):
+        by_user[unread.user_id].append(unread)
+    
+    folded = []
+    extras = []
+    for latest, *older in by_user.values():
+        if older:
+            latest.event_count += sum(notification.event_count for notification in older)
+            folded.append(latest)
+            extras.extend(notification.id for notification in older)
+    # Drop the extras first: at most one unread row per user may carry the kept key
+    Notification.objects.filter(id__in=extras).delete()
+    Notification.objects.bulk_update(folded, ['event_count'])
+    Notification.objects.filter(coalesce_key__in=keys).update(coalesce_key=keys[0])
+    Notification.objects.filter(related_object_type='Conversation', related_object_id__in=duplicates).update(
+        related_object_id=keeper
+    )
+
+
+@transaction.atomic
+def _merge(pair, conversation_ids, keyed):
+    """Fold the conversations of one pair into the keyed one, or else the oldest."""
+    keeper = keyed or conversation_ids[0]
+    duplicates = [conversation_id for conversation_id in conversation_ids if conversation_id != keeper]
+    if duplicates:
+        Message.objects.filter(conversation_id__in=duplicates).update(conversation_id=keeper)
+        _merged_notifications(keeper, duplicates)
+        _merged_cursors(keeper, duplicates)
+        Conversation.objects.filter(id__in=duplicates).delete()
+    if not keyed:
+        Conversation.objects.filter(id=keeper).update(low_user_id=pair[0], high_user_id=pair[1])
+    if duplicates:
+        summaries.refresh([keeper])
+
+
+def merge_duplicates(batch_size=1000, dry_run=False):
+    """
+    Key every two-person conversation by its pair and merge duplicate pairs.
+    
+    Messages, cursors and notifications of the duplicates move to the
+    conversation that is kept, whose summary and unread counts are then
+    recomputed. Returns ``(conversations_keyed, duplicates_merged)``.
+    """
+    pairs, keyed_ids = _pairs(batch_size)
+    keyed = merged = 0
+    for pair, conversation_ids in pairs.items():
+        keeper = next((conversation_id for conversation_id in conversation_ids if conversation_id in keyed_ids), None)
+        duplicates = len(conversation_ids) - 1
+        if keeper and not duplicates:
+            continue
+        keyed += not keeper
+        merged += duplicates
+        if not dry_run:
+            _merge(pair, conversation_ids, keeper)
+    return keyed, merged
\ No newline at end of file
@@ -0,0 +1,123 @@
+"""
+Per-participant read cursors for conversations.
+
+Each participant has one ConversationReadCursor per conversation holding the
+id of the newest message they have read. Reading a conversation moves that
+single row forward instead of flagging every message, and a conversation is
+unread while it has a message from someone else past the cursor. The cursor
+also carries how many such messages there are: ``messaging.summaries`` adds
+one for every message sent, and moving the cursor recounts them with a range
+read on the (conversation, id) index, so badges and the inbox read counts
+instead of counting messages. Moving a cursor locks it first, and a message
+is inserted and counted in one transaction, so a message committing
+meanwhile is either part of the recount or incremented after it.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count, Max, Min, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from .models import Conversation, ConversationReadCursor, Message
+from skillexchange import badges
+
+
+def unread_count(conversation, user, after):
+    """An expression counting messages in ``conversation`` from anyone but ``user`` with ids past ``after``."""
+    newer = Message.objects.filter(~Q(sender=user), conversation=conversation, id__gt=after).order_by()
+    return Coalesce(Subquery(newer.values('conversation').annotate(count=Count('id')).values('count')), 0)
+
+
+def start(conversation, users):
+    """Give each new participant a cursor, so messages sent to them are counted from the start."""
+    ConversationReadCursor.objects.bulk_create(
+        [ConversationReadCursor(conversation=conversation, user=user) for user in users], ignore_conflicts=True,
+    )
+
+
+def mark_read(conversation, user, up_to=None):
+    """
+    Move the user's cursor to ``up_to``, by default the conversation's newest message.
+    Returns whether the cursor moved.
+    """
+    if up_to is None:
+        up_to = conversation.messages.order_by('-id').values_list('id', flat=True).first()
+        if up_to is None:
+            return False
+    
+    cursors = ConversationReadCursor.objects.filter(conversation=conversation, user=user)
+    with transaction.atomic():
+        # The count below must see every message whose increment this lock made wait
+        position = cursors.select_for_update().values_list('last_read_message_id', flat=True).first()
+        if position is None:
+            ConversationReadCursor.objects.get_or_create(conversation=conversation, user=user)
+            position = cursors.select_for_update().values_list('last_read_message_id', flat=True).get()
+        # Concurrent requests never move the cursor back
+        if position >= up_to:
+            return False
+        cursors.update(
+            last_read_message_id=up_to,
+            unread_count=unread_count(conversation, user, up_to),
+            updated_at=timezone.now(),
+        )
+    badges.bump(f'messages:{user.id}')
+    return True
+
+
+def unread_conversations(user):
+    """The user's conversations with messages from someone else past their read cursor."""
+    return Conversation.objects.filter(read_cursors__user=user, read_cursors__unread_count__gt=0)
+
+
+def recount(cursors):
+    """Recompute ``unread_count`` for a queryset of cursors with one UPDATE. Returns the number of cursors."""
+    return cursors.update(unread_count=unread_count(
+        OuterRef('conversation_id'), OuterRef('user_id'), OuterRef('last_read_message_id'),
+    ))
+
+
+def backfill(batch_size=500):
+    """
+    Create missing read cursors from the legacy ``Message.is_read`` flags.
+    
+    A participant's cursor stops just before the oldest unread message from
+    someone else, or at the newest message if they had read everything, and
+    its unread count is taken from there. Existing cursors keep their
+    position. Returns the number of cursors created.
+    """
+    created = 0
+    last_id = 0
+    Participant = Conversation.participants.through
+    while True:
+        conversation_ids = list(
+            Conversation.objects.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:batch_size]
+        )
+        if not conversation_ids:
+            break
+        last_id = conversation_ids[-1]
+        
+        messages = Message.objects.filter(conversation_id__in=conversation_ids).order_by()
+        newest = dict(messages.values('conversation_id').annotate(newest=Max('id')).values_list('conversation_id', 'newest'))
+        first_unread = defaultdict(dict)
+        unread = messages.filter(is_read=False).values('conversation_id', 'sender_id').annotate(first=Min('id'))
+        for row in unread:
+            first_unread[row['conversation_id']][row['sender_id']] = row['first']
+        
+        existing = set(
+            ConversationReadCursor.objects.filter(conversation_id__in=newest).values_list('conversation_id', 'user_id')
+        )
+        cursors = []
+        participants = Participant.objects.filter(conversation_id__in=newest).values_list('conversation_id', 'user_id')
+        for conversation_id, user_id in participants:
+            if (conversation_id, user_id) in existing:
+                continue
+            unread = [first for sender_id, first in first_unread[conversation_id].items() if sender_id != user_id]
+            up_to = min(unread) - 1 if unread else newest[conversation_id]
+            cursors.append(ConversationReadCursor(
+                conversation_id=conversation_id, user_id=user_id, last_read_message_id=up_to,
+            ))
+        ConversationReadCursor.objects.bulk_create(cursors, ignore_conflicts=True)
+        # Counting is exact for any cursor, so the batch's existing ones may as well be repaired too
+        recount(ConversationReadCursor.objects.filter(conversation_id__in=newest))
+        created += len(cursors)
+    return created
\ No newline at end of file
@@ -0,0 +1,31 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from skillexchange import badges, push
+from . import summaries
+from .models import Conversation, Message, PlatformMessage
+
+
+@receiver(post_save, sender=Message)
+def message_created(sender, instance, created, **kwargs):
+    """A new message is unread for everyone in the conversation but its sender."""
+    if not created:
+        return
+    recipient_ids = list(
+        Conversation.participants.through.objects
+        .filter(conversation_id=instance.conversation_id)
+        .exclude(user_id=instance.sender_id)
+        .values_list('user_id', flat=True)
+    )
+    summaries.message_sent(instance, recipient_ids)
+    badges.bump(*(f'messages:{user_id}' for user_id in recipient_ids))
+    push.publish(recipient_ids, 'message', {
+        'conversation_id': instance.conversation_id,
+        'message_id': instance.id,
+        'sender_id': instance.sender_id,
+    })
+
+
+@receiver(post_save, sender=PlatformMessage)
+@receiver(post_delete, sender=PlatformMessage)
+def refresh_announcement_badges(sender, instance, **kwargs):
+    badges.bump('announcements')
\ No newline at end of file
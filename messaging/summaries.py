@@ -0,0 +1,85 @@
+"""
+Denormalized conversation summaries for the inbox.
+
+Each Conversation stores its newest message (id, time and a preview), and
+each participant's ConversationReadCursor stores how many messages from the
+others they have not read. Sending a message updates both with two UPDATEs
+from the Message post_save handler in ``messaging.signals``, so the inbox
+lists a user's conversations, with previews and unread counts, from one
+query plus a prefetch of the participants. The handler must run in the
+message's INSERT transaction (see ``messaging.reads``). ``refresh`` and
+``rebuild`` recompute all of it from the messages.
+"""
+from django.db.models import F, FilteredRelation, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce, Substr
+from django.utils import timezone
+from . import reads
+from .models import PREVIEW_LENGTH, Conversation, ConversationReadCursor, Message
+
+
+def message_sent(message, recipient_ids):
+    """Make ``message`` its conversation's newest and count it as unread for its recipients."""
+    # Conditional so that a slower request never replaces a newer message
+    Conversation.objects.filter(
+        Q(last_message__isnull=True) | Q(last_message_id__lt=message.id), id=message.conversation_id,
+    ).update(
+        last_message=message,
+        last_message_at=message.created_at,
+        last_message_preview=message.content[:PREVIEW_LENGTH],
+        updated_at=timezone.now(),
+    )
+    cursors = ConversationReadCursor.objects.filter(conversation_id=message.conversation_id, user_id__in=recipient_ids)
+    if cursors.update(unread_count=F('unread_count') + 1) < len(recipient_ids):
+        # Participants added without a cursor have read nothing yet
+        missing = set(recipient_ids) - set(cursors.values_list('user_id', flat=True))
+        ConversationReadCursor.objects.bulk_create([
+            ConversationReadCursor(conversation_id=message.conversation_id, user_id=user_id) for user_id in missing
+        ], ignore_conflicts=True)
+        reads.recount(cursors.filter(user_id__in=missing))
+
+
+def inbox(user):
+    """The user's conversations, most recently active first, with ``unread_count`` and participants loaded."""
+    return (
+        Conversation.objects.filter(participants=user)
+        .annotate(
+            own_cursor=FilteredRelation('read_cursors', condition=Q(read_cursors__user=user)),
+            unread_count=Coalesce(F('own_cursor__unread_count'), 0),
+        )
+        .prefetch_related('participants')
+        .order_by('-updated_at', '-id')
+    )
+
+
+def refresh(conversation_ids):
+    """Recompute the summaries and unread counts of some conversations with two UPDATEs."""
+    newest = Message.objects.filter(conversation=OuterRef('pk')).order_by('-id')
+    Conversation.objects.filter(id__in=conversation_ids).update(
+        last_message=Subquery(newest.values('id')[:1]),
+        last_message_at=Subquery(newest.values('created_at')[:1]),
+        last_message_preview=Coalesce(
+            Subquery(newest.annotate(preview=Substr('content', 1, PREVIEW_LENGTH)).values('preview')[:1]), Value(''),
+        ),
+    )
+    reads.recount(ConversationReadCursor.objects.filter(conversation_id__in=conversation_ids))
+
+
+def rebuild(batch_size=1000):
+    """
+    Recompute every conversation's summary and every cursor's unread count.
+    
+    Conversations are processed in primary-key batches with one UPDATE each
+    for summaries and counts. Returns the number of conversations.
+    """
+    rebuilt = 0
+    last_id = 0
+    while True:
+        conversation_ids = list(
+            Conversation.objects.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:batch_size]
+        )
+        if not conversation_ids:
+            break
+        last_id = conversation_ids[-1]
+        refresh(conversation_ids)
+        rebuilt += len(conversation_ids)
+    return rebuilt
\ No newline at end of file
@@ -1,19 +1,23 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from django.db import transaction
 from django.db.models import Q
 from django.core.paginator import Paginator
 from django.http import JsonResponse
 from django.utils import timezone
-from .models import Conversation, Message, PlatformMessage, UserMessageRead
+from .models import Conversation, PlatformMessage
+from . import announcements, pairs, reads, summaries
 from .forms import MessageForm, PlatformMessageForm
-from users.models import Notification
+from users.notifications import notification, notify_many
+from skillexchange.pagination import paginate
+from skillexchange import badges
 
 
 @login_required
 def conversation_list(request):
     """List user's conversations."""
-    conversations = Conversation.objects.filter(participants=request.user).order_by('-updated_at')
+    conversations = summaries.inbox(request.user)
     
     # Pagination
     paginator = Paginator(conversations, 20)
@@ -32,7 +36,7 @@ def conversation_detail(request, conversation_id):
     conversation = get_object_or_404(Conversation, id=conversation_id, participants=request.user)
     
     # Mark messages as read
-    conversation.messages.filter(is_read=False).exclude(sender=request.user).update(is_read=True)
+    reads.mark_read(conversation, request.user)
     
     # Handle new message submission
     if request.method == 'POST':
@@ -41,22 +45,20 @@ def conversation_detail(request, conversation_id):
             message = form.save(commit=False)
             message.conversation = conversation
             message.sender = request.user
-            message.save()
-            
-            # Update conversation timestamp
-            conversation.save()
+            # The post_save handler counts the message as unread; both commit together
+            with transaction.atomic():
+                message.save()
             
             # Create notification for other participants
-            other_participants = conversation.participants.exclude(id=request.user.id)
-            for participant in other_participants:
-                Notification.objects.create(
-                    user=participant,
-                    notification_type='message',
-                    title='New Message',
-                    message=f'{request.user.get_full_name()} sent you a message.',
-                    related_object_id=conversation.id,
-                    related_object_type='Conversation'
+            other_participants = conversation.participants.exclude(id=request.user.id).values_list('id', flat=True)
+            notify_many([
+                notification(
+                    participant_id, 'message', 'New Message',
+                    f'{request.user.get_full_name()} sent you a message.',
+                    related=conversation, coalesce=True,
                 )
+                for participant_id in other_participants
+            ])
             
             return redirect('messaging:conversation_detail', conversation_id=conversation.id)
     else:
@@ -64,9 +66,7 @@ def conversation_detail(request, conversation_id):
     
     # Get messages with pagination
     message_list = conversation.messages.all()
-    paginator = Paginator(message_list, 50)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    page_obj = paginate(request, message_list, 50, ordering=('created_at', 'id'))
     
     context = {
         'conversation': conversation,
@@ -88,15 +88,8 @@ def start_conversation(request, user_id):
         messages.error(request, 'You cannot start a conversation with yourself.')
         return redirect('users:user_list')
     
-    # Check if conversation already exists
-    existing_conversation = Conversation.objects.filter(participants=request.user).filter(participants=other_user).first()
-    
-    if existing_conversation:
-        return redirect('messaging:conversation_detail', conversation_id=existing_conversation.id)
-    
-    # Create new conversation
-    conversation = Conversation.objects.create()
-    conversation.participants.add(request.user, other_user)
+    # Reuse the pair's conversation; concurrent clicks cannot start a second one
+    conversation, created = pairs.get_or_start(request.user, other_user)
     
     return redirect('messaging:conversation_detail', conversation_id=conversation.id)
 
@@ -104,12 +97,10 @@ def start_conversation(request, user_id):
 @login_required
 def platform_messages(request):
     """View platform messages/announcements."""
-    platform_messages = PlatformMessage.objects.filter(is_active=True).order_by('-created_at')
+    platform_messages = announcements.active().order_by('-created_at')
     
-    # Mark messages as read
-    unread_messages = platform_messages.exclude(read_by__user=request.user)
-    for message in unread_messages:
-        UserMessageRead.objects.get_or_create(user=request.user, platform_message=message)
+    # Everything listed here counts as seen
+    announcements.mark_seen(request.user)
     
     # Pagination
     paginator = Paginator(platform_messages, 10)
@@ -128,7 +119,7 @@ def platform_message_detail(request, message_id):
     platform_message = get_object_or_404(PlatformMessage, id=message_id, is_active=True)
     
     # Mark as read
-    UserMessageRead.objects.get_or_create(user=request.user, platform_message=platform_message)
+    announcements.mark_read(request.user, platform_message)
     
     context = {
         'platform_message': platform_message,
@@ -141,7 +132,7 @@ def mark_conversation_read(request, conversation_id):
     """Mark all messages in a conversation as read."""
     conversation = get_object_or_404(Conversation, id=conversation_id, participants=request.user)
     
-    conversation.messages.filter(is_read=False).exclude(sender=request.user).update(is_read=True)
+    reads.mark_read(conversation, request.user)
     
     if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
         return JsonResponse({'status': 'success'})
@@ -150,22 +141,16 @@ def mark_conversation_read(request, conversation_id):
 
 
 @login_required
+@badges.cached_count('messages:{user_id}', 'announcements:{user_id}', 'announcements')
 def get_unread_count(request):
     """Get unread message count for AJAX requests."""
-    # Count unread messages in conversations
-    unread_conversations = Conversation.objects.filter(
-        participants=request.user,
-        messages__is_read=False
-    ).exclude(messages__sender=request.user).distinct().count()
+    # Count conversations with messages from someone else past the user's read cursor
+    unread_conversations = reads.unread_conversations(request.user).count()
     
     # Count unread platform messages
-    unread_platform = PlatformMessage.objects.filter(
-        is_active=True
-    ).exclude(read_by__user=request.user).count()
-    
-    total_unread = unread_conversations + unread_platform
+    unread_platform = announcements.unread_count(request.user)
     
-    return JsonResponse({'count': total_unread})
+    return unread_conversations + unread_platform
 
 
 # Admin views for platform messages
@@ -181,23 +166,9 @@ def create_platform_message(request):
         if form.is_valid():
             platform_message = form.save(commit=False)
             platform_message.created_by = request.user
+            # One row however many members there are; feeds merge it in when read
             platform_message.save()
             
-            # Create notifications for all users
-            from django.contrib.auth import get_user_model
-            User = get_user_model()
-            users = User.objects.filter(is_active=True)
-            
-            for user in users:
-                Notification.objects.create(
-                    user=user,
-                    notification_type='announcement',
-                    title=platform_message.title,
-                    message=platform_message.content[:100] + '...' if len(platform_message.content) > 100 else platform_message.content,
-                    related_object_id=platform_message.id,
-                    related_object_type='PlatformMessage'
-                )
-            
             messages.success(request, 'Platform message created successfully!')
             return redirect('messaging:platform_messages')
     else:
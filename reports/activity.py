@@ -0,0 +1,26 @@
+"""
+Queued activity logging.
+
+``log`` captures what it needs from the request and queues the UserActivity
+row as a background job, so logging never delays the response.
+"""
+from jobs import queue
+from .models import UserActivity
+
+
+def log(request, activity_type, description, related=None):
+    queue.enqueue(
+        create_activities,
+        user_id=request.user.id,
+        activity_type=activity_type,
+        description=description,
+        ip_address=request.META.get('REMOTE_ADDR'),
+        user_agent=request.META.get('HTTP_USER_AGENT', ''),
+        related_object_id=related.id if related is not None else None,
+        related_object_type=type(related).__name__ if related is not None else '',
+    )
+
+
+@queue.task(batch=True)
+def create_activities(payloads):
+    UserActivity.objects.bulk_create([UserActivity(**payload) for payload in payloads])
\ No newline at end of file
@@ -0,0 +1,119 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+from reports.profiling import CONTEXT_WALKER, clients_for, explain, is_select, run_case, view_cases
+from reports.seed import seed_dataset
+
+# Lookup tables that stay small, where a scan is cheaper than an index
+ALLOWED_SCAN_TABLES = {
+    'skills_category',
+    'reports_analytics',
+    'messaging_platformmessage',
+    'django_content_type',
+}
+
+
+class Command(BaseCommand):
+    help = 'Seed a test database, explain the queries of every view and fail when a hot query scans a table.'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=200, help='Number of members to seed.')
+        parser.add_argument('--allow-scan', action='append', default=[], metavar='TABLE',
+                            help='Additional table allowed to be scanned (repeatable).')
+        parser.add_argument('--strict', action='store_true', help='Also fail on scans in staff and form views.')
+        parser.add_argument('--json', metavar='PATH', help='Write the full audit to a JSON file.')
+        parser.add_argument('--plans', action='store_true', help='Print the plan of every query.')
+    
+    def handle(self, *args, **options):
+        allowed = ALLOWED_SCAN_TABLES | set(options['allow_scan'])
+        
+        old_name = connection.settings_dict['NAME']
+        setup_test_environment()
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            # Dummy cache so cached pages and facet counts don't hide their queries
+            with override_settings(
+                TEMPLATES=[*settings.TEMPLATES, CONTEXT_WALKER],
+                CACHES={'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}},
+            ):
+                data = seed_dataset(users=options['users'])
+                results = self.audit(data, allowed, options['plans'])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+        
+        if options['json']:
+            with open(options['json'], 'w') as handle:
+                json.dump({'vendor': connection.vendor, 'seed': data.counts, 'views': results}, handle, indent=2)
+        
+        failures = [
+            result for result in results
+            if result['scans'] and (result['hot'] or options['strict'])
+        ]
+        # A view that raised never ran its queries, so it cannot count as passing
+        errors = [result for result in results if result['error']]
+        for result in errors:
+            self.stdout.write(self.style.ERROR(f"{result['name']} [{result['role']}]: {result['error']}"))
+        
+        problems = []
+        if failures:
+            problems.append(
+                f'{len(failures)} views fall back to a table scan: '
+                + ', '.join(result['name'] for result in failures)
+            )
+        if errors:
+            problems.append(
+                f'{len(errors)} views raised before their queries could be audited: '
+                + ', '.join(result['name'] for result in errors)
+            )
+        if problems:
+            raise CommandError('; '.join(problems))
+        self.stdout.write(self.style.SUCCESS(
+            f'Audited {sum(result["queries"] for result in results)} queries across {len(results)} views; '
+            f'no table scans on hot paths.'
+        ))
+    
+    def audit(self, data, allowed, show_plans):
+        clients = clients_for(data)
+        results = []
+        for case in view_cases(data):
+            run = run_case(clients[case.role], case, connection)
+            
+            seen = set()
+            scans = []
+            for query in run.queries:
+                sql = query['sql']
+                if sql in seen or not is_select(sql):
+                    continue
+                seen.add(sql)
+                lines, tables = explain(connection, sql)
+                blocked = sorted(set(tables) - allowed)
+                if blocked:
+                    scans.append({'tables': blocked, 'sql': sql, 'plan': lines})
+                if show_plans:
+                    self.stdout.write(f'  {sql}\n    ' + '\n    '.join(lines))
+            
+            results.append({
+                'name': case.name,
+                'url': case.url,
+                'role': case.role,
+                'hot': case.hot,
+                'status': run.response.status_code if run.response is not None else None,
+                'queries': len(run.queries),
+                'error': run.error,
+                'scans': scans,
+            })
+            
+            label = f"{case.name} [{case.role}]"
+            if scans:
+                style = self.style.ERROR if case.hot else self.style.WARNING
+                tables = ', '.join(sorted({table for scan in scans for table in scan['tables']}))
+                self.stdout.write(style(f'{label}: table scan on {tables}'))
+                for scan in scans:
+                    self.stdout.write(f"    {scan['sql'][:200]}")
+            else:
+                self.stdout.write(f'{label}: {len(run.queries)} queries, no scans')
+        return results
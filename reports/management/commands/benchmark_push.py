@@ -0,0 +1,153 @@
+import asyncio
+import json
+import resource
+import time
+import tracemalloc
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.urls import reverse
+from skillexchange import push
+from skillexchange.asgi import application
+
+# Streams being opened at once, like clients arriving over a few seconds rather than in one burst
+OPEN_CONCURRENCY = 50
+OPEN_TIMEOUT = 30
+
+
+class Command(BaseCommand):
+    help = (
+        'Open many idle push streams against the ASGI application in this process, on a throwaway '
+        'database, and report the memory each one holds and how fast an event reaches all of them.'
+    )
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--connections', type=int, default=1000, help='Streams to hold open.')
+        parser.add_argument('--users', type=int, default=100, help='Members the streams are spread across.')
+        parser.add_argument('--idle', type=float, default=1.0, help='Seconds to hold the streams before publishing.')
+        parser.add_argument('--trace-memory', action='store_true',
+                            help='Also trace Python allocations per stream; much slower to open streams.')
+        parser.add_argument('--output', metavar='PATH', help='Write the JSON report here instead of stdout.')
+    
+    def handle(self, *args, **options):
+        old_name = connection.settings_dict['NAME']
+        setup_test_environment()
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            cookies = self.session_cookies(max(options['users'], 1))
+            report = asyncio.run(self.hold(cookies, max(options['connections'], 1), options['idle'], options['trace_memory']))
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+        
+        output = json.dumps(report, indent=2, sort_keys=True) + '\n'
+        if options['output']:
+            Path(options['output']).write_text(output)
+        else:
+            self.stdout.write(output, ending='')
+        if report['connected'] < report['connections']:
+            raise CommandError(f"Only {report['connected']} of {report['connections']} streams connected.")
+    
+    def session_cookies(self, count):
+        """``(user_id, Cookie header)`` for ``count`` signed-in members."""
+        User = get_user_model()
+        cookies = []
+        for position in range(count):
+            user = User.objects.create_user(f'push{position}', f'push{position}@example.com')
+            client = Client()
+            client.force_login(user)
+            session = client.cookies[settings.SESSION_COOKIE_NAME].value
+            cookies.append((user.id, f'{settings.SESSION_COOKIE_NAME}={session}'))
+        return cookies
+    
+    async def hold(self, cookies, count, idle, trace_memory):
+        path = reverse('users:notification_stream')
+        disconnect = asyncio.Event()
+        opening = asyncio.Semaphore(OPEN_CONCURRENCY)
+        all_open = asyncio.Event()
+        opened = 0
+        received = []
+        
+        async def open_stream(cookie):
+            requested = False
+            
+            async def receive():
+                nonlocal requested
+                if not requested:
+                    requested = True
+                    return {'type': 'http.request', 'body': b'', 'more_body': False}
+                await disconnect.wait()
+                return {'type': 'http.disconnect'}
+            
+            async def send(message):
+                nonlocal opened
+                if message['type'] != 'http.response.body':
+                    return
+                if message['body'].startswith(b'retry:'):
+                    opened += 1
+                    opening.release()
+                    if opened == count:
+                        all_open.set()
+                elif b'event: notification' in message['body']:
+                    received.append(time.perf_counter())
+            
+            scope = {
+                'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+                'method': 'GET', 'scheme': 'http', 'path': path, 'raw_path': path.encode(),
+                'query_string': b'', 'root_path': '',
+                'headers': [(b'host', b'testserver'), (b'accept', b'text/event-stream'), (b'cookie', cookie.encode())],
+                'client': ('127.0.0.1', 50000), 'server': ('testserver', 80),
+            }
+            await application(scope, receive, send)
+        
+        rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        if trace_memory:
+            tracemalloc.start()
+        started = time.perf_counter()
+        tasks = []
+        try:
+            for position in range(count):
+                await asyncio.wait_for(opening.acquire(), OPEN_TIMEOUT)
+                tasks.append(asyncio.create_task(open_stream(cookies[position % len(cookies)][1])))
+            await asyncio.wait_for(all_open.wait(), OPEN_TIMEOUT)
+        except asyncio.TimeoutError:
+            pass
+        open_seconds = time.perf_counter() - started
+        await asyncio.sleep(idle)
+        traced = tracemalloc.get_traced_memory()[0] if trace_memory else None
+        tracemalloc.stop()
+        rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        held_streams = push.broker().connections()
+        
+        # One event per member reaches every stream they have open
+        published = time.perf_counter()
+        for user_id, cookie in cookies:
+            push.broker().publish(user_id, 'notification', {'title': 'Benchmark'})
+        deadline = published + 30
+        while len(received) < held_streams and time.perf_counter() < deadline:
+            await asyncio.sleep(0.01)
+        fan_out = (max(received) - published) if received else None
+        
+        disconnect.set()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        
+        return {
+            'connections': count,
+            'connected': opened,
+            'held_after_idle': held_streams,
+            'users': len(cookies),
+            'open_seconds': round(open_seconds, 2),
+            'connections_per_second': round(opened / open_seconds) if open_seconds else None,
+            'traced_kib_per_connection': round(traced / 1024 / max(opened, 1), 2) if traced is not None else None,
+            'rss_growth_mib': round((rss_after - rss_before) / 1024, 1),
+            'rss_kib_per_connection': round((rss_after - rss_before) / max(opened, 1), 2),
+            'events_delivered': len(received),
+            'fan_out_ms': round(fan_out * 1000, 1) if fan_out is not None else None,
+        }
\ No newline at end of file
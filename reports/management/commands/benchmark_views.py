@@ -0,0 +1,154 @@
+import json
+import statistics
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+from reports.profiling import CONTEXT_WALKER, clients_for, repeated_queries, run_case, view_cases
+from reports.seed import seed_dataset
+
+DEFAULT_BUDGETS = Path(__file__).resolve().parents[2] / 'benchmarks' / 'view_budgets.json'
+
+# Headroom applied by --update-budgets, since timing and memory vary between machines
+TIME_HEADROOM = 3.0
+MEMORY_HEADROOM = 1.5
+
+
+def roles_for(case):
+    """Every role a view is benchmarked as: its own, plus member and staff for public pages."""
+    if case.role == 'staff':
+        return ['staff']
+    if case.role == 'anonymous':
+        return ['anonymous', 'user', 'staff']
+    return ['user', 'staff']
+
+
+class Command(BaseCommand):
+    help = 'Benchmark query count, wall time and peak memory of every view against checked-in budgets.'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=200, help='Number of members to seed.')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed requests per view; the median is reported.')
+        parser.add_argument('--budgets', default=str(DEFAULT_BUDGETS), help='Budget file to compare against.')
+        parser.add_argument('--output', metavar='PATH', help='Write the JSON report here instead of stdout.')
+        parser.add_argument('--update-budgets', action='store_true',
+                            help='Rewrite the budget file from this run instead of comparing.')
+        parser.add_argument('--queries-only', action='store_true',
+                            help='Only enforce query budgets, e.g. on machines slower than the reference one.')
+    
+    def handle(self, *args, **options):
+        budgets_path = Path(options['budgets'])
+        budgets = json.loads(budgets_path.read_text()) if budgets_path.exists() else {}
+        
+        old_name = connection.settings_dict['NAME']
+        setup_test_environment()
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            # Dummy cache so every request does the work of a cold page
+            with override_settings(
+                TEMPLATES=[*settings.TEMPLATES, CONTEXT_WALKER],
+                CACHES={'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}},
+            ):
+                data = seed_dataset(users=options['users'])
+                views = self.benchmark(data, max(options['repeat'], 1))
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+        
+        if options['update_budgets']:
+            budgets_path.parent.mkdir(parents=True, exist_ok=True)
+            budgets_path.write_text(json.dumps(self.new_budgets(views), indent=2, sort_keys=True) + '\n')
+            self.stderr.write(self.style.SUCCESS(f'Wrote budgets for {len(views)} views to {budgets_path}.'))
+            return
+        
+        failures = self.compare(views, budgets, options['queries_only'])
+        report = {
+            'vendor': connection.vendor,
+            'seed': data.counts,
+            'repeat': options['repeat'],
+            'views': views,
+            'summary': {
+                'views': len(views),
+                'queries': sum(view['queries'] for view in views),
+                'errors': sum(1 for view in views if view['error']),
+                'over_budget': len(failures),
+                'unbudgeted': sum(1 for view in views if view['budget'] is None),
+            },
+        }
+        output = json.dumps(report, indent=2, sort_keys=True) + '\n'
+        if options['output']:
+            Path(options['output']).write_text(output)
+        else:
+            self.stdout.write(output, ending='')
+        
+        for view in views:
+            if view['error']:
+                self.stderr.write(self.style.ERROR(f"{view['key']}: {view['error']}"))
+            elif view['over_budget']:
+                self.stderr.write(self.style.ERROR(f"{view['key']}: over budget on {', '.join(view['over_budget'])}"))
+        if failures:
+            raise CommandError(f'{len(failures)} views failed or exceeded their budget.')
+    
+    def benchmark(self, data, repeat):
+        clients = clients_for(data)
+        views = []
+        seen = set()
+        for case in view_cases(data):
+            for role in roles_for(case):
+                key = f'{case.name} [{role}]'
+                if key in seen:
+                    continue
+                seen.add(key)
+                client = clients[role]
+                # Warm-up request: fills per-process state such as the typeahead index
+                run_case(client, case, connection)
+                
+                runs = [run_case(client, case, connection) for _ in range(repeat)]
+                memory_run = run_case(client, case, connection, trace_memory=True)
+                first = runs[0]
+                
+                views.append({
+                    'key': key,
+                    'name': case.name,
+                    'role': role,
+                    'url': case.url,
+                    'status': first.response.status_code if first.response is not None else None,
+                    'error': first.error,
+                    'queries': max(len(run.queries) for run in runs),
+                    'repeated_queries': repeated_queries(first.queries),
+                    'ms': round(statistics.median(run.seconds for run in runs) * 1000, 2),
+                    'peak_kib': round(memory_run.peak_bytes / 1024, 1),
+                    'walked_templates': first.walked_templates,
+                })
+        return views
+    
+    def compare(self, views, budgets, queries_only):
+        """Annotate each view with its budget and overruns. Returns the failing views."""
+        failures = []
+        for view in views:
+            budget = budgets.get(view['key'])
+            view['budget'] = budget
+            view['over_budget'] = []
+            if budget is not None:
+                if view['queries'] > budget['queries']:
+                    view['over_budget'].append('queries')
+                if not queries_only and view['ms'] > budget['ms']:
+                    view['over_budget'].append('ms')
+                if not queries_only and view['peak_kib'] > budget['peak_kib']:
+                    view['over_budget'].append('peak_kib')
+            if view['error'] or view['over_budget']:
+                failures.append(view)
+        return failures
+    
+    def new_budgets(self, views):
+        return {
+            view['key']: {
+                'queries': view['queries'],
+                'ms': round(max(view['ms'] * TIME_HEADROOM, 20.0), 1),
+                'peak_kib': round(max(view['peak_kib'] * MEMORY_HEADROOM, 256.0), 1),
+            }
+            for view in views
+            if not view['error']
+        }
@@ -0,0 +1,252 @@
+"""
+Helpers for driving every view against a seeded database.
+
+Used by the ``audit_query_plans`` and ``benchmark_views`` commands. Views are
+requested with the test client as an anonymous visitor, a member and a staff
+user. Templates that do not exist are rendered by ContextWalkingTemplates,
+which evaluates the context the way a template would, so lazy querysets
+still run their queries.
+"""
+import json
+import re
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Model
+from django.forms import BaseForm
+from django.template.backends.base import BaseEngine
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+WALK_ITEM_LIMIT = 50
+
+# "SCAN table" without "USING ... INDEX" is a full table scan in SQLite plans
+SQLITE_TABLE_SCAN_RE = re.compile(r'^SCAN (\w+)$')
+# Literals stripped when grouping queries by shape
+SQL_LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+\b")
+# Django aliases tables in subqueries and joins as '"table" U0'
+TABLE_ALIAS_RE = re.compile(r'"(\w+)" (?:AS )?([A-Z]\d+)\b')
+
+CONTEXT_WALKER = {
+    'BACKEND': 'reports.profiling.ContextWalkingTemplates',
+    'NAME': 'context-walker',
+    'DIRS': [],
+    'APP_DIRS': False,
+    'OPTIONS': {},
+}
+
+
+def walk(value, depth=0):
+    """Touch a context value the way a template listing it would."""
+    if depth > 2 or value is None or isinstance(value, (str, bytes, int, float, bool)):
+        return
+    if isinstance(value, Model):
+        str(value)
+    elif isinstance(value, BaseForm):
+        str(value)
+    elif isinstance(value, dict):
+        for item in value.values():
+            walk(item, depth + 1)
+    elif hasattr(value, '__iter__'):
+        for position, item in enumerate(value):
+            if position >= WALK_ITEM_LIMIT:
+                break
+            walk(item, depth + 1)
+
+
+_walked_templates = []
+
+
+class WalkingTemplate:
+    def __init__(self, template_name):
+        self.template_name = template_name
+    
+    def render(self, context=None, request=None):
+        _walked_templates.append(self.template_name)
+        for value in (context or {}).values():
+            walk(value)
+        return f'<!-- {self.template_name} -->'
+
+
+class ContextWalkingTemplates(BaseEngine):
+    """Fallback template engine that walks the context instead of rendering markup."""
+    app_dirname = 'templates'
+    
+    def __init__(self, params):
+        params = params.copy()
+        params.pop('OPTIONS')
+        super().__init__(params)
+    
+    def from_string(self, template_code):
+        return WalkingTemplate('<string>')
+    
+    def get_template(self, template_name):
+        return WalkingTemplate(template_name)
+
+
+@dataclass
+class ViewCase:
+    name: str
+    url: str
+    role: str = 'user'  # 'anonymous', 'user' or 'staff'
+    hot: bool = True
+
+
+def view_cases(data):
+    """Requests covering every GET view, built from a SeededData."""
+    calendar_start = timezone.now() - timedelta(days=60)
+    
+    def case(name, args=(), query='', **kwargs):
+        url = reverse(name, args=args)
+        return ViewCase(f"{name.split(':')[-1]}{query}", f'{url}{query}', **kwargs)
+    
+    return [
+        case('home', role='anonymous'),
+        case('skills:skill_list', role='anonymous'),
+        case('skills:skill_list', query='?query=python', role='anonymous'),
+        case('skills:skill_list', query='?sort=rating&min_rating=3', role='anonymous'),
+        case('skills:skill_list', query='?tag=python', role='anonymous'),
+        case('skills:skill_suggest', query='?q=py', role='anonymous'),
+        case('skills:category_detail', args=[data.category_id], role='anonymous'),
+        case('skills:skill_detail', args=[data.skill_id], role='anonymous'),
+        case('skills:skill_reviews', args=[data.skill_id], role='anonymous'),
+        case('login', role='anonymous', hot=False),
+        case('register', role='anonymous', hot=False),
+        case('dashboard'),
+        case('profile'),
+        case('skills:skill_list'),
+        case('skills:skill_detail', args=[data.skill_id]),
+        case('skills:skill_create', hot=False),
+        case('skills:skill_edit', args=[data.own_skill_id], hot=False),
+        case('skills:my_skills'),
+        case('swaps:swap_list'),
+        case('swaps:swap_list', query='?status=pending'),
+        case('swaps:sent_requests'),
+        case('swaps:received_requests'),
+        case('swaps:swap_detail', args=[data.swap_id]),
+        case('swaps:swap_request_create', args=[data.skill_id], hot=False),
+        case('swaps:match_list'),
+        # The calendar is read from 60 days back, where the seeded completed sessions are
+        ViewCase('my_calendar', reverse('swaps:my_calendar') + f'?start={calendar_start:%Y-%m-%dT%H:%M:%S}'),
+        # Member directory with substring filters; a scan is expected
+        case('users:user_list', hot=False),
+        case('users:user_detail', args=[data.other_user.id]),
+        case('users:notifications'),
+        case('users:notification_archive'),
+        ViewCase('notification_unread_count', reverse('users:get_unread_count')),
+        case('messaging:conversation_list'),
+        case('messaging:conversation_detail', args=[data.conversation_id]),
+        ViewCase('message_unread_count', reverse('messaging:get_unread_count')),
+        case('messaging:platform_messages'),
+        case('messaging:platform_message_detail', args=[data.platform_message_id]),
+        case('reports:report_create', hot=False),
+        case('reports:my_reports'),
+        case('reports:report_detail', args=[data.report_id], hot=False),
+        case('reports:admin_reports', role='staff', hot=False),
+        case('reports:admin_report_detail', args=[data.report_id], role='staff', hot=False),
+        case('reports:analytics_dashboard', role='staff', hot=False),
+        case('reports:analytics_summary', role='staff', hot=False),
+        case('reports:user_activity_log', role='staff', hot=False),
+        case('messaging:create_platform_message', role='staff', hot=False),
+    ]
+
+
+def clients_for(data):
+    """Test clients logged in for each role."""
+    clients = {'anonymous': Client(), 'user': Client(), 'staff': Client()}
+    clients['user'].force_login(data.user)
+    clients['staff'].force_login(data.staff)
+    return clients
+
+
+@dataclass
+class ViewRun:
+    response: object = None
+    queries: list = field(default_factory=list)
+    error: str = None
+    seconds: float = 0.0
+    peak_bytes: int = None
+    walked_templates: list = field(default_factory=list)
+
+
+def run_case(client, case, connection, trace_memory=False):
+    """Request a view once, capturing its queries, wall time and optionally peak memory."""
+    # The log is a bounded deque; once full, CaptureQueriesContext sees nothing new
+    connection.queries_log.clear()
+    _walked_templates.clear()
+    run = ViewRun()
+    
+    if trace_memory:
+        tracemalloc.start()
+    with CaptureQueriesContext(connection) as captured:
+        started = time.perf_counter()
+        try:
+            run.response = client.get(case.url)
+        except Exception as exc:
+            run.error = f'{type(exc).__name__}: {exc}'
+        run.seconds = time.perf_counter() - started
+    if trace_memory:
+        run.peak_bytes = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    
+    run.queries = captured.captured_queries
+    run.walked_templates = list(_walked_templates)
+    return run
+
+
+def repeated_queries(queries):
+    """Number of queries whose shape (SQL without literals) ran more than once, a sign of N+1 access."""
+    shapes = {}
+    for query in queries:
+        shape = SQL_LITERAL_RE.sub('?', query['sql'])
+        shapes[shape] = shapes.get(shape, 0) + 1
+    return sum(count for count in shapes.values() if count > 1)
+
+
+
+def is_select(sql):
+    return sql.lstrip().upper().startswith(('SELECT', 'WITH'))
+
+
+def _postgres_nodes(node):
+    yield node
+    for child in node.get('Plans', []):
+        yield from _postgres_nodes(child)
+
+
+def explain(connection, sql):
+    """
+    Return ``(plan_lines, scanned_tables)`` for a captured query.
+    
+    PostgreSQL plans are produced with sequential scans disabled, so a
+    ``Seq Scan`` in the result means no index can serve the query at all,
+    rather than the planner preferring a scan because the seed is small.
+    """
+    if connection.vendor == 'postgresql':
+        with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}')
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        nodes = list(_postgres_nodes(plan[0]['Plan']))
+        lines = [f"{node['Node Type']} {node.get('Relation Name', '')} {node.get('Index Name', '')}".strip() for node in nodes]
+        scans = [node['Relation Name'] for node in nodes if node['Node Type'] == 'Seq Scan']
+        return lines, scans
+    
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            lines = [row[-1] for row in cursor.fetchall()]
+        aliases = {alias: table for table, alias in TABLE_ALIAS_RE.findall(sql)}
+        tables = set(connection.introspection.table_names())
+        scanned = (aliases.get(match.group(1), match.group(1)) for match in map(SQLITE_TABLE_SCAN_RE.match, lines) if match)
+        # Derived tables ("SCAN subquery") are read from memory, not from disk
+        return lines, [name for name in scanned if name in tables]
+    
+    raise NotImplementedError(f'Query plans are not supported on {connection.vendor}.')
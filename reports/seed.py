@@ -0,0 +1,212 @@
+"""
+Synthetic dataset used by the query-plan audit and the view benchmarks.
+
+Rows are bulk inserted, then the derived tables (search index, tag index,
+rating aggregates, swap inbox and calendar) are rebuilt the same way the management commands do it,
+and the database statistics are refreshed so the planner sees realistic
+table sizes.
+"""
+import random
+from dataclasses import dataclass, field
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.db import connection
+from django.utils import timezone
+from messaging import pairs, reads, summaries
+from messaging.models import Conversation, Message, PlatformMessage
+from reports.models import Report, UserActivity
+from skills import ratings, search, tags
+from skills.models import Category, SkillListing, SkillReview
+from swaps import inbox, scheduling
+from swaps.models import SwapRequest, SwapTransaction
+from users import reputation
+from users.models import Notification, User, UserProfile
+
+PASSWORD = 'benchmark-password'
+
+FIRST_NAMES = ['Ada', 'Alan', 'Grace', 'Linus', 'Margaret', 'Dennis', 'Barbara', 'Ken', 'Frances', 'Edsger']
+LAST_NAMES = ['Lovelace', 'Turing', 'Hopper', 'Torvalds', 'Hamilton', 'Ritchie', 'Liskov', 'Thompson', 'Allen', 'Dijkstra']
+CATEGORIES = ['Programming', 'Music', 'Languages', 'Cooking', 'Design', 'Fitness', 'Photography', 'Writing', 'Finance', 'Gardening']
+TAGS = [
+    'python', 'django', 'sql', 'javascript', 'rust', 'excel', 'linux', 'security',
+    'guitar', 'piano', 'drums', 'singing', 'violin', 'ukulele', 'djing', 'composing',
+    'spanish', 'french', 'german', 'japanese', 'mandarin', 'arabic', 'italian', 'hindi',
+    'baking', 'grilling', 'sushi', 'vegan', 'pastry', 'fermenting', 'coffee', 'cocktails',
+    'figma', 'illustration', 'typography', 'branding', 'animation', 'pottery', 'knitting', 'sewing',
+    'yoga', 'running', 'climbing', 'swimming', 'boxing', 'chess', 'portrait', 'poetry',
+]
+SKILL_WORDS = ['Intro to', 'Advanced', 'Practical', 'Hands-on', 'Weekend', 'Crash course in', 'Mastering']
+
+
+@dataclass
+class SeededData:
+    """Ids of representative rows, used to build URLs for the seeded views."""
+    user: User = None
+    staff: User = None
+    other_user: User = None
+    category_id: int = None
+    skill_id: int = None
+    own_skill_id: int = None
+    swap_id: int = None
+    pending_swap_id: int = None
+    conversation_id: int = None
+    platform_message_id: int = None
+    report_id: int = None
+    counts: dict = field(default_factory=dict)
+
+
+def seed_dataset(users=200, listings_per_user=5, swaps_per_user=4, notifications_per_user=20,
+                 messages_per_conversation=15, seed=1):
+    """Populate an empty database. Returns a SeededData describing it."""
+    rng = random.Random(seed)
+    password = make_password(PASSWORD)
+    
+    staff = User.objects.create(
+        email='staff@example.com', username='staff', password=password,
+        first_name='Staff', last_name='Member', is_staff=True, is_superuser=True,
+    )
+    User.objects.bulk_create([
+        User(
+            email=f'user{index}@example.com', username=f'user{index}', password=password,
+            first_name=rng.choice(FIRST_NAMES), last_name=rng.choice(LAST_NAMES),
+            location=rng.choice(['Berlin', 'Lagos', 'Lima', 'Pune', 'Oslo']),
+        )
+        for index in range(users)
+    ], batch_size=500)
+    members = list(User.objects.filter(is_staff=False).order_by('id'))
+    UserProfile.objects.bulk_create([UserProfile(user=user) for user in members + [staff]], batch_size=500)
+    
+    categories = Category.objects.bulk_create([Category(name=name) for name in CATEGORIES])
+    categories = list(Category.objects.order_by('id'))
+    
+    SkillListing.objects.bulk_create([
+        SkillListing(
+            user=user,
+            category=rng.choice(categories),
+            title=f'{rng.choice(SKILL_WORDS)} {rng.choice(TAGS).title()}',
+            description=f'Sessions covering {" and ".join(rng.sample(TAGS, 2))}.',
+            skill_type=rng.choice(['offer', 'offer', 'request']),
+            difficulty_level=rng.choice(['beginner', 'intermediate', 'advanced', 'expert']),
+            tags=rng.sample(TAGS, rng.randint(1, 3)),
+            is_active=rng.random() > 0.1,
+        )
+        for user in members
+        for _ in range(listings_per_user)
+    ], batch_size=500)
+    listings = list(SkillListing.objects.order_by('id'))
+    offers = [listing for listing in listings if listing.skill_type == 'offer']
+    
+    reviews = {}
+    for listing in rng.sample(listings, len(listings) // 2):
+        for reviewer in rng.sample(members, 3):
+            if reviewer.id != listing.user_id:
+                reviews[(listing.id, reviewer.id)] = SkillReview(
+                    skill_listing=listing, reviewer=reviewer, rating=rng.randint(1, 5), comment='Great session.',
+                )
+    SkillReview.objects.bulk_create(reviews.values(), batch_size=500)
+    
+    swaps = []
+    for user in members:
+        for _ in range(swaps_per_user):
+            wanted = rng.choice(offers)
+            if wanted.user_id == user.id:
+                continue
+            swaps.append(SwapRequest(
+                requesting_user=user,
+                requested_user_id=wanted.user_id,
+                requesting_skill=wanted,
+                requested_skill=rng.choice(offers),
+                message='Would you like to swap?',
+                proposed_duration=rng.randint(1, 4),
+                status=rng.choice(['pending', 'pending', 'accepted', 'rejected', 'completed', 'cancelled']),
+            ))
+    SwapRequest.objects.bulk_create(swaps, batch_size=500)
+    
+    now = timezone.now()
+    transactions = []
+    for swap in swaps:
+        if swap.status == 'completed':
+            start = now - timedelta(days=rng.randint(1, 60), hours=rng.randint(0, 23))
+            transactions.append(SwapTransaction(
+                swap_request=swap, start_date=start, end_date=start + timedelta(hours=swap.proposed_duration),
+                actual_duration=swap.proposed_duration,
+            ))
+    SwapTransaction.objects.bulk_create(transactions, batch_size=500)
+    
+    Notification.objects.bulk_create([
+        Notification(
+            user=user, notification_type='system', title='Welcome',
+            message='Thanks for joining.', is_read=rng.random() > 0.3,
+        )
+        for user in members
+        for _ in range(notifications_per_user)
+    ], batch_size=1000)
+    
+    conversations = []
+    for first, second in zip(members[::2], members[1::2]):
+        conversation = Conversation.objects.create()
+        conversation.participants.add(first, second)
+        conversations.append((conversation, first, second))
+    Message.objects.bulk_create([
+        Message(
+            conversation=conversation, sender=rng.choice([first, second]),
+            content='Hello there!', is_read=rng.random() > 0.2,
+        )
+        for conversation, first, second in conversations
+        for _ in range(messages_per_conversation)
+    ], batch_size=1000)
+    
+    platform_message = PlatformMessage.objects.create(title='Welcome', content='Hello everyone.', created_by=staff)
+    
+    Report.objects.bulk_create([
+        Report(reporter=user, report_type='platform', title='Issue', description='Something broke.')
+        for user in members[::5]
+    ])
+    UserActivity.objects.bulk_create([
+        UserActivity(user=user, activity_type='login', description='Logged in')
+        for user in members
+        for _ in range(5)
+    ], batch_size=1000)
+    
+    # Derived tables, rebuilt the same way their management commands do
+    search.rebuild_index()
+    tags.backfill()
+    ratings.rebuild_aggregates()
+    inbox.rebuild()
+    scheduling.rebuild()
+    reputation.reconcile()
+    reads.backfill()
+    pairs.merge_duplicates()
+    summaries.rebuild()
+    
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+    
+    user = members[0]
+    other_user = members[1]
+    own_skill = SkillListing.objects.filter(user=user).first()
+    swap = SwapRequest.objects.filter(requesting_user=user).first() or SwapRequest.objects.filter(requested_user=user).first()
+    pending = SwapRequest.objects.filter(requested_user=user, status='pending').first()
+    return SeededData(
+        user=user,
+        staff=staff,
+        other_user=other_user,
+        category_id=categories[0].id,
+        skill_id=offers[-1].id,
+        own_skill_id=own_skill.id if own_skill else None,
+        swap_id=swap.id if swap else None,
+        pending_swap_id=pending.id if pending else None,
+        conversation_id=conversations[0][0].id,
+        platform_message_id=platform_message.id,
+        report_id=Report.objects.filter(reporter=user).values_list('id', flat=True).first(),
+        counts={
+            'users': len(members) + 1,
+            'skill_listings': len(listings),
+            'skill_reviews': len(reviews),
+            'swap_requests': len(swaps),
+            'swap_transactions': len(transactions),
+            'notifications': len(members) * notifications_per_user,
+            'messages': len(conversations) * messages_per_conversation,
+        },
+    )
@@ -7,11 +7,13 @@ from django.utils import timezone
 from django.db.models import Count, Q
 from datetime import datetime, timedelta
 from .models import Report, Analytics, UserActivity
+from . import activity
 from .forms import ReportForm, ReportAdminForm
 from users.models import User
 from skills.models import SkillListing
 from swaps.models import SwapRequest
 from messaging.models import Message
+from skillexchange.pagination import paginate
 
 
 @login_required
@@ -25,15 +27,7 @@ def report_create(request):
             report.save()
             
             # Log activity
-            UserActivity.objects.create(
-                user=request.user,
-                activity_type='report_filed',
-                description=f'Filed report: {report.title}',
-                ip_address=request.META.get('REMOTE_ADDR'),
-                user_agent=request.META.get('HTTP_USER_AGENT', ''),
-                related_object_id=report.id,
-                related_object_type='Report'
-            )
+            activity.log(request, 'report_filed', f'Filed report: {report.title}', related=report)
             
             messages.success(request, 'Report submitted successfully! We will review it shortly.')
             return redirect('reports:my_reports')
@@ -95,9 +89,7 @@ def admin_reports(request):
         reports = reports.filter(report_type=type_filter)
     
     # Pagination
-    paginator = Paginator(reports, 20)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    page_obj = paginate(request, reports, 20)
     
     context = {
         'page_obj': page_obj,
@@ -193,9 +185,7 @@ def user_activity_log(request):
         activities = activities.filter(activity_type=activity_filter)
     
     # Pagination
-    paginator = Paginator(activities, 50)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    page_obj = paginate(request, activities, 50)
     
     context = {
         'page_obj': page_obj,
@@ -0,0 +1,63 @@
+"""
+Cached unread badge counts for the polling endpoints.
+
+A badge count is cached per user under a key that includes the version of
+every scope it depends on (``'notifications:<user id>'``, the global
+``'announcements'``...). Whatever creates or reads notifications, messages or
+announcements bumps the affected scopes with an atomic cache increment once
+its transaction commits, so a count computed before the change can never be
+served after it. The response's ETag is the count itself: a poll whose badge
+has not changed is answered 304 Not Modified from the cache alone.
+"""
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import JsonResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from . import versions
+
+
+def _version_key(scope):
+    return f'unread:version:{scope}'
+
+
+def bump(*scopes):
+    """Invalidate the badge counts that depend on ``scopes`` once the current transaction commits."""
+    keys = [_version_key(scope) for scope in scopes]
+    transaction.on_commit(lambda: versions.bump(*keys))
+
+
+def _versions(scopes):
+    return versions.current(*(_version_key(scope) for scope in scopes))
+
+
+def cached_count(*scopes):
+    """
+    Serve a view's unread count as ``{"count": n}`` from the cache.
+    
+    ``scopes`` may contain ``{user_id}``. The view only runs, and returns
+    the count, when no count is cached for the current scope versions.
+    """
+    def decorator(count_func):
+        name = f'{count_func.__module__}.{count_func.__name__}'
+        
+        @wraps(count_func)
+        def wrapper(request, *args, **kwargs):
+            user_scopes = [scope.format(user_id=request.user.id) for scope in scopes]
+            current = '.'.join(str(version) for version in _versions(user_scopes))
+            key = f'unread:count:{name}:{request.user.id}:{current}'
+            count = cache.get(key)
+            if count is None:
+                count = count_func(request, *args, **kwargs)
+                cache.set(key, count, settings.UNREAD_COUNT_TIMEOUT)
+            
+            etag = f'"{count}"'
+            response = get_conditional_response(request, etag=etag) or JsonResponse({'count': count})
+            response['ETag'] = etag
+            # Let the browser keep the body but revalidate it on every poll
+            patch_cache_control(response, private=True, no_cache=True)
+            return response
+        return wrapper
+    return decorator
\ No newline at end of file
@@ -0,0 +1,105 @@
+"""
+Response cache for pages that look the same to every anonymous visitor.
+
+Each cached page belongs to one or more scopes (``'catalog'``,
+``'skill:<id>'``...). Every scope has a version number in the cache, and the
+version is part of each page key. Signal handlers bump the version of exactly
+the scopes a change affects, so stale pages are never served and nothing
+depends on a TTL. When an entry is missing, one worker takes a short lock and
+rebuilds it while the others wait for the result instead of all hitting the
+database at once.
+"""
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.db import transaction
+from . import versions
+
+
+def _version_key(scope):
+    return f'pagecache:version:{scope}'
+
+
+def bump(*scopes):
+    """Invalidate every cached page in the given scopes once the current transaction commits."""
+    keys = [_version_key(scope) for scope in scopes]
+    transaction.on_commit(lambda: versions.bump(*keys))
+
+
+def _versions(scopes):
+    return versions.current(*(_version_key(scope) for scope in scopes))
+
+
+def normalize_query(query_dict):
+    """Sorted, blank-free form of a query string, so equivalent URLs share an entry."""
+    pairs = sorted(
+        (key, value) for key, values in query_dict.lists() for value in values if value != ''
+    )
+    return '&'.join(f'{key}={value}' for key, value in pairs)
+
+
+def page_key(request, scopes):
+    current = '.'.join(str(version) for version in _versions(scopes))
+    digest = hashlib.md5(f'{request.path}?{normalize_query(request.GET)}'.encode()).hexdigest()
+    return f'pagecache:page:{current}:{digest}'
+
+
+def _is_cacheable_request(request):
+    if request.method not in ('GET', 'HEAD') or request.user.is_authenticated:
+        return False
+    # Pending flash messages would be rendered into the page and shown to everyone
+    return not len(get_messages(request))
+
+
+def _is_cacheable_response(request, response):
+    return (
+        response.status_code == 200
+        and not response.streaming
+        and not response.cookies
+        # A rendered CSRF token is specific to this visitor
+        and not request.META.get('CSRF_COOKIE_NEEDS_UPDATE')
+    )
+
+
+def cache_anonymous_page(*scopes):
+    """
+    Cache a view's response for anonymous GET requests.
+    
+    ``scopes`` are scope names or callables taking the view's keyword
+    arguments, e.g. ``lambda kwargs: f"skill:{kwargs['skill_id']}"``.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if not _is_cacheable_request(request):
+                return view_func(request, *args, **kwargs)
+            
+            key = page_key(request, [scope(kwargs) if callable(scope) else scope for scope in scopes])
+            response = cache.get(key)
+            if response is not None:
+                return response
+            
+            lock_key = f'{key}:lock'
+            if not cache.add(lock_key, 1, settings.PAGE_CACHE_LOCK_TIMEOUT):
+                # Another worker is rendering this page; wait for its result
+                deadline = time.monotonic() + settings.PAGE_CACHE_LOCK_WAIT
+                while time.monotonic() < deadline:
+                    time.sleep(0.05)
+                    response = cache.get(key)
+                    if response is not None:
+                        return response
+                return view_func(request, *args, **kwargs)
+            
+            try:
+                response = view_func(request, *args, **kwargs)
+                if _is_cacheable_response(request, response):
+                    cache.set(key, response, settings.PAGE_CACHE_TIMEOUT)
+            finally:
+                cache.delete(lock_key)
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,211 @@
+"""
+Keyset (cursor) pagination shared by the list views.
+
+Offset pagination needs a COUNT(*) and an OFFSET scan that gets slower the
+deeper a client pages. CursorPaginator instead seeks to the last row seen
+using the (created_at, id) ordering, so every page costs one indexed range
+read. Cursors are opaque tokens; counts are optional and can be estimated.
+"""
+import base64
+import binascii
+import json
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+def encode_cursor(direction, values):
+    # isoformat keeps microseconds, which DjangoJSONEncoder would truncate
+    values = [value.isoformat() if hasattr(value, 'isoformat') else value for value in values]
+    payload = json.dumps([direction, *values], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        direction, *values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError, binascii.Error):
+        raise InvalidCursor(token)
+    if direction not in ('next', 'prev'):
+        raise InvalidCursor(token)
+    return direction, values
+
+
+def estimate_count(queryset, cap=None):
+    """
+    Return ``(count, exact)`` for a queryset without a full COUNT(*).
+    
+    PostgreSQL reads the planner's row estimate. Other databases count at most
+    ``cap`` rows, so the result reads as "cap or more" when it is not exact.
+    """
+    cap = cap or settings.PAGINATION_COUNT_CAP
+    connection = connections[queryset.db]
+    
+    if connection.vendor == 'postgresql':
+        sql, params = queryset.order_by().query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]['Plan']['Plan Rows']), False
+    
+    count = queryset.order_by()[:cap + 1].count()
+    return min(count, cap), count <= cap
+
+
+class CursorPage:
+    """One page of a CursorPaginator, iterable like a Django Page."""
+    
+    def __init__(self, object_list, paginator, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+    
+    def __repr__(self):
+        return f'<CursorPage of {len(self.object_list)} items>'
+    
+    def __iter__(self):
+        return iter(self.object_list)
+    
+    def __len__(self):
+        return len(self.object_list)
+    
+    def __getitem__(self, index):
+        return self.object_list[index]
+    
+    def has_next(self):
+        return self.next_cursor is not None
+    
+    def has_previous(self):
+        return self.previous_cursor is not None
+    
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """
+    Paginate a queryset by seeking past the last row of the previous page.
+    
+    ``ordering`` must be two fields sorted in the same direction and must be
+    unique together; the default (created_at, id) pair fits every list view.
+    """
+    
+    def __init__(self, queryset, per_page, ordering=('-created_at', '-id'), estimate=None):
+        if len(ordering) != 2 or ordering[0].startswith('-') != ordering[1].startswith('-'):
+            raise ValueError('CursorPaginator needs two fields sorted in the same direction.')
+        
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+        self.descending = ordering[0].startswith('-')
+        self.fields = [name.lstrip('-') for name in ordering]
+        self.estimate = settings.PAGINATION_ESTIMATE_COUNT if estimate is None else estimate
+        self._count = None
+    
+    @property
+    def count(self):
+        """Estimated number of rows, or None when estimates are disabled."""
+        if self.estimate and self._count is None:
+            self._count = estimate_count(self.queryset)
+        return self._count[0] if self._count else None
+    
+    @property
+    def count_is_exact(self):
+        return bool(self._count and self._count[1])
+    
+    def _position(self, obj):
+        return [getattr(obj, field) for field in self.fields]
+    
+    def _field(self, name):
+        """The model field or annotation ordered by, to parse cursor values with."""
+        try:
+            return self.queryset.model._meta.get_field(name)
+        except FieldDoesNotExist:
+            return self.queryset.query.annotations[name].output_field
+    
+    def _seek(self, values, forward):
+        """Filter for rows strictly after (forward) or before ``values`` in page order."""
+        if len(values) != len(self.fields):
+            raise InvalidCursor(values)
+        try:
+            first, second = (
+                self._field(field).to_python(value) for field, value in zip(self.fields, values)
+            )
+        except (ValidationError, TypeError, ValueError):
+            raise InvalidCursor(values)
+        lookup = 'lt' if self.descending == forward else 'gt'
+        return (
+            Q(**{f'{self.fields[0]}__{lookup}': first}) |
+            Q(**{self.fields[0]: first, f'{self.fields[1]}__{lookup}': second})
+        )
+    
+    def page(self, cursor=None):
+        """Return the page addressed by ``cursor`` (the first page when None)."""
+        direction, values = decode_cursor(cursor) if cursor else ('next', None)
+        forward = direction == 'next'
+        
+        queryset = self.queryset
+        if values is not None:
+            queryset = queryset.filter(self._seek(values, forward))
+        
+        ordering = self.ordering
+        if not forward:
+            ordering = tuple(name[1:] if name.startswith('-') else f'-{name}' for name in ordering)
+        
+        rows = list(queryset.order_by(*ordering)[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if not forward:
+            rows.reverse()
+        
+        if not rows:
+            return CursorPage([], self)
+        
+        # Moving forward, a full extra row means there is a next page and any
+        # cursor means we came from a previous one; moving back it is reversed.
+        has_next = has_more if forward else True
+        has_previous = values is not None if forward else has_more
+        
+        next_cursor = encode_cursor('next', self._position(rows[-1])) if has_next else None
+        previous_cursor = encode_cursor('prev', self._position(rows[0])) if has_previous else None
+        return CursorPage(rows, self, next_cursor, previous_cursor)
+    
+    def get_page(self, cursor=None):
+        """Like ``page`` but falls back to the first page for a malformed cursor."""
+        try:
+            return self.page(cursor)
+        except InvalidCursor:
+            return self.page()
+
+
+def paginate(request, queryset, per_page, ordering=('-created_at', '-id'), allow_keyset=True, count=None):
+    """
+    Return a page of ``queryset`` for ``request``.
+    
+    Keyset pagination is used when the request carries a ``cursor`` parameter
+    or ``PAGINATION_MODE`` is ``'keyset'``; otherwise the classic numbered
+    ``page`` parameter is used. Views whose ordering isn't (created_at, id),
+    such as ranked search results, pass ``allow_keyset=False``. Views that
+    already know the total, e.g. from a counter table, pass it as ``count``
+    so numbered pages skip the COUNT(*) query.
+    """
+    cursor = request.GET.get('cursor')
+    if allow_keyset and (cursor is not None or settings.PAGINATION_MODE == 'keyset'):
+        return CursorPaginator(queryset, per_page, ordering).get_page(cursor or None)
+    
+    paginator = Paginator(queryset, per_page)
+    if count is not None:
+        # Paginator.count is a cached_property, so this replaces the query
+        paginator.count = count
+    return paginator.get_page(request.GET.get('page'))
@@ -0,0 +1,237 @@
+"""
+Push channel for notification and message events.
+
+Code that creates notifications or messages calls ``publish`` and the event
+goes out once the transaction commits. The broker hands it to every stream
+the user has open in this process: each open stream is an asyncio queue, so
+an idle connection costs one queue and one suspended coroutine, not a thread.
+Streams are served by async views (``stream`` for server-sent events,
+``wait`` for long-polling) and therefore need the ASGI entry point.
+
+Every event is kept in a bounded backlog, so a client that reconnects with
+the last id it saw gets what it missed. The publishing process names each
+event ``<process token>-<n>``, which is unique across processes and restarts,
+and every process receives the events in the same order, so the backlog is
+searched by position rather than by comparing ids. When the id is not in the
+backlog (too old, or from before this process started) the client gets a
+``resync`` event instead and should refetch its badges. ``LocalBroker`` only
+reaches streams in its own process. Setting PUSH_BROKER to
+``PostgresBroker``, or to any class with the same methods, relays events
+between processes.
+"""
+import asyncio
+import itertools
+import json
+import logging
+import secrets
+import select
+import threading
+import time
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+RESYNC = {'id': None, 'event': 'resync', 'data': {}}
+
+
+@dataclass(eq=False)
+class Subscription:
+    """One open stream: the queue its events are delivered to and the loop that owns it."""
+    user_id: int
+    queue: asyncio.Queue
+    loop: asyncio.AbstractEventLoop = field(repr=False)
+
+
+def _offer(queue, event):
+    """Queue an event for a stream; a stream too far behind is told to resync instead."""
+    if queue.full():
+        while not queue.empty():
+            queue.get_nowait()
+        event = RESYNC
+    queue.put_nowait(event)
+
+
+class LocalBroker:
+    """In-process pub/sub. ``publish`` is thread-safe; subscribing must happen on an event loop."""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._token = secrets.token_hex(4)
+        self._ids = itertools.count(1)
+        self._subscribers = defaultdict(set)
+        self._backlog = deque(maxlen=settings.PUSH_BACKLOG_SIZE)
+    
+    def _message(self, event, data):
+        with self._lock:
+            return {'id': f'{self._token}-{next(self._ids)}', 'event': event, 'data': data}
+    
+    def publish(self, user_id, event, data):
+        self.deliver(user_id, self._message(event, data))
+    
+    def deliver(self, user_id, message):
+        """Hand an event to the user's streams in this process."""
+        with self._lock:
+            self._backlog.append((user_id, message))
+            subscribers = list(self._subscribers.get(user_id, ()))
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(_offer, subscription.queue, message)
+            except RuntimeError:
+                # The stream's event loop has shut down
+                self.unsubscribe(subscription)
+    
+    def subscribe(self, user_id, after=None):
+        """Open a stream, starting with the backlog after event id ``after`` if one is given."""
+        subscription = Subscription(user_id, asyncio.Queue(settings.PUSH_QUEUE_SIZE), asyncio.get_running_loop())
+        with self._lock:
+            if after is not None:
+                for event in self._missed(user_id, after):
+                    _offer(subscription.queue, event)
+            self._subscribers[user_id].add(subscription)
+        return subscription
+    
+    def _missed(self, user_id, after):
+        for position, (owner, event) in enumerate(self._backlog):
+            if event['id'] == after:
+                return [
+                    event for owner, event in itertools.islice(self._backlog, position + 1, None)
+                    if owner == user_id
+                ]
+        # Older than the backlog, or published before this process started listening
+        return [RESYNC]
+    
+    def unsubscribe(self, subscription):
+        with self._lock:
+            streams = self._subscribers.get(subscription.user_id)
+            if streams is not None:
+                streams.discard(subscription)
+                if not streams:
+                    del self._subscribers[subscription.user_id]
+    
+    def connections(self):
+        with self._lock:
+            return sum(len(streams) for streams in self._subscribers.values())
+
+
+class PostgresBroker(LocalBroker):
+    """
+    Relays events between processes with PostgreSQL LISTEN/NOTIFY.
+    
+    Every process listens on one channel in a background thread, on its own
+    connection to the default database, and delivers the notifications to
+    its local streams.
+    """
+    channel = 'skillexchange_push'
+    
+    def __init__(self):
+        super().__init__()
+        self._listener = None
+    
+    def publish(self, user_id, event, data):
+        payload = json.dumps({'user_id': user_id, 'message': self._message(event, data)}, cls=DjangoJSONEncoder)
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_notify(%s, %s)', [self.channel, payload])
+    
+    def subscribe(self, user_id, after=None):
+        with self._lock:
+            if self._listener is None:
+                self._listener = threading.Thread(target=self._listen, name='push-listener', daemon=True)
+                self._listener.start()
+        return super().subscribe(user_id, after)
+    
+    def _listen(self):
+        import psycopg2
+        from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+        
+        while True:
+            try:
+                listener = psycopg2.connect(**connection.get_connection_params())
+                listener.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+                with listener.cursor() as cursor:
+                    cursor.execute(f'LISTEN {self.channel}')
+                while True:
+                    if select.select([listener], [], [], settings.PUSH_KEEPALIVE) == ([], [], []):
+                        continue
+                    listener.poll()
+                    while listener.notifies:
+                        message = json.loads(listener.notifies.pop(0).payload)
+                        self.deliver(message['user_id'], message['message'])
+            except Exception:
+                logger.exception('Push listener lost its connection; reconnecting.')
+                time.sleep(1)
+
+
+@lru_cache(maxsize=None)
+def broker():
+    return import_string(settings.PUSH_BROKER)()
+
+
+def publish(user_ids, event, data):
+    """Push ``event`` to the users' open streams once the current transaction commits."""
+    user_ids = list(user_ids)
+    
+    def send():
+        for user_id in user_ids:
+            broker().publish(user_id, event, data)
+    transaction.on_commit(send)
+
+
+def _drain(queue):
+    events = []
+    while not queue.empty():
+        events.append(queue.get_nowait())
+    return events
+
+
+def format_event(event):
+    lines = [f"event: {event['event']}"]
+    if event['id'] is not None:
+        lines.append(f"id: {event['id']}")
+    lines.append(f"data: {json.dumps(event['data'], cls=DjangoJSONEncoder)}")
+    return '\n'.join(lines) + '\n\n'
+
+
+async def stream(user_id, after=None):
+    """
+    Server-sent events for a user, with keepalive comments while idle.
+    
+    The stream ends after PUSH_STREAM_TIMEOUT seconds; browsers reconnect on
+    their own and send the last event id, so nothing is lost.
+    """
+    subscription = broker().subscribe(user_id, after)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.PUSH_STREAM_TIMEOUT
+    try:
+        yield f'retry: {settings.PUSH_RETRY_MS}\n\n'
+        while (remaining := deadline - loop.time()) > 0:
+            try:
+                event = await asyncio.wait_for(subscription.queue.get(), min(settings.PUSH_KEEPALIVE, remaining))
+            except asyncio.TimeoutError:
+                yield ': keepalive\n\n'
+                continue
+            yield format_event(event)
+    finally:
+        broker().unsubscribe(subscription)
+
+
+async def wait(user_id, after=None, timeout=None):
+    """Long-poll: the events after ``after``, waiting up to ``timeout`` seconds for the first one."""
+    subscription = broker().subscribe(user_id, after)
+    try:
+        events = _drain(subscription.queue)
+        if not events:
+            try:
+                events = [await asyncio.wait_for(subscription.queue.get(), timeout or settings.PUSH_POLL_TIMEOUT)]
+            except asyncio.TimeoutError:
+                return []
+            events += _drain(subscription.queue)
+        return events
+    finally:
+        broker().unsubscribe(subscription)
\ No newline at end of file
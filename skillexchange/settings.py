@@ -32,6 +32,7 @@ INSTALLED_APPS = [
     'swaps',
     'messaging',  # renamed from messages to avoid conflicts
     'reports',
+    'jobs',
 ]
 
 MIDDLEWARE = [
@@ -115,6 +116,57 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 CRISPY_ALLOWED_TEMPLATE_PACKS = "bootstrap5"
 CRISPY_TEMPLATE_PACK = "bootstrap5"
 
+# Cache (use a shared backend such as Redis or Memcached when running several workers)
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='skillexchange'),
+    }
+}
+
+# Skill search
+SKILL_SEARCH_MAX_RESULTS = config('SKILL_SEARCH_MAX_RESULTS', default=500, cast=int)
+FACET_CACHE_TIMEOUT = config('FACET_CACHE_TIMEOUT', default=600, cast=int)
+
+# Typeahead index (see skills.suggest); other processes' changes reach it only through a shared cache
+SKILL_SUGGEST_REFRESH_INTERVAL = config('SKILL_SUGGEST_REFRESH_INTERVAL', default=30, cast=int)
+SKILL_SUGGEST_MAX_AGE = config('SKILL_SUGGEST_MAX_AGE', default=900, cast=int)
+
+# Anonymous page cache (entries are invalidated by signals; the timeout only bounds memory)
+PAGE_CACHE_TIMEOUT = config('PAGE_CACHE_TIMEOUT', default=86400, cast=int)
+PAGE_CACHE_LOCK_TIMEOUT = 10
+PAGE_CACHE_LOCK_WAIT = 2
+
+# Unread badge counts are invalidated by signals; the timeout only bounds staleness from untracked writes
+UNREAD_COUNT_TIMEOUT = config('UNREAD_COUNT_TIMEOUT', default=300, cast=int)
+
+# Push channel (see skillexchange.push); use PostgresBroker when running more than one ASGI process
+PUSH_BROKER = config('PUSH_BROKER', default='skillexchange.push.LocalBroker')
+PUSH_KEEPALIVE = 15  # seconds between keepalive comments on an idle stream
+PUSH_STREAM_TIMEOUT = 300  # seconds before a stream closes and the browser reconnects
+PUSH_POLL_TIMEOUT = 25
+PUSH_RETRY_MS = 3000
+PUSH_QUEUE_SIZE = 100  # undelivered events per stream before it is told to resync
+PUSH_BACKLOG_SIZE = 1000  # recent events kept for reconnecting clients
+
+# Read notifications older than this are moved to the archive by the archive_notifications command
+NOTIFICATION_RETENTION_DAYS = config('NOTIFICATION_RETENTION_DAYS', default=90, cast=int)
+
+# Pending swap requests older than this are expired by the expire_swap_requests command
+SWAP_REQUEST_EXPIRY_DAYS = config('SWAP_REQUEST_EXPIRY_DAYS', default=30, cast=int)
+
+# Background jobs (see jobs.queue). With JOBS_SYNC, tasks run inline instead of in a run_jobs worker.
+JOBS_SYNC = config('JOBS_SYNC', default=False, cast=bool)
+JOBS_MAX_ATTEMPTS = 5
+JOBS_RETRY_DELAY = 10  # seconds before the first retry, doubled for each further attempt
+JOBS_LOCK_TIMEOUT = 300  # seconds after which a running job is assumed lost and requeued
+JOBS_RETENTION_DAYS = 7
+
+# Pagination ('offset' uses numbered pages, 'keyset' uses opaque cursors)
+PAGINATION_MODE = config('PAGINATION_MODE', default='offset')
+PAGINATION_ESTIMATE_COUNT = config('PAGINATION_ESTIMATE_COUNT', default=True, cast=bool)
+PAGINATION_COUNT_CAP = config('PAGINATION_COUNT_CAP', default=1000, cast=int)
+
 # Login/Logout URLs
 LOGIN_URL = '/login/'
 LOGIN_REDIRECT_URL = '/dashboard/'
@@ -21,6 +21,7 @@ urlpatterns = [
     path('swaps/', include('swaps.urls')),
     path('messaging/', include('messaging.urls')),
     path('reports/', include('reports.urls')),
+    path('jobs/', include('jobs.urls')),
 ]
 
 # Serve media files during development
@@ -0,0 +1,36 @@
+"""
+Version counters for cache invalidation.
+
+Cached entries embed the current version of whatever they depend on in their
+key, and a change bumps the version, so older entries are never read again.
+A counter that is missing, because it was never set or the cache evicted it,
+is seeded with the current time in nanoseconds rather than 1: restarting at
+a low number would make entries cached under those earlier versions valid
+again. Counters are stored without a timeout.
+"""
+import time
+
+from django.core.cache import cache
+
+
+def bump(*keys):
+    """Increment each counter and return the new versions."""
+    versions = []
+    for key in keys:
+        try:
+            versions.append(cache.incr(key))
+        except ValueError:
+            version = time.time_ns()
+            cache.set(key, version, None)
+            versions.append(version)
+    return versions
+
+
+def current(*keys):
+    """The current version of each counter, seeding the missing ones."""
+    versions = cache.get_many(keys)
+    missing = {key: time.time_ns() for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, None)
+        versions.update(missing)
+    return [versions[key] for key in keys]
\ No newline at end of file
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Category, SkillListing, SkillReview
+from .models import Category, SkillListing, SkillReview, Tag
 
 
 @admin.register(Category)
@@ -11,11 +11,14 @@ class CategoryAdmin(admin.ModelAdmin):
 
 @admin.register(SkillListing)
 class SkillListingAdmin(admin.ModelAdmin):
-    list_display = ['title', 'user', 'category', 'skill_type', 'difficulty_level', 'is_active', 'status', 'created_at']
+    list_display = ['title', 'user', 'category', 'skill_type', 'difficulty_level', 'avg_rating', 'review_count', 'is_active', 'status', 'created_at']
     list_filter = ['skill_type', 'difficulty_level', 'is_active', 'status', 'category', 'created_at']
     search_fields = ['title', 'description', 'user__email', 'user__username']
     ordering = ['-created_at']
-    readonly_fields = ['created_at', 'updated_at']
+    readonly_fields = [
+        'created_at', 'updated_at', 'avg_rating', 'review_count', 'rating_sum',
+        'rating_1_count', 'rating_2_count', 'rating_3_count', 'rating_4_count', 'rating_5_count',
+    ]
 
 
 @admin.register(SkillReview)
@@ -24,4 +27,12 @@ class SkillReviewAdmin(admin.ModelAdmin):
     list_filter = ['rating', 'created_at']
     search_fields = ['skill_listing__title', 'reviewer__email', 'comment']
     ordering = ['-created_at']
-    readonly_fields = ['created_at'] 
\ No newline at end of file
+    readonly_fields = ['created_at'] 
+
+
+@admin.register(Tag)
+class TagAdmin(admin.ModelAdmin):
+    list_display = ['name', 'listing_count', 'created_at']
+    search_fields = ['name']
+    ordering = ['-listing_count', 'name']
+    readonly_fields = ['listing_count', 'created_at']
\ No newline at end of file
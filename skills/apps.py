@@ -1,6 +1,17 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
+
+
+def create_search_index(sender, **kwargs):
+    """Create the full-text search index after the skills tables exist."""
+    from . import search
+    search.get_backend().create_index()
 
 
 class SkillsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'skills' 
\ No newline at end of file
+    name = 'skills'
+    
+    def ready(self):
+        from . import signals  # noqa: F401
+        post_migrate.connect(create_search_index, sender=self)
@@ -0,0 +1,85 @@
+"""
+Sidebar facet counts for the skill catalog.
+
+All counts for a filter set come from a single grouped query over
+(category, skill_type, difficulty_level). The grouped rows are cached under a
+key built from the normalized non-facet filters, so every facet selection on
+top of the same search reuses one cache entry. Signal handlers bump a version
+number to invalidate every entry when listings change.
+"""
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+from skillexchange import versions
+from .search import tokenize
+from .tags import normalize_tag
+
+VERSION_KEY = 'skills:facets:version'
+
+FACET_FIELDS = {
+    'category': 'category_id',
+    'skill_type': 'skill_type',
+    'difficulty_level': 'difficulty_level',
+}
+
+# Listing fields that can move a listing between facet buckets or filter sets
+WATCHED_FIELDS = (
+    'is_active', 'status', 'category_id', 'skill_type', 'difficulty_level',
+    'title', 'description', 'tags', 'user_id',
+)
+
+
+def normalize_filters(query=None, min_rating=None, tag=None):
+    """Canonical form of the non-facet filters, used as the cache key."""
+    return {
+        'query': ' '.join(tokenize(query)),
+        'min_rating': str(min_rating or ''),
+        'tag': normalize_tag(tag or ''),
+    }
+
+
+def _cache_key(filters):
+    version, = versions.current(VERSION_KEY)
+    digest = hashlib.md5(json.dumps(filters, sort_keys=True).encode()).hexdigest()
+    return f'skills:facets:{version}:{digest}'
+
+
+def invalidate():
+    """Invalidate all cached facet counts."""
+    versions.bump(VERSION_KEY)
+
+
+def grouped_counts(queryset, filters):
+    """Return cached ``(category_id, skill_type, difficulty_level, count)`` rows for ``queryset``."""
+    key = _cache_key(filters)
+    rows = cache.get(key)
+    if rows is None:
+        rows = [
+            (row['category_id'], row['skill_type'], row['difficulty_level'], row['count'])
+            for row in queryset.order_by().values(*FACET_FIELDS.values()).annotate(count=Count('id'))
+        ]
+        cache.set(key, rows, settings.FACET_CACHE_TIMEOUT)
+    return rows
+
+
+def facet_counts(queryset, filters, selected):
+    """
+    Count listings per facet value.
+    
+    ``queryset`` has the non-facet filters (described by ``filters``) applied.
+    ``selected`` maps facet names to the chosen values. Each facet is counted
+    with every other selected facet applied but not its own, so the sidebar
+    shows how many results picking a different value would give.
+    """
+    selected = {name: value for name, value in selected.items() if value not in (None, '')}
+    counts = {name: {} for name in FACET_FIELDS}
+    
+    for row in grouped_counts(queryset, filters):
+        values = dict(zip(FACET_FIELDS, row[:3]))
+        for name in FACET_FIELDS:
+            if all(str(values[other]) == str(value) for other, value in selected.items() if other != name):
+                counts[name][values[name]] = counts[name].get(values[name], 0) + row[3]
+    return counts
@@ -1,5 +1,6 @@
 from django import forms
 from .models import SkillListing, SkillReview, Category
+from .tags import normalize_tags
 
 
 class SkillListingForm(forms.ModelForm):
@@ -17,13 +18,19 @@ class SkillListingForm(forms.ModelForm):
             'description': forms.Textarea(attrs={'rows': 4}),
         }
     
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.instance.pk and isinstance(self.initial.get('tags'), list):
+            self.initial['tags'] = ', '.join(self.initial['tags'])
+    
     def clean_tags(self):
-        """Convert comma-separated tags to list."""
+        """Convert comma-separated tags to a normalized list.
+        
+        Saving the listing mirrors this list into the tag index (see skills.tags).
+        """
         tags = self.cleaned_data.get('tags', '')
         if tags:
-            # Split by comma, strip whitespace, and filter out empty strings
-            tag_list = [tag.strip() for tag in tags.split(',') if tag.strip()]
-            return tag_list
+            return normalize_tags(tags.split(','))
         return []
 
 
@@ -40,6 +47,12 @@ class SkillReviewForm(forms.ModelForm):
 
 class SkillSearchForm(forms.Form):
     """Form for searching skill listings."""
+    SORT_ORDERING = {
+        'rating': ['-avg_rating', '-review_count', '-created_at'],
+        'reviews': ['-review_count', '-avg_rating', '-created_at'],
+        'newest': ['-created_at'],
+    }
+    
     query = forms.CharField(
         max_length=100, 
         required=False, 
@@ -65,4 +78,9 @@ class SkillSearchForm(forms.Form):
         min_value=0, 
         max_value=5,
         widget=forms.NumberInput(attrs={'placeholder': 'Min rating'})
+    )
+    tag = forms.CharField(max_length=50, required=False, widget=forms.HiddenInput())
+    sort = forms.ChoiceField(
+        choices=[('', 'Best Match'), ('rating', 'Highest Rated'), ('reviews', 'Most Reviewed'), ('newest', 'Newest')],
+        required=False
     ) 
\ No newline at end of file
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from skills.tags import backfill
+
+
+class Command(BaseCommand):
+    help = 'Index the tags of existing skill listings and recount tag popularity.'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Listings fetched per batch.')
+    
+    def handle(self, *args, **options):
+        listings, tags = backfill(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Indexed tags for {listings} skill listings ({tags} tags recounted).'))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from skills.ratings import rebuild_aggregates
+
+
+class Command(BaseCommand):
+    help = 'Recompute stored review counts, averages and star histograms for all skill listings.'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Listings updated per batch.')
+    
+    def handle(self, *args, **options):
+        updated = rebuild_aggregates(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt rating aggregates for {updated} skill listings.'))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from skills import search
+
+
+class Command(BaseCommand):
+    help = 'Drop and rebuild the full-text search index for skill listings.'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Listings fetched per database round trip.')
+    
+    def handle(self, *args, **options):
+        backend = search.get_backend()
+        indexed = search.rebuild_index(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Indexed {indexed} skill listings using {backend.__class__.__name__}.'
+        ))
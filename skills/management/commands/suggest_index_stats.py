@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand
+from skills.suggest import build_index
+
+
+class Command(BaseCommand):
+    help = 'Build the typeahead prefix index and report its size, memory use and lookup latency.'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('prefixes', nargs='*', default=['a', 'py', 'web', 'des', 'mus'], help='Prefixes to time.')
+        parser.add_argument('--repeat', type=int, default=1000, help='Lookups per prefix.')
+    
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        index = build_index()
+        build_seconds = time.perf_counter() - started
+        
+        stats = index.stats()
+        self.stdout.write(
+            f"Built {stats['entries']} suggestions ({stats['terms']} terms) in {build_seconds:.2f}s, "
+            f"using {stats['memory_bytes'] / 1024:.1f} KiB"
+        )
+        
+        for prefix in options['prefixes']:
+            # First lookup scans the term range, the rest hit the memo
+            started = time.perf_counter()
+            index.suggest(prefix)
+            cold = time.perf_counter() - started
+            
+            started = time.perf_counter()
+            for _ in range(options['repeat']):
+                index.suggest(prefix)
+            warm = (time.perf_counter() - started) / options['repeat']
+            
+            self.stdout.write(f'  {prefix!r}: cold {cold * 1e6:.0f}us, warm {warm * 1e6:.1f}us')
@@ -45,24 +45,84 @@ class SkillListing(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    # Review aggregates, maintained incrementally by skills.ratings
+    avg_rating = models.FloatField(default=0, db_index=True)
+    review_count = models.PositiveIntegerField(default=0)
+    rating_sum = models.PositiveIntegerField(default=0)
+    rating_1_count = models.PositiveIntegerField(default=0)
+    rating_2_count = models.PositiveIntegerField(default=0)
+    rating_3_count = models.PositiveIntegerField(default=0)
+    rating_4_count = models.PositiveIntegerField(default=0)
+    rating_5_count = models.PositiveIntegerField(default=0)
+    
+    AGGREGATE_FIELDS = (
+        'avg_rating', 'review_count', 'rating_sum',
+        'rating_1_count', 'rating_2_count', 'rating_3_count', 'rating_4_count', 'rating_5_count',
+    )
+    
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['is_active', 'status', '-created_at'], name='skills_listing_visible_idx'),
+            models.Index(fields=['user', '-created_at'], name='skills_listing_user_idx'),
+            # Partial indexes covering only listed rows, used by the catalog pages
+            models.Index(
+                fields=['-created_at'],
+                condition=models.Q(is_active=True, status='active'),
+                name='skills_listing_listed_idx',
+            ),
+            models.Index(
+                fields=['category', '-created_at'],
+                condition=models.Q(is_active=True, status='active'),
+                name='skills_listing_category_idx',
+            ),
+        ]
     
     def __str__(self):
         return f"{self.user.email} - {self.title}"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored values so signal handlers can tell what changed
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+    
+    def save(self, *args, **kwargs):
+        # The aggregates may have moved under a concurrent review since this
+        # instance was loaded, so a plain save of an existing row leaves them out
+        if not self._state.adding and not kwargs.get('force_insert') and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.AGGREGATE_FIELDS
+            ]
+        super().save(*args, **kwargs)
+        # post_save handlers have run, so the saved values become the new baseline
+        self._loaded_values = {
+            field.attname: self.__dict__[field.attname]
+            for field in self._meta.concrete_fields
+            if field.attname in self.__dict__
+        }
+    
+    def changed_fields(self, *fields):
+        """Return which of ``fields`` differ from the values loaded from the database."""
+        loaded = getattr(self, '_loaded_values', {})
+        return [name for name in fields if name in loaded and loaded[name] != getattr(self, name)]
+    
+    @property
+    def is_listed(self):
+        """Whether the listing is shown in the public catalog."""
+        return self.is_active and self.status == 'active'
+    
     @property
     def average_rating(self):
-        """Calculate average rating from reviews."""
-        reviews = self.reviews.all()
-        if reviews:
-            return sum(review.rating for review in reviews) / len(reviews)
-        return 0
+        """Average review rating, read from the stored aggregate."""
+        return self.avg_rating
     
     @property
-    def review_count(self):
-        """Get number of reviews."""
-        return self.reviews.count()
+    def rating_histogram(self):
+        """Number of reviews per star rating, highest first."""
+        return {stars: getattr(self, f'rating_{stars}_count') for stars in range(5, 0, -1)}
 
 
 class SkillReview(models.Model):
@@ -78,4 +138,42 @@ class SkillReview(models.Model):
         ordering = ['-created_at']
     
     def __str__(self):
-        return f"{self.reviewer.email} - {self.skill_listing.title} - {self.rating} stars" 
\ No newline at end of file
+        return f"{self.reviewer.email} - {self.skill_listing.title} - {self.rating} stars"
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored values so rating aggregates can apply a delta on edit
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance 
+
+
+class Tag(models.Model):
+    """Normalized tags used by skill listings."""
+    name = models.CharField(max_length=50, unique=True)
+    listing_count = models.PositiveIntegerField(default=0)  # Listed skills using this tag
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['name']
+        indexes = [
+            models.Index(fields=['-listing_count', 'name'], name='skills_tag_popularity_idx'),
+        ]
+    
+    def __str__(self):
+        return self.name
+
+
+class SkillListingTag(models.Model):
+    """Index of which tags each skill listing uses."""
+    skill_listing = models.ForeignKey(SkillListing, on_delete=models.CASCADE, related_name='tag_links')
+    tag = models.ForeignKey(Tag, on_delete=models.CASCADE, related_name='listing_links')
+    
+    class Meta:
+        unique_together = ['skill_listing', 'tag']
+        indexes = [
+            models.Index(fields=['tag', 'skill_listing'], name='skills_listingtag_tag_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.skill_listing_id} - {self.tag_id}"
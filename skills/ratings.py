@@ -0,0 +1,103 @@
+"""
+Denormalized review aggregates for skill listings.
+
+Every SkillListing stores its review count, rating sum, average and a per-star
+histogram. Reviews adjust those columns with a single conditional UPDATE, so
+writing a review costs O(1) no matter how many reviews the listing already has.
+"""
+from django.db.models import Case, Count, F, FloatField, Q, Sum, Value, When
+from django.db.models.functions import Cast
+from .models import SkillListing, SkillReview
+
+STARS = range(1, 6)
+
+
+def star_field(rating):
+    return f'rating_{rating}_count'
+
+
+def apply_rating(listing_id, rating, sign=1):
+    """Add (sign=1) or remove (sign=-1) one review of ``rating`` stars from a listing's aggregates."""
+    count = F('review_count') + sign
+    total = F('rating_sum') + sign * rating
+    
+    # Every expression in an UPDATE sees the pre-update row, so the average is
+    # computed from the same new count and sum that are being written.
+    SkillListing.objects.filter(id=listing_id).update(
+        review_count=count,
+        rating_sum=total,
+        avg_rating=Case(
+            When(review_count__gt=-sign, then=Cast(total, FloatField()) / count),
+            default=Value(0.0),
+            output_field=FloatField(),
+        ),
+        **{star_field(rating): F(star_field(rating)) + sign},
+    )
+
+
+def review_added(review):
+    apply_rating(review.skill_listing_id, review.rating, 1)
+
+
+def review_removed(review):
+    loaded = getattr(review, '_loaded_values', {})
+    apply_rating(loaded.get('skill_listing_id', review.skill_listing_id), loaded.get('rating', review.rating), -1)
+
+
+def review_changed(review):
+    """Move an edited review's contribution if its rating or listing changed."""
+    loaded = getattr(review, '_loaded_values', None)
+    if not loaded:
+        return
+    
+    old_listing_id, old_rating = loaded['skill_listing_id'], loaded['rating']
+    if (old_listing_id, old_rating) == (review.skill_listing_id, review.rating):
+        return
+    
+    apply_rating(old_listing_id, old_rating, -1)
+    apply_rating(review.skill_listing_id, review.rating, 1)
+    review._loaded_values.update(skill_listing_id=review.skill_listing_id, rating=review.rating)
+
+
+def rebuild_aggregates(batch_size=1000):
+    """
+    Recompute the aggregates for every listing from the review table.
+    
+    Listings are processed in primary-key batches, each with one grouped
+    aggregate query and one bulk update. Returns the number of listings updated.
+    """
+    fields = ['review_count', 'rating_sum', 'avg_rating'] + [star_field(stars) for stars in STARS]
+    last_id = 0
+    updated = 0
+    
+    while True:
+        listings = list(
+            SkillListing.objects.filter(id__gt=last_id).order_by('id').only('id')[:batch_size]
+        )
+        if not listings:
+            break
+        last_id = listings[-1].id
+        
+        stats = {
+            row['skill_listing_id']: row
+            for row in SkillReview.objects.filter(
+                skill_listing_id__in=[listing.id for listing in listings]
+            ).values('skill_listing_id').annotate(
+                review_count=Count('id'),
+                rating_sum=Sum('rating'),
+                **{star_field(stars): Count('id', filter=Q(rating=stars)) for stars in STARS},
+            ).order_by()
+        }
+        
+        for listing in listings:
+            row = stats.get(listing.id, {})
+            listing.review_count = row.get('review_count', 0)
+            listing.rating_sum = row.get('rating_sum') or 0
+            listing.avg_rating = listing.rating_sum / listing.review_count if listing.review_count else 0
+            for stars in STARS:
+                setattr(listing, star_field(stars), row.get(star_field(stars), 0))
+        
+        SkillListing.objects.bulk_update(listings, fields)
+        updated += len(listings)
+    
+    return updated
@@ -0,0 +1,228 @@
+"""
+Full-text search index for skill listings.
+
+SQLite databases use an FTS5 virtual table and PostgreSQL databases use a
+side table holding a weighted tsvector with a GIN index. Both tables are keyed
+by the listing id, only contain visible listings, and are kept in sync by the
+signal handlers in ``skills.signals``.
+"""
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Case, IntegerField, Q, When
+
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def candidates_sql(queryset):
+    """SQL and params selecting the ids of ``queryset``, for filtering the ranked query in the database."""
+    return queryset.order_by().values('id').query.sql_with_params()
+
+
+def tokenize(query):
+    """Split a raw search string into lowercase word tokens."""
+    return TOKEN_RE.findall((query or '').lower())
+
+
+def listing_document(listing):
+    """Return the (title, tags, owner, description) columns indexed for a listing."""
+    tags = ' '.join(str(tag) for tag in (listing.tags or []))
+    owner = f"{listing.user.first_name} {listing.user.last_name}".strip()
+    return listing.title, tags, owner, listing.description
+
+
+class SearchBackend:
+    """Base class for search backends."""
+    
+    def create_index(self):
+        pass
+    
+    def drop_index(self):
+        pass
+    
+    def index_listing(self, listing):
+        pass
+    
+    def remove_listing(self, listing_id):
+        pass
+    
+    def ranked_ids(self, query, limit, within):
+        """The ids of the best ``limit`` matches for ``query`` among the listings of the queryset ``within``."""
+        raise NotImplementedError
+    
+    def search(self, queryset, query):
+        """Filter ``queryset`` to listings matching ``query``, best match first."""
+        ids = self.ranked_ids(query, settings.SKILL_SEARCH_MAX_RESULTS, queryset)
+        if not ids:
+            return queryset.none()
+        
+        rank = Case(
+            *[When(id=listing_id, then=position) for position, listing_id in enumerate(ids)],
+            output_field=IntegerField(),
+        )
+        return queryset.filter(id__in=ids).annotate(search_rank=rank).order_by('search_rank')
+
+
+class SQLiteFTSBackend(SearchBackend):
+    """FTS5 virtual table ranked with bm25."""
+    table = 'skills_skilllisting_fts'
+    
+    # bm25 column weights: title, tags, owner, description
+    weights = (10.0, 5.0, 2.0, 1.0)
+    
+    def create_index(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.table} "
+                "USING fts5(title, tags, owner, description, tokenize='porter unicode61')"
+            )
+    
+    def drop_index(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {self.table}")
+    
+    def index_listing(self, listing):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table} WHERE rowid = %s", [listing.id])
+            cursor.execute(
+                f"INSERT INTO {self.table} (rowid, title, tags, owner, description) VALUES (%s, %s, %s, %s, %s)",
+                [listing.id, *listing_document(listing)],
+            )
+    
+    def remove_listing(self, listing_id):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table} WHERE rowid = %s", [listing_id])
+    
+    def ranked_ids(self, query, limit, within):
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        
+        candidates, candidate_params = candidates_sql(within)
+        # Quote every token so user input can't inject FTS5 operators, and
+        # match prefixes so partially typed words still find results.
+        match = ' '.join(f'"{token}"*' for token in tokens)
+        weights = ', '.join(str(weight) for weight in self.weights)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s AND rowid IN ({candidates}) "
+                f"ORDER BY bm25({self.table}, {weights}) LIMIT %s",
+                [match, *candidate_params, limit],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+class PostgresSearchBackend(SearchBackend):
+    """Weighted tsvector side table with a GIN index, ranked with ts_rank."""
+    table = 'skills_skilllisting_search'
+    config = 'english'
+    
+    def create_index(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} ("
+                "listing_id bigint PRIMARY KEY REFERENCES skills_skilllisting (id) ON DELETE CASCADE, "
+                "document tsvector NOT NULL)"
+            )
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS {self.table}_document_gin ON {self.table} USING GIN (document)"
+            )
+    
+    def drop_index(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {self.table}")
+    
+    def index_listing(self, listing):
+        title, tags, owner, description = listing_document(listing)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {self.table} (listing_id, document) VALUES (%s, "
+                "setweight(to_tsvector(%s::regconfig, %s), 'A') || "
+                "setweight(to_tsvector(%s::regconfig, %s), 'B') || "
+                "setweight(to_tsvector(%s::regconfig, %s), 'C') || "
+                "setweight(to_tsvector(%s::regconfig, %s), 'D')) "
+                "ON CONFLICT (listing_id) DO UPDATE SET document = EXCLUDED.document",
+                [
+                    listing.id,
+                    self.config, title,
+                    self.config, tags,
+                    self.config, owner,
+                    self.config, description,
+                ],
+            )
+    
+    def remove_listing(self, listing_id):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table} WHERE listing_id = %s", [listing_id])
+    
+    def ranked_ids(self, query, limit, within):
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        
+        candidates, candidate_params = candidates_sql(within)
+        tsquery = ' & '.join(f'{token}:*' for token in tokens)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT listing_id FROM {self.table}, to_tsquery(%s::regconfig, %s) query "
+                f"WHERE document @@ query AND listing_id IN ({candidates}) "
+                "ORDER BY ts_rank(document, query) DESC, listing_id DESC LIMIT %s",
+                [self.config, tsquery, *candidate_params, limit],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+class SubstringBackend(SearchBackend):
+    """Unindexed fallback for databases without a full-text engine."""
+    
+    def search(self, queryset, query):
+        return queryset.filter(
+            Q(title__icontains=query) |
+            Q(description__icontains=query) |
+            Q(tags__contains=[query]) |
+            Q(user__first_name__icontains=query) |
+            Q(user__last_name__icontains=query)
+        )
+
+
+BACKENDS = {
+    'sqlite': SQLiteFTSBackend,
+    'postgresql': PostgresSearchBackend,
+}
+
+
+def get_backend():
+    """Return the search backend for the default database."""
+    return BACKENDS.get(connection.vendor, SubstringBackend)()
+
+
+def sync_listing(listing):
+    """Add, refresh or drop a listing in the search index."""
+    backend = get_backend()
+    if listing.is_listed:
+        backend.index_listing(listing)
+    else:
+        backend.remove_listing(listing.id)
+
+
+def search_listings(queryset, query):
+    """Filter a SkillListing queryset by a search string, ranked by relevance."""
+    return get_backend().search(queryset, query)
+
+
+def rebuild_index(batch_size=1000):
+    """Drop and repopulate the search index. Returns the number of listings indexed."""
+    from .models import SkillListing
+    
+    backend = get_backend()
+    backend.drop_index()
+    backend.create_index()
+    
+    listings = SkillListing.objects.filter(is_active=True, status='active').select_related('user')
+    indexed = 0
+    for listing in listings.iterator(chunk_size=batch_size):
+        backend.index_listing(listing)
+        indexed += 1
+    return indexed
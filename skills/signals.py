@@ -0,0 +1,152 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_save, post_delete, pre_delete
+from django.dispatch import receiver
+from skillexchange import page_cache
+from .models import Category, SkillListing, SkillReview
+from . import facets, ratings, search, suggest, tags
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=SkillListing)
+def index_skill_listing(sender, instance, **kwargs):
+    """Keep the search index in sync with the listing."""
+    search.sync_listing(instance)
+
+
+@receiver(post_delete, sender=SkillListing)
+def unindex_skill_listing(sender, instance, **kwargs):
+    """Drop a deleted listing from the search index."""
+    search.get_backend().remove_listing(instance.id)
+
+
+@receiver(post_save, sender=SkillListing)
+def index_skill_listing_tags(sender, instance, **kwargs):
+    """Mirror the listing's tags into the tag index."""
+    instance._touched_tag_ids = tags.sync_listing_tags(instance)
+
+
+@receiver(pre_delete, sender=SkillListing)
+def remember_skill_listing_tags(sender, instance, **kwargs):
+    """Note the listing's tags before the cascade removes its tag links."""
+    instance._deleted_tag_ids = list(instance.tag_links.values_list('tag_id', flat=True))
+
+
+@receiver(post_delete, sender=SkillListing)
+def recount_skill_listing_tags(sender, instance, **kwargs):
+    """Recount the tags a deleted listing used."""
+    tags.refresh_tag_counts(getattr(instance, '_deleted_tag_ids', []))
+
+
+@receiver(post_save, sender=User)
+def reindex_user_listings(sender, instance, created, update_fields=None, **kwargs):
+    """Owner names are searchable, so re-index a user's listings when they change."""
+    if created:
+        return
+    if update_fields is not None and not {'first_name', 'last_name'} & set(update_fields):
+        return
+    
+    for listing in instance.skill_listings.filter(is_active=True, status='active'):
+        search.sync_listing(listing)
+
+
+
+@receiver(post_save, sender=SkillReview)
+def update_rating_aggregates(sender, instance, created, **kwargs):
+    """Apply the review to its listing's stored rating aggregates."""
+    if created:
+        ratings.review_added(instance)
+    else:
+        ratings.review_changed(instance)
+
+
+@receiver(post_delete, sender=SkillReview)
+def remove_rating_aggregates(sender, instance, **kwargs):
+    """Take a deleted review out of its listing's rating aggregates."""
+    ratings.review_removed(instance)
+
+
+
+@receiver(post_save, sender=SkillListing)
+def invalidate_facets_on_save(sender, instance, created, **kwargs):
+    """Facet counts change when a listing enters, leaves or moves within the catalog."""
+    if created:
+        if instance.is_listed:
+            facets.invalidate()
+    elif instance.changed_fields(*facets.WATCHED_FIELDS):
+        facets.invalidate()
+
+
+@receiver(post_delete, sender=SkillListing)
+def invalidate_facets_on_delete(sender, instance, **kwargs):
+    if instance.is_listed:
+        facets.invalidate()
+
+
+@receiver(post_save, sender=SkillReview)
+@receiver(post_delete, sender=SkillReview)
+def invalidate_facets_on_review(sender, instance, **kwargs):
+    """Reviews move average ratings, which the min_rating filter depends on."""
+    facets.invalidate()
+
+
+
+@receiver(post_save, sender=SkillListing)
+@receiver(post_delete, sender=SkillListing)
+def invalidate_listing_pages(sender, instance, **kwargs):
+    page_cache.bump('catalog', f'skill:{instance.id}')
+
+
+@receiver(post_save, sender=SkillReview)
+@receiver(post_delete, sender=SkillReview)
+def invalidate_review_pages(sender, instance, **kwargs):
+    """Reviews appear on the detail page and move the ratings shown in listing grids."""
+    page_cache.bump('catalog', f'skill:{instance.skill_listing_id}')
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_pages(sender, instance, **kwargs):
+    page_cache.bump('catalog', 'categories')
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_pages(sender, instance, created, update_fields=None, **kwargs):
+    """Owner and reviewer names are shown on cached pages."""
+    if created:
+        return
+    if update_fields is not None and not {'first_name', 'last_name', 'email'} & set(update_fields):
+        return
+    
+    listing_ids = set(instance.skill_listings.values_list('id', flat=True))
+    listing_ids.update(instance.skill_reviews_given.values_list('skill_listing_id', flat=True))
+    if listing_ids:
+        page_cache.bump('catalog', *(f'skill:{listing_id}' for listing_id in listing_ids))
+
+
+
+@receiver(post_save, sender=SkillListing)
+def update_suggestions(sender, instance, **kwargs):
+    """Runs after the tag index handlers, so tag counts are already current."""
+    suggest.listing_changed(instance, getattr(instance, '_touched_tag_ids', ()))
+
+
+@receiver(post_delete, sender=SkillListing)
+def remove_suggestions(sender, instance, **kwargs):
+    suggest.listing_changed(instance, getattr(instance, '_deleted_tag_ids', ()), deleted=True)
+
+
+@receiver(post_save, sender=SkillReview)
+@receiver(post_delete, sender=SkillReview)
+def reweight_suggestions(sender, instance, **kwargs):
+    suggest.listing_popularity_changed(instance.skill_listing_id)
+
+
+@receiver(post_save, sender=Category)
+def update_category_suggestion(sender, instance, **kwargs):
+    suggest.category_changed(instance)
+
+
+@receiver(post_delete, sender=Category)
+def remove_category_suggestion(sender, instance, **kwargs):
+    suggest.category_removed(instance.id)
@@ -0,0 +1,277 @@
+"""
+In-process prefix index behind the search box typeahead.
+
+Suggestions cover listed skill titles, tags and category names. Every word
+position of a label becomes a sorted (term, key) pair, so "pyt" finds
+"Learn Python" as well as "Python basics". A lookup is a bisect into the
+sorted list plus a top-k pick by popularity, memoized per prefix until the
+index changes, so answering never touches the database.
+
+Each process keeps its own copy. Changes made in this process are applied
+incrementally by the signal handlers once their transaction commits. A
+generation counter in the cache tells other processes that their copy is
+stale; they rebuild it at most every SKILL_SUGGEST_REFRESH_INTERVAL seconds,
+so a burst of writes costs each process one reload rather than one per
+write. That needs a cache shared by all processes (Redis, Memcached, the
+database cache); with the default per-process LocMemCache other processes
+never see the counter move and only pick up changes when their copy reaches
+SKILL_SUGGEST_MAX_AGE.
+"""
+import heapq
+import re
+import sys
+import threading
+import time
+from bisect import bisect_left, insort
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q
+from skillexchange import versions
+
+GENERATION_KEY = 'skills:suggest:generation'
+MAX_TERM_LENGTH = 32
+MAX_SUGGESTIONS = 8
+MEMO_SIZE = 2048
+
+WORD_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def normalize(text):
+    return ' '.join(WORD_RE.findall(str(text).lower()))
+
+
+def terms_for(label):
+    """Every word-aligned suffix of a label, truncated to MAX_TERM_LENGTH."""
+    words = normalize(label).split(' ')
+    return {
+        ' '.join(words[position:])[:MAX_TERM_LENGTH]
+        for position in range(len(words))
+        if words[position]
+    }
+
+
+class PrefixIndex:
+    """Sorted term list with popularity weights and a per-prefix result memo."""
+    
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._terms = []  # sorted (term, key) pairs
+        self._entries = {}  # key -> (label, weight, terms)
+        self._memo = {}
+    
+    def __len__(self):
+        return len(self._entries)
+    
+    def add(self, key, label, weight):
+        """Insert or replace the suggestion stored under ``key``."""
+        with self._lock:
+            self._discard(key)
+            terms = tuple(sys.intern(term) for term in terms_for(label))
+            self._entries[key] = (label, weight, terms)
+            for term in terms:
+                insort(self._terms, (term, key))
+            self._memo.clear()
+    
+    def remove(self, key):
+        with self._lock:
+            if self._discard(key):
+                self._memo.clear()
+    
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        for term in entry[2]:
+            position = bisect_left(self._terms, (term, key))
+            if position < len(self._terms) and self._terms[position] == (term, key):
+                del self._terms[position]
+        return True
+    
+    def suggest(self, prefix, limit=MAX_SUGGESTIONS):
+        """Return up to ``limit`` ``(key, label)`` pairs whose terms start with ``prefix``, most popular first."""
+        prefix = normalize(prefix)[:MAX_TERM_LENGTH]
+        if not prefix:
+            return []
+        
+        with self._lock:
+            memo_key = (prefix, limit)
+            if memo_key in self._memo:
+                return self._memo[memo_key]
+            
+            keys = set()
+            position = bisect_left(self._terms, (prefix,))
+            while position < len(self._terms) and self._terms[position][0].startswith(prefix):
+                keys.add(self._terms[position][1])
+                position += 1
+            
+            best = heapq.nlargest(limit, keys, key=lambda key: (self._entries[key][1], self._entries[key][0]))
+            results = [(key, self._entries[key][0]) for key in best]
+            
+            if len(self._memo) >= MEMO_SIZE:
+                self._memo.clear()
+            self._memo[memo_key] = results
+            return results
+    
+    def memory_usage(self):
+        """Approximate bytes held by the index structures."""
+        with self._lock:
+            total = sys.getsizeof(self._terms) + sys.getsizeof(self._entries)
+            seen = set()
+            for pair in self._terms:
+                total += sys.getsizeof(pair)
+                if id(pair[0]) not in seen:
+                    seen.add(id(pair[0]))
+                    total += sys.getsizeof(pair[0])
+            for key, (label, weight, terms) in self._entries.items():
+                total += sys.getsizeof(key) + sys.getsizeof(label) + sys.getsizeof(weight) + sys.getsizeof(terms)
+            return total
+    
+    def stats(self):
+        return {
+            'entries': len(self._entries),
+            'terms': len(self._terms),
+            'memory_bytes': self.memory_usage(),
+        }
+
+
+_index = None
+_generation = None
+_built_at = 0.0
+_build_lock = threading.Lock()
+
+
+def _listing_entry(listing):
+    return ('listing', listing.id), listing.title, 1 + listing.review_count
+
+
+def _category_entry(category, listing_count):
+    return ('category', category.id), category.name, listing_count
+
+
+def _tag_entry(tag):
+    return ('tag', tag.name), tag.name, tag.listing_count
+
+
+def build_index():
+    """Load every suggestion from the database into a fresh PrefixIndex."""
+    from .models import Category, SkillListing, Tag
+    
+    index = PrefixIndex()
+    listings = SkillListing.objects.filter(is_active=True, status='active').only('id', 'title', 'review_count')
+    for listing in listings.iterator(chunk_size=2000):
+        index.add(*_listing_entry(listing))
+    
+    categories = Category.objects.annotate(
+        listing_count=Count('skill_listings', filter=Q(skill_listings__is_active=True, skill_listings__status='active'))
+    )
+    for category in categories:
+        index.add(*_category_entry(category, category.listing_count))
+    
+    for tag in Tag.objects.filter(listing_count__gt=0):
+        index.add(*_tag_entry(tag))
+    return index
+
+
+def _fresh():
+    age = time.monotonic() - _built_at
+    if age < settings.SKILL_SUGGEST_REFRESH_INTERVAL:
+        return True
+    return age < settings.SKILL_SUGGEST_MAX_AGE and cache.get(GENERATION_KEY, 0) == _generation
+
+
+def get_index():
+    """Return this process's index, rebuilding it if it is too old or another process changed the data."""
+    global _index, _generation, _built_at
+    
+    if _index is not None and _fresh():
+        return _index
+    built_at = _built_at
+    with _build_lock:
+        # Another thread may have rebuilt it while this one waited
+        if _index is None or _built_at == built_at:
+            # Read before loading, so changes made during the build trigger another one
+            generation = cache.get(GENERATION_KEY, 0)
+            _index = build_index()
+            _generation = generation
+            _built_at = time.monotonic()
+    return _index
+
+
+def _apply(change=None):
+    """
+    Once the current transaction commits, apply a change to the local index
+    (if built) and publish it to other processes. A rolled back change is
+    never applied.
+    """
+    def publish():
+        global _generation
+        
+        if _index is not None and change is not None:
+            change(_index)
+        generation, = versions.bump(GENERATION_KEY)
+        # If someone else changed the data in between, our copy is stale anyway
+        if _generation is not None and generation == _generation + 1:
+            _generation = generation
+    transaction.on_commit(publish)
+
+
+def suggest(prefix, limit=MAX_SUGGESTIONS):
+    return get_index().suggest(prefix, limit)
+
+
+def listing_changed(listing, tag_ids=(), deleted=False):
+    """Refresh a listing, its category (and the one it left) and the tags whose counts it changed."""
+    from .models import Category, SkillListing, Tag
+    
+    if _index is None:
+        return _apply()
+    
+    listed = SkillListing.objects.filter(is_active=True, status='active')
+    categories = [(listing.category, listed.filter(category_id=listing.category_id).count())]
+    # Handlers run before save() resets the loaded values, so they still hold the old category
+    if listing.changed_fields('category_id'):
+        old_category = Category.objects.filter(id=listing._loaded_values['category_id']).first()
+        if old_category is not None:
+            categories.append((old_category, listed.filter(category=old_category).count()))
+    tags = list(Tag.objects.filter(id__in=tag_ids))
+    
+    def change(index):
+        if listing.is_listed and not deleted:
+            index.add(*_listing_entry(listing))
+        else:
+            index.remove(('listing', listing.id))
+        for category, count in categories:
+            index.add(*_category_entry(category, count))
+        for tag in tags:
+            if tag.listing_count:
+                index.add(*_tag_entry(tag))
+            else:
+                index.remove(('tag', tag.name))
+    _apply(change)
+
+
+def listing_popularity_changed(listing_id):
+    """Re-weight a listing after its review count moved."""
+    from .models import SkillListing
+    
+    if _index is None:
+        return _apply()
+    
+    listing = SkillListing.objects.filter(id=listing_id, is_active=True, status='active').only(
+        'id', 'title', 'review_count', 'is_active', 'status'
+    ).first()
+    if listing is not None:
+        _apply(lambda index: index.add(*_listing_entry(listing)))
+
+
+def category_changed(category):
+    if _index is None:
+        return _apply()
+    count = category.skill_listings.filter(is_active=True, status='active').count()
+    _apply(lambda index: index.add(*_category_entry(category, count)))
+
+
+def category_removed(category_id):
+    _apply(lambda index: index.remove(('category', category_id)))
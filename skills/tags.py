@@ -0,0 +1,121 @@
+"""
+Normalized tag index for skill listings.
+
+``SkillListing.tags`` stays the source of truth; every save mirrors it into
+the Tag and SkillListingTag tables so tag filters and the popular tags facet
+use indexed lookups instead of scanning the JSON column.
+"""
+import re
+
+from django.db.models import Count
+from .models import SkillListing, SkillListingTag, Tag
+
+MAX_TAG_LENGTH = Tag._meta.get_field('name').max_length
+
+
+def normalize_tag(tag):
+    """Lowercase a tag and collapse internal whitespace."""
+    return re.sub(r'\s+', ' ', str(tag)).strip().lower()[:MAX_TAG_LENGTH]
+
+
+def normalize_tags(tags):
+    """Normalize a list of tags, dropping blanks and duplicates but keeping order."""
+    normalized = []
+    for tag in tags or []:
+        tag = normalize_tag(tag)
+        if tag and tag not in normalized:
+            normalized.append(tag)
+    return normalized
+
+
+def get_or_create_tags(names):
+    """Return ``{name: Tag}`` for the given normalized names, creating any missing tags."""
+    if not names:
+        return {}
+    Tag.objects.bulk_create([Tag(name=name) for name in names], ignore_conflicts=True)
+    return {tag.name: tag for tag in Tag.objects.filter(name__in=names)}
+
+
+def refresh_tag_counts(tag_ids):
+    """Recount listed skills for the given tags with one grouped query."""
+    tag_ids = set(tag_ids)
+    if not tag_ids:
+        return
+    
+    counts = dict(
+        SkillListingTag.objects.filter(
+            tag_id__in=tag_ids,
+            skill_listing__is_active=True,
+            skill_listing__status='active',
+        ).values_list('tag_id').annotate(count=Count('id')).order_by()
+    )
+    tags = list(Tag.objects.filter(id__in=tag_ids))
+    for tag in tags:
+        tag.listing_count = counts.get(tag.id, 0)
+    Tag.objects.bulk_update(tags, ['listing_count'])
+
+
+def sync_listing_tags(listing, refresh_counts=True):
+    """Mirror ``listing.tags`` into the tag index. Returns the ids of tags whose counts may have changed."""
+    wanted = normalize_tags(listing.tags)
+    current = dict(
+        SkillListingTag.objects.filter(skill_listing=listing).values_list('tag__name', 'tag_id')
+    )
+    
+    added = [name for name in wanted if name not in current]
+    removed = [tag_id for name, tag_id in current.items() if name not in wanted]
+    
+    if removed:
+        SkillListingTag.objects.filter(skill_listing=listing, tag_id__in=removed).delete()
+    if added:
+        tags = get_or_create_tags(added)
+        SkillListingTag.objects.bulk_create(
+            [SkillListingTag(skill_listing=listing, tag=tags[name]) for name in added],
+            ignore_conflicts=True,
+        )
+        current.update((name, tags[name].id) for name in added)
+    
+    # Counts only include listed skills, so a visibility change touches every tag
+    if listing.changed_fields('is_active', 'status'):
+        touched = set(current.values())
+    else:
+        touched = {current[name] for name in added}
+    touched.update(removed)
+    
+    if refresh_counts:
+        refresh_tag_counts(touched)
+    return touched
+
+
+def filter_by_tag(queryset, tag):
+    """Filter a SkillListing queryset to listings using ``tag``."""
+    return queryset.filter(tag_links__tag__name=normalize_tag(tag))
+
+
+def top_tags(limit=20):
+    """Most used tags among listed skills, read from the popularity index."""
+    return Tag.objects.filter(listing_count__gt=0).order_by('-listing_count', 'name')[:limit]
+
+
+def backfill(batch_size=500):
+    """Index the tags of every existing listing. Returns (listings, tags) processed."""
+    last_id = 0
+    listings_done = 0
+    touched = set()
+    
+    while True:
+        listings = list(
+            SkillListing.objects.filter(id__gt=last_id).order_by('id').only('id', 'tags')[:batch_size]
+        )
+        if not listings:
+            break
+        last_id = listings[-1].id
+        
+        for listing in listings:
+            touched |= sync_listing_tags(listing, refresh_counts=False)
+        listings_done += len(listings)
+    
+    # Recount every tag once at the end, including tags that lost all their listings
+    touched |= set(Tag.objects.values_list('id', flat=True))
+    refresh_tag_counts(touched)
+    return listings_done, len(touched)
@@ -5,6 +5,7 @@ app_name = 'skills'
 
 urlpatterns = [
     path('', views.skill_list, name='skill_list'),
+    path('suggest/', views.skill_suggest, name='skill_suggest'),
     path('create/', views.skill_create, name='skill_create'),
     path('<int:skill_id>/', views.skill_detail, name='skill_detail'),
     path('<int:skill_id>/edit/', views.skill_edit, name='skill_edit'),
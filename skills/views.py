@@ -1,17 +1,27 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.db.models import Q, Avg
 from django.core.paginator import Paginator
 from django.http import JsonResponse
+from django.urls import reverse
+from django.utils.http import urlencode
 from .models import SkillListing, SkillReview, Category
 from .forms import SkillListingForm, SkillReviewForm, SkillSearchForm
+from .search import search_listings
+from . import facets, suggest
+from .tags import filter_by_tag, top_tags
+from skillexchange.page_cache import cache_anonymous_page
+from skillexchange.pagination import paginate
 
 
+@cache_anonymous_page('catalog')
 def skill_list(request):
     """List all skill listings with search and filtering."""
     form = SkillSearchForm(request.GET)
-    skills = SkillListing.objects.filter(is_active=True, status='active')
+    skills = SkillListing.objects.filter(is_active=True, status='active').select_related('user', 'category')
+    facet_filters = facets.normalize_filters()
+    selected = {}
+    query = sort = None
     
     if form.is_valid():
         query = form.cleaned_data.get('query')
@@ -19,40 +29,54 @@ def skill_list(request):
         skill_type = form.cleaned_data.get('skill_type')
         difficulty_level = form.cleaned_data.get('difficulty_level')
         min_rating = form.cleaned_data.get('min_rating')
+        tag = form.cleaned_data.get('tag')
+        sort = form.cleaned_data.get('sort')
         
-        if query:
-            skills = skills.filter(
-                Q(title__icontains=query) |
-                Q(description__icontains=query) |
-                Q(tags__contains=[query]) |
-                Q(user__first_name__icontains=query) |
-                Q(user__last_name__icontains=query)
-            )
-        
-        if category:
-            skills = skills.filter(category=category)
-        
-        if skill_type:
-            skills = skills.filter(skill_type=skill_type)
+        if min_rating:
+            skills = skills.filter(avg_rating__gte=min_rating)
         
-        if difficulty_level:
-            skills = skills.filter(difficulty_level=difficulty_level)
+        if tag:
+            skills = filter_by_tag(skills, tag)
         
-        if min_rating:
-            skills = skills.annotate(avg_rating=Avg('reviews__rating')).filter(avg_rating__gte=min_rating)
+        facet_filters = facets.normalize_filters(query, min_rating, tag)
+        selected = {
+            'category': category.id if category else None,
+            'skill_type': skill_type,
+            'difficulty_level': difficulty_level,
+        }
     
-    # Pagination
-    paginator = Paginator(skills, 12)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    results = skills
+    for name, value in selected.items():
+        if value:
+            results = results.filter(**{facets.FACET_FIELDS[name]: value})
+    
+    # Ranked full-text search over the filtered listings, so the result cap
+    # applies after the filters; the sidebar counts the unselected matches
+    if query:
+        searched = search_listings(results, query)
+        skills = searched if results is skills else search_listings(skills, query)
+        results = searched
+    
+    # Sidebar counts, taken before the facet selections narrow the results
+    facet_counts = facets.facet_counts(skills, facet_filters, selected)
+    
+    if sort:
+        results = results.order_by(*SkillSearchForm.SORT_ORDERING[sort])
+    
+    # Cursors follow (created_at, id), so ranked or sorted results use page numbers
+    page_obj = paginate(request, results, 12, allow_keyset=not (query or sort))
     
     # Get categories for sidebar
-    categories = Category.objects.all()
+    categories = list(Category.objects.all())
+    for sidebar_category in categories:
+        sidebar_category.listing_count = facet_counts['category'].get(sidebar_category.id, 0)
     
     context = {
         'form': form,
         'page_obj': page_obj,
         'categories': categories,
+        'facets': facet_counts,
+        'top_tags': top_tags(),
     }
     return render(request, 'skills/skill_list.html', context)
 
@@ -78,10 +102,11 @@ def skill_create(request):
     return render(request, 'skills/skill_form.html', context)
 
 
+@cache_anonymous_page('categories', lambda kwargs: f"skill:{kwargs['skill_id']}")
 def skill_detail(request, skill_id):
     """View a specific skill listing."""
-    skill = get_object_or_404(SkillListing, id=skill_id, is_active=True)
-    reviews = skill.reviews.all()
+    skill = get_object_or_404(SkillListing.objects.select_related('user', 'category'), id=skill_id, is_active=True)
+    reviews = skill.reviews.select_related('reviewer')
     
     # Check if user has already reviewed this skill
     user_review = None
@@ -204,18 +229,44 @@ def skill_reviews(request, skill_id):
     return render(request, 'skills/skill_reviews.html', context)
 
 
+def skill_suggest(request):
+    """Typeahead suggestions for the skill search box, served from memory."""
+    query = request.GET.get('q', '')
+    
+    suggestions = []
+    for (kind, value), label in suggest.suggest(query):
+        if kind == 'listing':
+            url = reverse('skills:skill_detail', args=[value])
+        elif kind == 'category':
+            url = reverse('skills:category_detail', args=[value])
+        else:
+            url = f"{reverse('skills:skill_list')}?{urlencode({'tag': value})}"
+        suggestions.append({'type': kind, 'label': label, 'url': url})
+    
+    return JsonResponse({'query': query, 'suggestions': suggestions})
+
+
+@cache_anonymous_page('catalog')
 def category_detail(request, category_id):
     """View skill listings by category."""
     category = get_object_or_404(Category, id=category_id)
-    skills = SkillListing.objects.filter(category=category, is_active=True, status='active')
+    listed = SkillListing.objects.filter(is_active=True, status='active')
+    skills = listed.filter(category=category).select_related('user')
+    
+    # Shares the cached counts of the unfiltered catalog
+    facet_counts = facets.facet_counts(listed, facets.normalize_filters(), {'category': category.id})
+    categories = list(Category.objects.all())
+    for sidebar_category in categories:
+        sidebar_category.listing_count = facet_counts['category'].get(sidebar_category.id, 0)
     
     # Pagination
-    paginator = Paginator(skills, 12)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    page_obj = paginate(request, skills, 12)
     
     context = {
         'category': category,
         'page_obj': page_obj,
+        'categories': categories,
+        'facets': facet_counts,
+        'top_tags': top_tags(),
     }
     return render(request, 'skills/category_detail.html', context) 
\ No newline at end of file
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import SwapRequest, SwapTransaction, SwapReview
+from .models import SwapRequest, SwapSession, SwapTransaction, SwapReview, SkillMatch
 
 
 @admin.register(SwapRequest)
@@ -20,10 +20,27 @@ class SwapTransactionAdmin(admin.ModelAdmin):
     readonly_fields = ['created_at']
 
 
+@admin.register(SwapSession)
+class SwapSessionAdmin(admin.ModelAdmin):
+    list_display = ['user', 'swap_request', 'start', 'end', 'status']
+    list_filter = ['status', 'start']
+    search_fields = ['user__email']
+    ordering = ['-start']
+    readonly_fields = ['created_at']
+
+
 @admin.register(SwapReview)
 class SwapReviewAdmin(admin.ModelAdmin):
     list_display = ['swap_request', 'reviewer', 'reviewed_user', 'rating', 'created_at']
     list_filter = ['rating', 'created_at']
     search_fields = ['swap_request__requesting_user__email', 'swap_request__requested_user__email', 'comment']
     ordering = ['-created_at']
-    readonly_fields = ['created_at'] 
\ No newline at end of file
+    readonly_fields = ['created_at'] 
+
+
+@admin.register(SkillMatch)
+class SkillMatchAdmin(admin.ModelAdmin):
+    list_display = ['user', 'matched_user', 'score', 'wanted_count', 'offered_count', 'updated_at']
+    search_fields = ['user__email', 'matched_user__email']
+    ordering = ['-score']
+    readonly_fields = ['updated_at']
\ No newline at end of file
@@ -3,4 +3,7 @@ from django.apps import AppConfig
 
 class SwapsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'swaps' 
\ No newline at end of file
+    name = 'swaps'
+    
+    def ready(self):
+        from . import signals  # noqa: F401
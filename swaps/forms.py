@@ -1,5 +1,25 @@
 from django import forms
 from .models import SwapRequest, SwapReview, SwapTransaction
+from .scheduling import conflicts, validate_interval
+from .transitions import MAX_BULK_SWAPS
+
+
+def clean_session(form, swap_request, start_field, end_field):
+    """Validate a session interval and that it fits both participants' calendars."""
+    start, end = form.cleaned_data.get(start_field), form.cleaned_data.get(end_field)
+    if not start or not end:
+        return
+    error = validate_interval(start, end)
+    if error:
+        raise forms.ValidationError(error)
+    if swap_request is not None:
+        clashes = conflicts(swap_request, start, end)
+        if clashes:
+            clash = clashes[0]
+            raise forms.ValidationError(
+                f'{clash.user.get_full_name()} already has a session from '
+                f'{clash.start:%Y-%m-%d %H:%M} to {clash.end:%Y-%m-%d %H:%M}.'
+            )
 
 
 class SwapRequestForm(forms.ModelForm):
@@ -45,4 +65,58 @@ class SwapTransactionForm(forms.ModelForm):
             'end_date': forms.DateTimeInput(attrs={'type': 'datetime-local'}),
             'actual_duration': forms.NumberInput(attrs={'min': 1, 'max': 24}),
             'notes': forms.Textarea(attrs={'rows': 3, 'placeholder': 'Any notes about the swap session...'}),
-        } 
\ No newline at end of file
+        }
+    
+    def __init__(self, *args, **kwargs):
+        self.swap_request = kwargs.pop('swap_request', None)
+        super().__init__(*args, **kwargs)
+    
+    def clean(self):
+        cleaned_data = super().clean()
+        clean_session(self, self.swap_request, 'start_date', 'end_date')
+        return cleaned_data
+
+
+class SwapSessionForm(forms.Form):
+    """Form for scheduling the session of an accepted swap."""
+    start = forms.DateTimeField(widget=forms.DateTimeInput(attrs={'type': 'datetime-local'}))
+    end = forms.DateTimeField(widget=forms.DateTimeInput(attrs={'type': 'datetime-local'}))
+    
+    def __init__(self, *args, **kwargs):
+        self.swap_request = kwargs.pop('swap_request')
+        super().__init__(*args, **kwargs)
+    
+    def clean(self):
+        cleaned_data = super().clean()
+        clean_session(self, self.swap_request, 'start', 'end')
+        return cleaned_data 
+
+
+class SwapBulkActionForm(forms.Form):
+    """Form for accepting, rejecting or cancelling several swap requests at once."""
+    ACTION_CHOICES = {
+        'received': [('accept', 'Accept'), ('reject', 'Reject')],
+        'sent': [('cancel', 'Cancel')],
+    }
+    
+    action = forms.ChoiceField(choices=[])
+    # The list template renders one checkbox per row of the current page rather than every choice
+    swap_requests = forms.ModelMultipleChoiceField(queryset=SwapRequest.objects.none(), widget=forms.MultipleHiddenInput)
+    
+    def __init__(self, *args, **kwargs):
+        user = kwargs.pop('user')
+        role = kwargs.pop('role', None)
+        super().__init__(*args, **kwargs)
+        
+        roles = [role] if role else list(self.ACTION_CHOICES)
+        self.fields['action'].choices = [choice for name in roles for choice in self.ACTION_CHOICES[name]]
+        # Requests that changed state since the page loaded are reported by the service, not rejected here
+        self.fields['swap_requests'].queryset = SwapRequest.objects.filter(
+            inbox_entries__user=user, inbox_entries__role__in=roles
+        )
+    
+    def clean_swap_requests(self):
+        swap_requests = self.cleaned_data['swap_requests']
+        if len(swap_requests) > MAX_BULK_SWAPS:
+            raise forms.ValidationError(f'Select at most {MAX_BULK_SWAPS} swap requests at a time.')
+        return swap_requests
\ No newline at end of file
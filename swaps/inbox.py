@@ -0,0 +1,184 @@
+"""
+Per-user swap inbox.
+
+Every swap request has one SwapInboxEntry per participant, carrying that
+participant's role and the request's status, and every (user, role, status)
+has a SwapInboxCounter. List pages filter the entries of one user through an
+index instead of OR-ing requesting_user and requested_user, and status tabs
+read the counters instead of running COUNT queries. The signal handlers in
+``swaps.signals`` keep both tables in step with SwapRequest saves and deletes.
+"""
+from collections import Counter, defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import Case, F, IntegerField, Value, When
+from django.db.models.functions import Greatest
+from .models import SwapInboxCounter, SwapInboxEntry, SwapRequest
+
+ROLES = ('sent', 'received')
+STATUSES = tuple(status for status, label in SwapRequest.STATUS_CHOICES)
+ORDERING = ('-inbox_created_at', '-id')
+
+
+def participants(user_ids):
+    """Pair ``(requesting_user_id, requested_user_id)`` with the role each one sees."""
+    return list(zip(user_ids, ROLES))
+
+
+def _user_ids(swap):
+    return swap.requesting_user_id, swap.requested_user_id
+
+
+def _adjust(user_id, role, status, delta):
+    """Add ``delta`` to one counter, creating it on first use."""
+    counters = SwapInboxCounter.objects.filter(user_id=user_id, role=role, status=status)
+    if delta < 0:
+        counters.filter(count__gte=-delta).update(count=F('count') + delta)
+        return
+    if counters.update(count=F('count') + delta):
+        return
+    try:
+        with transaction.atomic():
+            SwapInboxCounter.objects.create(user_id=user_id, role=role, status=status, count=delta)
+    except IntegrityError:
+        # Another request created the row first
+        counters.update(count=F('count') + delta)
+
+
+def _adjust_many(deltas):
+    """
+    Apply ``{(user_id, role, status): delta}`` with a few queries per (role, status).
+    
+    Missing counters that are about to grow are created first, then each
+    group is changed by one UPDATE with a per-user CASE.
+    """
+    groups = defaultdict(dict)
+    for (user_id, role, status), delta in deltas.items():
+        if delta:
+            groups[(role, status)][user_id] = delta
+    
+    for (role, status), by_user in groups.items():
+        SwapInboxCounter.objects.bulk_create([
+            SwapInboxCounter(user_id=user_id, role=role, status=status, count=0)
+            for user_id, delta in by_user.items() if delta > 0
+        ], ignore_conflicts=True)
+        delta = Case(
+            *[When(user_id=user_id, then=Value(delta)) for user_id, delta in by_user.items()],
+            output_field=IntegerField(),
+        )
+        SwapInboxCounter.objects.filter(role=role, status=status, user_id__in=by_user).update(
+            count=Greatest(F('count') + delta, Value(0))
+        )
+
+
+@transaction.atomic
+def swap_created(swap):
+    SwapInboxEntry.objects.bulk_create([
+        SwapInboxEntry(user_id=user_id, swap_request=swap, role=role, status=swap.status, created_at=swap.created_at)
+        for user_id, role in participants(_user_ids(swap))
+    ])
+    for user_id, role in participants(_user_ids(swap)):
+        _adjust(user_id, role, swap.status, 1)
+
+
+@transaction.atomic
+def swap_status_changed(swap, old_status):
+    SwapInboxEntry.objects.filter(swap_request=swap).update(status=swap.status)
+    for user_id, role in participants(_user_ids(swap)):
+        _adjust(user_id, role, old_status, -1)
+        _adjust(user_id, role, swap.status, 1)
+
+
+@transaction.atomic
+def swaps_status_changed(swaps, old_status, new_status):
+    """Move many swaps from ``old_status`` to ``new_status`` in a fixed number of queries."""
+    if not swaps:
+        return
+    SwapInboxEntry.objects.filter(swap_request__in=swaps).update(status=new_status)
+    deltas = Counter()
+    for swap in swaps:
+        for user_id, role in participants(_user_ids(swap)):
+            deltas[(user_id, role, old_status)] -= 1
+            deltas[(user_id, role, new_status)] += 1
+    _adjust_many(deltas)
+
+
+@transaction.atomic
+def swap_removed(user_ids, status):
+    """Drop a swap from its participants' counters; the entries go with the swap itself."""
+    for user_id, role in participants(user_ids):
+        _adjust(user_id, role, status, -1)
+
+
+@transaction.atomic
+def swap_moved(swap, old_user_ids, old_status):
+    """Move a swap whose participants were edited (admin only) to the new participants' inboxes."""
+    SwapInboxEntry.objects.filter(swap_request=swap).delete()
+    swap_removed(old_user_ids, old_status)
+    swap_created(swap)
+
+
+def counts(user):
+    """
+    Return ``{role: {status: count}}`` for the user, read from the counters.
+    
+    Each role also has an ``'all'`` total, and the ``'all'`` role sums both
+    roles, so every tab of every list page is covered by one indexed read.
+    """
+    result = {role: dict.fromkeys((*STATUSES, 'all'), 0) for role in (*ROLES, 'all')}
+    for role, status, count in SwapInboxCounter.objects.filter(user=user).values_list('role', 'status', 'count'):
+        for bucket in (role, 'all'):
+            result[bucket][status] += count
+            result[bucket]['all'] += count
+    return result
+
+
+def swap_requests_for(user, role=None, status=None):
+    """
+    SwapRequests in a user's inbox, optionally narrowed to one role and
+    status, newest first.
+    
+    They are ordered by the entry's copy of ``created_at``, which the entry
+    indexes can supply, instead of the swap's own column, which would make
+    the database sort every match. Paginate with ``ORDERING``.
+    """
+    filters = {'inbox_entries__user': user}
+    if role:
+        filters['inbox_entries__role'] = role
+    if status:
+        filters['inbox_entries__status'] = status
+    return (
+        SwapRequest.objects.filter(**filters)
+        .annotate(inbox_created_at=F('inbox_entries__created_at'))
+        .select_related('requesting_user', 'requested_user', 'requesting_skill', 'requested_skill')
+        .order_by(*ORDERING)
+    )
+
+
+@transaction.atomic
+def rebuild(batch_size=1000):
+    """Recreate every inbox entry and counter from the swap requests. Returns ``(swaps, counters)``."""
+    SwapInboxEntry.objects.all().delete()
+    SwapInboxCounter.objects.all().delete()
+    
+    totals = Counter()
+    entries = []
+    swaps = 0
+    requests = SwapRequest.objects.order_by().only('id', 'requesting_user_id', 'requested_user_id', 'status', 'created_at')
+    for swap in requests.iterator(chunk_size=batch_size):
+        swaps += 1
+        for user_id, role in participants(_user_ids(swap)):
+            entries.append(SwapInboxEntry(
+                user_id=user_id, swap_request_id=swap.id, role=role, status=swap.status, created_at=swap.created_at,
+            ))
+            totals[(user_id, role, swap.status)] += 1
+        if len(entries) >= batch_size:
+            SwapInboxEntry.objects.bulk_create(entries)
+            entries = []
+    SwapInboxEntry.objects.bulk_create(entries)
+    
+    SwapInboxCounter.objects.bulk_create([
+        SwapInboxCounter(user_id=user_id, role=role, status=status, count=count)
+        for (user_id, role, status), count in totals.items()
+    ], batch_size=batch_size)
+    return swaps, len(totals)
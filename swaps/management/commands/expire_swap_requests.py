@@ -0,0 +1,76 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from swaps import transitions
+from swaps.models import SwapRequest
+from users.notifications import notification, notify_many
+
+
+class Command(BaseCommand):
+    help = (
+        'Expire pending swap requests older than a given age, in primary-key batches. '
+        'Each batch commits on its own, so an interrupted run resumes where it stopped when run again.'
+    )
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.SWAP_REQUEST_EXPIRY_DAYS,
+                            help='Expire requests pending for longer than this many days.')
+        parser.add_argument('--batch-size', type=int, default=transitions.MAX_SYSTEM_BULK_SWAPS,
+                            help=f'Requests expired per transaction, at most {transitions.MAX_SYSTEM_BULK_SWAPS}.')
+        parser.add_argument('--sleep', type=float, default=0.0,
+                            help='Seconds to pause between batches, to leave room for site traffic.')
+        parser.add_argument('--limit', type=int, help='Stop after expiring this many requests.')
+        parser.add_argument('--dry-run', action='store_true', help='Count the requests that would expire.')
+    
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        stale = SwapRequest.objects.filter(status='pending', created_at__lt=cutoff)
+        batch_size = min(max(options['batch_size'], 1), transitions.bulk_limit('expire'))
+        limit = options['limit']
+        
+        started = time.perf_counter()
+        last_id = 0
+        expired = skipped = batches = 0
+        while limit is None or expired < limit:
+            size = batch_size if limit is None else min(batch_size, limit - expired)
+            swap_ids = list(stale.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:size])
+            if not swap_ids:
+                break
+            last_id = swap_ids[-1]
+            batches += 1
+            
+            if options['dry_run']:
+                expired += len(swap_ids)
+                continue
+            with transaction.atomic():
+                result = transitions.bulk_transition(swap_ids, 'expire')
+                notify_many([
+                    notification(
+                        swap.requesting_user_id, 'swap_expired', 'Swap Request Expired',
+                        f'Your swap request to {swap.requested_user.get_full_name()} expired without a reply.',
+                        related=swap,
+                    )
+                    for swap in result.applied
+                ])
+            expired += len(result.applied)
+            # Requests accepted or cancelled between the batch read and the update
+            skipped += result.skipped
+            
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f'batch {batches}: {len(result.applied)} expired through id {last_id} '
+                f'({expired} total, {expired / elapsed:.0f}/s)'
+            )
+            if options['sleep']:
+                time.sleep(options['sleep'])
+        
+        elapsed = time.perf_counter() - started
+        verb = 'Would expire' if options['dry_run'] else 'Expired'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} {expired} swap requests pending since before {cutoff:%Y-%m-%d %H:%M} '
+            f'in {batches} batches, {elapsed:.1f}s ({expired / elapsed if elapsed else 0:.0f}/s); {skipped} skipped.'
+        ))
\ No newline at end of file
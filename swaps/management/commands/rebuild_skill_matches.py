@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from swaps.matching import rebuild_all, refresh_user
+
+
+class Command(BaseCommand):
+    help = 'Recompute the reciprocal skill match table.'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, help='Only refresh matches involving this user id.')
+        parser.add_argument('--batch-size', type=int, default=500, help='Match rows written per insert.')
+    
+    def handle(self, *args, **options):
+        if options['user']:
+            count = refresh_user(options['user'])
+            self.stdout.write(self.style.SUCCESS(f"Stored {count} matches for user {options['user']}."))
+            return
+        
+        users, stored = rebuild_all(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Computed matches for {users} users ({stored} rows).'))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from swaps import inbox
+
+
+class Command(BaseCommand):
+    help = 'Recreate the per-user swap inbox entries and status counters from the swap requests.'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows written per insert.')
+    
+    def handle(self, *args, **options):
+        swaps, counters = inbox.rebuild(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt the inbox for {swaps} swap requests ({counters} counters).'))
\ No newline at end of file
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from swaps import scheduling
+
+
+class Command(BaseCommand):
+    help = 'Recreate the calendar sessions of completed swaps from their transactions.'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows written per insert.')
+    
+    def handle(self, *args, **options):
+        sessions, skipped = scheduling.rebuild(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {sessions} swap sessions.'))
+        if skipped:
+            self.stdout.write(self.style.WARNING(
+                f'Skipped {skipped} completed swaps whose transaction dates are not a valid session interval.'
+            ))
\ No newline at end of file
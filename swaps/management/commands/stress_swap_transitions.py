@@ -0,0 +1,169 @@
+import os
+import random
+import tempfile
+import threading
+from collections import Counter
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.utils import timezone
+from skills.models import Category, SkillListing
+from swaps import transitions
+from swaps.models import SwapInboxCounter, SwapRequest, SwapTransaction
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Race parallel threads through the swap state machine on a throwaway database and check the invariants.'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--swaps', type=int, default=25, help='Swap requests to race on.')
+        parser.add_argument('--threads', type=int, default=8, help='Concurrent threads per race.')
+        parser.add_argument('--seed', type=int, default=1)
+    
+    def handle(self, *args, **options):
+        test_settings = connection.settings_dict['TEST']
+        old_name, old_test_name = connection.settings_dict['NAME'], test_settings.get('NAME')
+        if connection.vendor == 'sqlite':
+            # Threads need their own connections to one file; a shared-cache
+            # in-memory database fails on lock contention instead of waiting.
+            test_settings['NAME'] = os.path.join(tempfile.mkdtemp(), 'stress.sqlite3')
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            violations = self.run_races(options['swaps'], max(options['threads'], 2), random.Random(options['seed']))
+        finally:
+            connections.close_all()
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            test_settings['NAME'] = old_test_name
+        
+        if violations:
+            for violation in violations:
+                self.stderr.write(self.style.ERROR(violation))
+            raise CommandError(f'{len(violations)} invariant violations.')
+        self.stdout.write(self.style.SUCCESS('Every race had exactly one winner and all counters are consistent.'))
+    
+    def create_swaps(self, count):
+        users = [
+            User.objects.create_user(email=f'stress{index}@example.com', username=f'stress{index}', password='stress')
+            for index in range(max(4, count // 3))
+        ]
+        category = Category.objects.create(name='Stress')
+        skills = {
+            user.id: SkillListing.objects.create(
+                user=user, category=category, title=f'Skill {user.id}', description='Stress test listing',
+                skill_type='offer', difficulty_level='beginner',
+            )
+            for user in users
+        }
+        swaps = []
+        for index in range(count):
+            requesting, requested = users[index % len(users)], users[(index + 1) % len(users)]
+            swaps.append(SwapRequest.objects.create(
+                requesting_user=requesting, requested_user=requested,
+                requesting_skill=skills[requested.id], requested_skill=skills[requesting.id],
+                proposed_duration=1,
+            ))
+        return swaps
+    
+    def race(self, swap_ids, threads, choose):
+        """Run one barrier-synchronised race per swap. Returns ``{swap_id: [(action, outcome), ...]}``."""
+        barrier = threading.Barrier(threads)
+        results = {swap_id: [] for swap_id in swap_ids}
+        lock = threading.Lock()
+        
+        def worker(position):
+            try:
+                for swap_id in swap_ids:
+                    action, user, details = choose(swap_id, position)
+                    barrier.wait()
+                    try:
+                        outcome = transitions.transition(swap_id, action, user, **details).outcome
+                    except Exception as exc:
+                        outcome = f'error: {type(exc).__name__}: {exc}'
+                    with lock:
+                        results[swap_id].append((action, outcome))
+            finally:
+                connections.close_all()
+        
+        pool = [threading.Thread(target=worker, args=(position,)) for position in range(threads)]
+        for thread in pool:
+            thread.start()
+        for thread in pool:
+            thread.join()
+        return results
+    
+    def run_races(self, count, threads, rng):
+        swaps = {swap.id: swap for swap in self.create_swaps(count)}
+        swap_ids = list(swaps)
+        plan = {
+            (swap_id, position): rng.choice(['accept', 'accept', 'reject', 'cancel'])
+            for swap_id in swap_ids for position in range(threads)
+        }
+        
+        def choose_decision(swap_id, position):
+            action = plan[(swap_id, position)]
+            swap = swaps[swap_id]
+            user = swap.requesting_user if action == 'cancel' else swap.requested_user
+            return action, user, {}
+        
+        # Each swap gets its own slot, so completions only race on the status, not the calendar
+        base = timezone.now()
+        
+        def choose_completion(swap_id, position):
+            swap = swaps[swap_id]
+            start = base + timedelta(hours=2 * swap_ids.index(swap_id))
+            details = {'start_date': start, 'end_date': start + timedelta(hours=1), 'actual_duration': 1}
+            # Both participants click "complete" at the same time
+            return 'complete', swap.requesting_user if position % 2 else swap.requested_user, details
+        
+        violations = []
+        decisions = self.race(swap_ids, threads, choose_decision)
+        accepted = [swap_id for swap_id in swap_ids if SwapRequest.objects.get(id=swap_id).status == 'accepted']
+        completions = self.race(accepted, threads, choose_completion)
+        
+        outcomes = Counter()
+        for phase, results in (('decide', decisions), ('complete', completions)):
+            for swap_id, attempts in results.items():
+                outcomes.update(f'{phase}:{outcome}' for action, outcome in attempts)
+                winners = [action for action, outcome in attempts if outcome == transitions.APPLIED]
+                errors = [outcome for action, outcome in attempts if outcome.startswith('error')]
+                if len(winners) != 1:
+                    violations.append(f'swap {swap_id} ({phase}): {len(winners)} winners')
+                if errors:
+                    violations.append(f'swap {swap_id} ({phase}): {errors[0]}')
+                if phase == 'decide' and len(winners) == 1:
+                    expected = transitions.TRANSITIONS[winners[0]][1]
+                    actual = SwapRequest.objects.get(id=swap_id).status
+                    if actual not in (expected, 'completed'):
+                        violations.append(f'swap {swap_id}: winner {winners[0]} but status is {actual}')
+        
+        completed = SwapRequest.objects.filter(status='completed')
+        if SwapTransaction.objects.count() != completed.count():
+            violations.append(
+                f'{SwapTransaction.objects.count()} transactions for {completed.count()} completed swaps'
+            )
+        expected_totals = Counter()
+        for swap in completed:
+            expected_totals.update([swap.requesting_user_id, swap.requested_user_id])
+        for user in User.objects.all():
+            if user.total_swaps != expected_totals[user.id]:
+                violations.append(f'user {user.id}: total_swaps {user.total_swaps}, expected {expected_totals[user.id]}')
+        
+        expected_counts = Counter()
+        for swap in SwapRequest.objects.all():
+            expected_counts[(swap.requesting_user_id, 'sent', swap.status)] += 1
+            expected_counts[(swap.requested_user_id, 'received', swap.status)] += 1
+        stored_counts = Counter({
+            (counter.user_id, counter.role, counter.status): counter.count
+            for counter in SwapInboxCounter.objects.filter(count__gt=0)
+        })
+        if stored_counts != expected_counts:
+            violations.append('swap inbox counters drifted from the swap requests')
+        
+        for key, value in sorted(outcomes.items()):
+            self.stdout.write(f'{key:<28} {value}')
+        self.stdout.write(f'{len(swap_ids)} decision races and {len(accepted)} completion races with {threads} threads')
+        return violations
\ No newline at end of file
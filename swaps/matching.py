@@ -0,0 +1,135 @@
+"""
+Reciprocal skill matching.
+
+A user's listings are reduced to match keys: the category of each listing and
+each of its tags. The listing and tag-link tables, filtered by skill_type and
+key, act as the inverted index from key to offering or requesting users. Two
+users match when each offers a key the other requests. Scores are symmetric,
+so a match is stored once per direction and every user's list is one indexed
+read on SkillMatch.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from skills.models import SkillListing, SkillListingTag
+from .models import SkillMatch
+
+# Tags are more specific than categories, so they count for more
+KEY_WEIGHTS = {'category': 1, 'tag': 2}
+
+# Listing fields that change which keys a user offers or requests
+WATCHED_FIELDS = ('category_id', 'skill_type', 'tags', 'is_active', 'status', 'user_id')
+
+
+def user_keys(user_id, skill_type):
+    """Return the match keys of a user's listed offers or requests."""
+    listed = {'skill_listing__is_active': True, 'skill_listing__status': 'active'}
+    keys = {
+        ('category', category_id)
+        for category_id in SkillListing.objects.filter(
+            user_id=user_id, skill_type=skill_type, is_active=True, status='active'
+        ).values_list('category_id', flat=True)
+    }
+    keys.update(
+        ('tag', tag_id)
+        for tag_id in SkillListingTag.objects.filter(
+            skill_listing__user_id=user_id, skill_listing__skill_type=skill_type, **listed
+        ).values_list('tag_id', flat=True)
+    )
+    return keys
+
+
+def users_for_keys(keys, skill_type, exclude_user_id):
+    """Look up which other users list ``skill_type`` skills under each key. Returns ``{user_id: keys}``."""
+    category_ids = [value for kind, value in keys if kind == 'category']
+    tag_ids = [value for kind, value in keys if kind == 'tag']
+    users = defaultdict(set)
+    
+    if category_ids:
+        rows = SkillListing.objects.filter(
+            category_id__in=category_ids, skill_type=skill_type, is_active=True, status='active'
+        ).exclude(user_id=exclude_user_id).values_list('user_id', 'category_id').distinct()
+        for user_id, category_id in rows:
+            users[user_id].add(('category', category_id))
+    
+    if tag_ids:
+        rows = SkillListingTag.objects.filter(
+            tag_id__in=tag_ids,
+            skill_listing__skill_type=skill_type,
+            skill_listing__is_active=True,
+            skill_listing__status='active',
+        ).exclude(skill_listing__user_id=exclude_user_id).values_list('skill_listing__user_id', 'tag_id').distinct()
+        for user_id, tag_id in rows:
+            users[user_id].add(('tag', tag_id))
+    
+    return users
+
+
+def _weight(keys):
+    return sum(KEY_WEIGHTS[kind] for kind, _ in keys)
+
+
+def compute_matches(user_id):
+    """Return ``{other_user_id: (score, wanted_count, offered_count)}`` for one user."""
+    they_offer = users_for_keys(user_keys(user_id, 'request'), 'offer', user_id)
+    if not they_offer:
+        return {}
+    they_request = users_for_keys(user_keys(user_id, 'offer'), 'request', user_id)
+    
+    matches = {}
+    for other_id in they_offer.keys() & they_request.keys():
+        wanted, offered = they_offer[other_id], they_request[other_id]
+        matches[other_id] = (_weight(wanted) * _weight(offered), len(wanted), len(offered))
+    return matches
+
+
+@transaction.atomic
+def refresh_user(user_id):
+    """Recompute every match involving ``user_id``; pairs without this user are unaffected."""
+    matches = compute_matches(user_id)
+    
+    SkillMatch.objects.filter(user_id=user_id).delete()
+    SkillMatch.objects.filter(matched_user_id=user_id).delete()
+    
+    rows = []
+    for other_id, (score, wanted, offered) in matches.items():
+        rows.append(SkillMatch(user_id=user_id, matched_user_id=other_id, score=score, wanted_count=wanted, offered_count=offered))
+        rows.append(SkillMatch(user_id=other_id, matched_user_id=user_id, score=score, wanted_count=offered, offered_count=wanted))
+    SkillMatch.objects.bulk_create(rows, batch_size=500)
+    return len(matches)
+
+
+@transaction.atomic
+def rebuild_all(batch_size=500):
+    """
+    Recompute the whole match table. Returns (users processed, matches stored).
+    
+    The delete and refill commit together, so readers keep the old matches
+    until the new table is complete.
+    """
+    SkillMatch.objects.all().delete()
+    
+    user_ids = SkillListing.objects.filter(
+        skill_type='request', is_active=True, status='active'
+    ).values_list('user_id', flat=True).distinct().order_by('user_id')
+    
+    users = 0
+    stored = 0
+    rows = []
+    for user_id in user_ids.iterator():
+        # Scores are symmetric, so each user only writes their own direction
+        for other_id, (score, wanted, offered) in compute_matches(user_id).items():
+            rows.append(SkillMatch(user_id=user_id, matched_user_id=other_id, score=score, wanted_count=wanted, offered_count=offered))
+        users += 1
+        if len(rows) >= batch_size:
+            SkillMatch.objects.bulk_create(rows)
+            stored += len(rows)
+            rows = []
+    
+    SkillMatch.objects.bulk_create(rows)
+    return users, stored + len(rows)
+
+
+def top_matches(user, limit=None):
+    matches = SkillMatch.objects.filter(user=user).select_related('matched_user')
+    return matches[:limit] if limit else matches
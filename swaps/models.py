@@ -14,6 +14,7 @@ class SwapRequest(models.Model):
         ('rejected', 'Rejected'),
         ('completed', 'Completed'),
         ('cancelled', 'Cancelled'),
+        ('expired', 'Expired'),
     ]
     
     requesting_user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='swap_requests_sent')
@@ -30,16 +31,111 @@ class SwapRequest(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['requested_user', 'status', '-created_at'], name='swaps_request_received_idx'),
+            models.Index(fields=['requesting_user', 'status'], name='swaps_request_sent_idx'),
+            models.Index(fields=['requesting_user', '-created_at'], name='swaps_request_sent_date_idx'),
+            models.Index(
+                fields=['requested_user', '-created_at'],
+                condition=models.Q(status='pending'),
+                name='swaps_request_pending_idx',
+            ),
+            # Lets the expiry sweep walk only the pending requests in primary-key order
+            models.Index(fields=['id'], condition=models.Q(status='pending'), name='swaps_request_open_idx'),
+        ]
     
     def __str__(self):
         return f"{self.requesting_user.email} → {self.requested_user.email} - {self.status}"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored values so signal handlers can tell what changed
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+    
     def save(self, *args, **kwargs):
         # Update accepted_at when status changes to accepted
         if self.status == 'accepted' and not self.accepted_at:
             from django.utils import timezone
             self.accepted_at = timezone.now()
         super().save(*args, **kwargs)
+        # post_save handlers have run, so the saved values become the new baseline
+        self._loaded_values = {
+            field.attname: self.__dict__[field.attname]
+            for field in self._meta.concrete_fields
+            if field.attname in self.__dict__
+        }
+    
+    def changed_fields(self, *fields):
+        """Return which of ``fields`` differ from the values loaded from the database."""
+        loaded = getattr(self, '_loaded_values', {})
+        return [name for name in fields if name in loaded and loaded[name] != getattr(self, name)]
+
+
+class SwapInboxEntry(models.Model):
+    """A swap request as seen by one of its two participants."""
+    ROLE_CHOICES = [
+        ('sent', 'Sent'),
+        ('received', 'Received'),
+    ]
+    
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='swap_inbox')
+    swap_request = models.ForeignKey(SwapRequest, on_delete=models.CASCADE, related_name='inbox_entries')
+    role = models.CharField(max_length=10, choices=ROLE_CHOICES)
+    status = models.CharField(max_length=20, choices=SwapRequest.STATUS_CHOICES)
+    created_at = models.DateTimeField(help_text='Copied from the swap request')
+    
+    class Meta:
+        unique_together = ['user', 'swap_request']
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='swaps_inbox_user_idx'),
+            models.Index(fields=['user', 'status', '-created_at'], name='swaps_inbox_status_idx'),
+            models.Index(fields=['user', 'role', 'status', '-created_at'], name='swaps_inbox_role_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.user.email} ({self.role}) - {self.swap_request_id} - {self.status}"
+
+
+class SwapInboxCounter(models.Model):
+    """Number of swap requests per user, role and status."""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='swap_inbox_counts')
+    role = models.CharField(max_length=10, choices=SwapInboxEntry.ROLE_CHOICES)
+    status = models.CharField(max_length=20, choices=SwapRequest.STATUS_CHOICES)
+    count = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        unique_together = ['user', 'role', 'status']
+    
+    def __str__(self):
+        return f"{self.user.email} {self.role} {self.status}: {self.count}"
+
+
+class SwapSession(models.Model):
+    """A swap session on one participant's calendar."""
+    STATUS_CHOICES = [
+        ('scheduled', 'Scheduled'),
+        ('completed', 'Completed'),
+    ]
+    
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='swap_sessions')
+    swap_request = models.ForeignKey(SwapRequest, on_delete=models.CASCADE, related_name='sessions')
+    start = models.DateTimeField()
+    end = models.DateTimeField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='scheduled')
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['start']
+        indexes = [
+            # Overlap and calendar queries are bounded range scans on start, see swaps.scheduling
+            models.Index(fields=['user', 'start'], name='swaps_session_user_start_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.user.email} {self.start:%Y-%m-%d %H:%M} - {self.end:%H:%M} ({self.status})"
 
 
 class SwapTransaction(models.Model):
@@ -69,4 +165,31 @@ class SwapReview(models.Model):
         ordering = ['-created_at']
     
     def __str__(self):
-        return f"{self.reviewer.email} → {self.reviewed_user.email} - {self.rating} stars" 
\ No newline at end of file
+        return f"{self.reviewer.email} → {self.reviewed_user.email} - {self.rating} stars"
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored values so reputation can apply a delta on edit
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+
+class SkillMatch(models.Model):
+    """Precomputed reciprocal matches: each user offers something the other requests."""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='skill_matches')
+    matched_user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    score = models.PositiveIntegerField()
+    wanted_count = models.PositiveIntegerField(help_text='Categories/tags the matched user offers that this user requests')
+    offered_count = models.PositiveIntegerField(help_text='Categories/tags this user offers that the matched user requests')
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        unique_together = ['user', 'matched_user']
+        ordering = ['-score', '-updated_at']
+        indexes = [
+            models.Index(fields=['user', '-score'], name='swaps_match_user_score_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.user.email} ⇄ {self.matched_user.email} ({self.score})"
\ No newline at end of file
@@ -0,0 +1,115 @@
+"""
+Swap session calendar and double-booking checks.
+
+Every scheduled or completed session has one SwapSession row per participant,
+indexed on (user, start). Sessions are at most MAX_SESSION_LENGTH long, so a
+session overlapping [start, end) must itself start within
+[start - MAX_SESSION_LENGTH, end). Both the conflict check and the calendar
+query are therefore a bounded range scan of one user's index entries, no
+matter how many sessions that user has booked over the years.
+"""
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from .models import SwapSession, SwapTransaction
+
+User = get_user_model()
+
+MAX_SESSION_LENGTH = timedelta(hours=24)
+MAX_CALENDAR_RANGE = timedelta(days=92)
+
+
+def overlapping(user_ids, start, end):
+    """Sessions of ``user_ids`` that overlap the half-open interval [start, end)."""
+    return SwapSession.objects.filter(
+        user_id__in=user_ids,
+        start__gt=start - MAX_SESSION_LENGTH,
+        start__lt=end,
+        end__gt=start,
+    )
+
+
+def conflicts(swap, start, end):
+    """Sessions of either participant that would clash with a session of ``swap``."""
+    user_ids = [swap.requesting_user_id, swap.requested_user_id]
+    return list(
+        overlapping(user_ids, start, end)
+        .exclude(swap_request=swap)
+        .select_related('user', 'swap_request')
+    )
+
+
+def validate_interval(start, end):
+    """Return an error message for an unusable session interval, or None."""
+    if end <= start:
+        return 'The session must end after it starts.'
+    if end - start > MAX_SESSION_LENGTH:
+        hours = int(MAX_SESSION_LENGTH.total_seconds() // 3600)
+        return f'A session can last at most {hours} hours.'
+    return None
+
+
+@transaction.atomic
+def book(swap, start, end, status='scheduled'):
+    """
+    Put a session of ``swap`` on both participants' calendars.
+    
+    The participants' rows are locked first (on databases that support it),
+    so two bookings for the same user cannot both pass the overlap check.
+    Returns the conflicting sessions; nothing is booked if there are any.
+    """
+    user_ids = sorted([swap.requesting_user_id, swap.requested_user_id])
+    list(User.objects.select_for_update().filter(id__in=user_ids).order_by('id').values_list('id'))
+    
+    clashes = conflicts(swap, start, end)
+    if not clashes:
+        record(swap, start, end, status)
+    return clashes
+
+
+def record(swap, start, end, status):
+    """Replace the swap's session; a swap has one current session on each calendar."""
+    SwapSession.objects.filter(swap_request=swap).delete()
+    SwapSession.objects.bulk_create([
+        SwapSession(user_id=user_id, swap_request=swap, start=start, end=end, status=status)
+        for user_id in (swap.requesting_user_id, swap.requested_user_id)
+    ])
+
+
+def calendar(user, start, end):
+    """The user's sessions overlapping [start, end), earliest first."""
+    return overlapping([user.id], start, end).select_related(
+        'swap_request__requesting_user', 'swap_request__requested_user',
+        'swap_request__requesting_skill', 'swap_request__requested_skill',
+    ).order_by('start')
+
+
+@transaction.atomic
+def rebuild(batch_size=1000):
+    """
+    Recreate the sessions of completed swaps from their transactions.
+    
+    Transactions whose interval could not be booked today, such as ones
+    longer than MAX_SESSION_LENGTH, are left off the calendar: the bounded
+    overlap scan would miss them. Returns (sessions created, transactions skipped).
+    """
+    SwapSession.objects.filter(swap_request__transaction__isnull=False).delete()
+    sessions = []
+    created = skipped = 0
+    transactions = SwapTransaction.objects.select_related('swap_request').order_by()
+    for completed in transactions.iterator(chunk_size=batch_size):
+        if validate_interval(completed.start_date, completed.end_date):
+            skipped += 1
+            continue
+        swap = completed.swap_request
+        for user_id in (swap.requesting_user_id, swap.requested_user_id):
+            sessions.append(SwapSession(
+                user_id=user_id, swap_request=swap, start=completed.start_date, end=completed.end_date, status='completed',
+            ))
+        if len(sessions) >= batch_size:
+            SwapSession.objects.bulk_create(sessions)
+            created += len(sessions)
+            sessions = []
+    SwapSession.objects.bulk_create(sessions)
+    return created + len(sessions), skipped
\ No newline at end of file
@@ -0,0 +1,65 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from skills.models import SkillListing
+from users import reputation
+from . import inbox, matching
+from .models import SwapRequest, SwapReview
+
+
+def _refresh_matches_on_commit(user_id):
+    transaction.on_commit(lambda: matching.refresh_user(user_id))
+
+
+@receiver(post_save, sender=SkillListing)
+def refresh_matches_on_save(sender, instance, created, **kwargs):
+    """Recompute the owner's matches when a listing changes what they offer or request."""
+    changed = instance.changed_fields(*matching.WATCHED_FIELDS)
+    if created or changed:
+        _refresh_matches_on_commit(instance.user_id)
+    if 'user_id' in changed:
+        _refresh_matches_on_commit(instance._loaded_values['user_id'])
+
+
+@receiver(post_delete, sender=SkillListing)
+def refresh_matches_on_delete(sender, instance, **kwargs):
+    _refresh_matches_on_commit(instance.user_id)
+
+
+@receiver(post_save, sender=SwapRequest)
+def update_inbox_on_save(sender, instance, created, **kwargs):
+    """Mirror every swap request state transition into both participants' inboxes."""
+    if created:
+        inbox.swap_created(instance)
+        return
+    
+    changed = instance.changed_fields('status', 'requesting_user_id', 'requested_user_id')
+    loaded = getattr(instance, '_loaded_values', {})
+    if 'requesting_user_id' in changed or 'requested_user_id' in changed:
+        old_user_ids = (loaded['requesting_user_id'], loaded['requested_user_id'])
+        inbox.swap_moved(instance, old_user_ids, loaded.get('status', instance.status))
+    elif 'status' in changed:
+        inbox.swap_status_changed(instance, loaded['status'])
+
+
+@receiver(post_delete, sender=SwapRequest)
+def update_inbox_on_delete(sender, instance, **kwargs):
+    loaded = getattr(instance, '_loaded_values', {})
+    inbox.swap_removed(
+        (instance.requesting_user_id, instance.requested_user_id),
+        loaded.get('status', instance.status),
+    )
+
+
+@receiver(post_save, sender=SwapReview)
+def update_reputation(sender, instance, created, **kwargs):
+    """Apply the review to the reviewed user's stored rating."""
+    if created:
+        reputation.review_added(instance)
+    else:
+        reputation.review_changed(instance)
+
+
+@receiver(post_delete, sender=SwapReview)
+def remove_reputation(sender, instance, **kwargs):
+    reputation.review_removed(instance)
\ No newline at end of file
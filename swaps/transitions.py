@@ -0,0 +1,212 @@
+"""
+Swap request state machine.
+
+Every transition is a single conditional UPDATE that only matches while the
+swap is still in an allowed source state and the acting user may perform it.
+When two requests race, exactly one UPDATE matches a row; the other sees zero
+rows and is told how the race resolved instead of silently overwriting the
+winner. Side effects of a transition (the completion record and calendar
+session, the users' swap counters, the inbox) are applied in the same
+transaction, and counters are incremented with F() so concurrent completions
+never lose an update. A completion books its session through scheduling.book,
+so the overlap check runs with both participants locked; when the slot was
+taken in the meantime the whole transition is rolled back.
+"""
+from dataclasses import dataclass, field
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from . import inbox, scheduling
+from .models import SwapRequest, SwapTransaction
+from users import reputation
+
+# action: (allowed source statuses, target status, who may act)
+TRANSITIONS = {
+    'accept': (('pending',), 'accepted', 'requested'),
+    'reject': (('pending',), 'rejected', 'requested'),
+    'cancel': (('pending',), 'cancelled', 'requesting'),
+    'complete': (('accepted',), 'completed', 'participant'),
+    'expire': (('pending',), 'expired', 'system'),
+}
+
+# Actions that can be applied to many swaps at once; completing needs per-swap details
+BULK_ACTIONS = ('accept', 'reject', 'cancel', 'expire')
+MAX_BULK_SWAPS = 100
+# System actions run from batch commands rather than a form, so they may take larger batches
+MAX_SYSTEM_BULK_SWAPS = 500
+
+APPLIED = 'applied'
+ALREADY_APPLIED = 'already_applied'
+CONFLICT = 'conflict'
+NOT_FOUND = 'not_found'
+CLASH = 'clash'
+
+
+@dataclass
+class TransitionResult:
+    """Outcome of a transition attempt."""
+    action: str
+    outcome: str
+    swap: SwapRequest = None
+    previous_status: str = None
+    clashes: list = field(default_factory=list)
+    
+    @property
+    def applied(self):
+        return self.outcome == APPLIED
+    
+    @property
+    def message(self):
+        target = TRANSITIONS[self.action][1]
+        if self.outcome == APPLIED:
+            return f'Swap request {target}.'
+        if self.outcome == ALREADY_APPLIED:
+            return f'This swap request was already {target}.'
+        if self.outcome == CONFLICT:
+            return f'This swap request is {self.swap.status} and can no longer be {target}.'
+        if self.outcome == CLASH:
+            return 'Another session was booked at this time. Please pick a different slot.'
+        return 'Swap request not found.'
+
+
+@dataclass
+class BulkTransitionResult:
+    """Outcome of applying one action to many swaps, grouped by how each attempt resolved."""
+    action: str
+    applied: list = field(default_factory=list)
+    already_applied: list = field(default_factory=list)
+    conflicts: list = field(default_factory=list)
+    not_found: list = field(default_factory=list)
+    
+    @property
+    def skipped(self):
+        return len(self.already_applied) + len(self.conflicts) + len(self.not_found)
+
+
+def blocked(swap, action):
+    """Result for a swap that is not in a state ``action`` can start from."""
+    outcome = ALREADY_APPLIED if swap.status == TRANSITIONS[action][1] else CONFLICT
+    return TransitionResult(action, outcome, swap)
+
+
+def _changes(target, now):
+    changes = {'status': target, 'updated_at': now}
+    if target == 'accepted':
+        changes['accepted_at'] = now
+    elif target == 'completed':
+        changes['completed_at'] = now
+    return changes
+
+
+def _actor_filter(role, user):
+    if role == 'system':
+        return Q()
+    if role == 'requested':
+        return Q(requested_user=user)
+    if role == 'requesting':
+        return Q(requesting_user=user)
+    return Q(requested_user=user) | Q(requesting_user=user)
+
+
+def transition(swap_id, action, user, **details):
+    """
+    Move a swap request along ``action`` on behalf of ``user``.
+    
+    ``details`` are the SwapTransaction fields (start_date, end_date,
+    actual_duration, notes) and are only used by ``complete``. A completion
+    whose session clashes with another booking changes nothing and returns
+    a ``CLASH`` result carrying the conflicting sessions.
+    """
+    sources, target, role = TRANSITIONS[action]
+    swaps = SwapRequest.objects.filter(_actor_filter(role, user), id=swap_id)
+    changes = _changes(target, timezone.now())
+    
+    with transaction.atomic():
+        # Capture the source status as part of the match so the inbox knows what moved
+        for source in sources:
+            if swaps.filter(status=source).update(**changes):
+                break
+        else:
+            swap = swaps.first()
+            if swap is None:
+                return TransitionResult(action, NOT_FOUND)
+            return blocked(swap, action)
+        
+        swap = swaps.select_related('requesting_user', 'requested_user').get()
+        if target == 'completed':
+            clashes = scheduling.book(swap, details['start_date'], details['end_date'], 'completed')
+            if clashes:
+                transaction.set_rollback(True)
+                return TransitionResult(action, CLASH, swap, source, clashes)
+            SwapTransaction.objects.create(swap_request=swap, **details)
+            reputation.swap_completed(swap)
+        # update() bypasses the post_save handlers, so mirror the change here
+        inbox.swap_status_changed(swap, source)
+    return TransitionResult(action, APPLIED, swap, source)
+
+
+def bulk_limit(action):
+    """The most swaps ``bulk_transition`` takes at once for ``action``."""
+    return MAX_SYSTEM_BULK_SWAPS if TRANSITIONS[action][2] == 'system' else MAX_BULK_SWAPS
+
+
+def bulk_transition(swap_ids, action, user=None):
+    """
+    Apply ``action`` to many swaps in one transaction.
+    
+    ``user`` is the acting participant; system actions such as ``expire``
+    take none. At most ``bulk_limit(action)`` swaps are accepted per call.
+    
+    The candidate rows are locked (on databases that support it) and their
+    status read first, so each source status moves exactly the ids read for
+    it, and swaps that another request moved first are reported as in
+    ``transition``.
+    """
+    if action not in BULK_ACTIONS:
+        raise ValueError(f'{action} cannot be applied in bulk.')
+    sources, target, role = TRANSITIONS[action]
+    swap_ids = set(swap_ids)
+    if len(swap_ids) > bulk_limit(action):
+        raise ValueError(f'At most {bulk_limit(action)} swaps can be {target} at once.')
+    swaps = SwapRequest.objects.filter(_actor_filter(role, user), id__in=swap_ids)
+    changes = _changes(target, timezone.now())
+    result = BulkTransitionResult(action)
+    
+    with transaction.atomic():
+        statuses = dict(swaps.select_for_update().order_by('id').values_list('id', 'status'))
+        moved_from = {}
+        for source in sources:
+            ids = [swap_id for swap_id, status in statuses.items() if status == source]
+            if ids:
+                swaps.filter(id__in=ids).update(**changes)
+                moved_from.update(dict.fromkeys(ids, source))
+        
+        found = SwapRequest.objects.filter(id__in=statuses).select_related('requesting_user', 'requested_user')
+        for swap in found.order_by('id'):
+            if swap.id in moved_from:
+                result.applied.append(swap)
+            elif blocked(swap, action).outcome == ALREADY_APPLIED:
+                result.already_applied.append(swap)
+            else:
+                result.conflicts.append(swap)
+        for source in sources:
+            inbox.swaps_status_changed([swap for swap in result.applied if moved_from[swap.id] == source], source, target)
+        result.not_found = sorted(swap_ids - statuses.keys())
+    return result
+
+
+def accept(swap_id, user):
+    return transition(swap_id, 'accept', user)
+
+
+def reject(swap_id, user):
+    return transition(swap_id, 'reject', user)
+
+
+def cancel(swap_id, user):
+    return transition(swap_id, 'cancel', user)
+
+
+def complete(swap_id, user, **details):
+    return transition(swap_id, 'complete', user, **details)
\ No newline at end of file
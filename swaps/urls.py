@@ -11,6 +11,10 @@ urlpatterns = [
     path('<int:swap_id>/reject/', views.swap_reject, name='swap_reject'),
     path('<int:swap_id>/complete/', views.swap_complete, name='swap_complete'),
     path('<int:swap_id>/cancel/', views.swap_cancel, name='swap_cancel'),
+    path('<int:swap_id>/schedule/', views.swap_schedule, name='swap_schedule'),
+    path('bulk/', views.swap_bulk_action, name='swap_bulk_action'),
     path('sent/', views.sent_requests, name='sent_requests'),
     path('received/', views.received_requests, name='received_requests'),
+    path('matches/', views.match_list, name='match_list'),
+    path('calendar/', views.my_calendar, name='my_calendar'),
 ] 
\ No newline at end of file
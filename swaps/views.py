@@ -1,14 +1,20 @@
+from datetime import timedelta
+
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.db.models import Q
-from django.core.paginator import Paginator
 from django.http import JsonResponse
 from django.utils import timezone
-from .models import SwapRequest, SwapTransaction, SwapReview
-from .forms import SwapRequestForm, SwapReviewForm, SwapTransactionForm
+from django.utils.dateparse import parse_datetime
+from django.urls import reverse
+from .models import SwapRequest, SwapReview
+from . import inbox, scheduling, transitions
+from .matching import top_matches
+from .forms import SwapBulkActionForm, SwapRequestForm, SwapReviewForm, SwapSessionForm, SwapTransactionForm
 from skills.models import SkillListing
-from users.models import Notification
+from users.notifications import notification, notify, notify_many
+from skillexchange.pagination import paginate
 
 
 @login_required
@@ -42,13 +48,10 @@ def swap_request_create(request, skill_id):
             swap_request.save()
             
             # Create notification for the requested user
-            Notification.objects.create(
-                user=skill.user,
-                notification_type='swap_request',
-                title='New Swap Request',
-                message=f'{request.user.get_full_name()} wants to swap skills with you.',
-                related_object_id=swap_request.id,
-                related_object_type='SwapRequest'
+            notify(
+                skill.user, 'swap_request', 'New Swap Request',
+                f'{request.user.get_full_name()} wants to swap skills with you.',
+                related=swap_request, coalesce=True,
             )
             
             messages.success(request, 'Swap request sent successfully!')
@@ -63,22 +66,31 @@ def swap_request_create(request, skill_id):
     return render(request, 'swaps/swap_request_form.html', context)
 
 
-@login_required
-def swap_list(request):
-    """List user's swap requests."""
-    # Get all swap requests where user is involved
-    swap_requests = SwapRequest.objects.filter(
-        Q(requesting_user=request.user) | Q(requested_user=request.user)
-    ).order_by('-created_at')
-    
-    # Pagination
-    paginator = Paginator(swap_requests, 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+def _inbox_page(request, role=None):
+    """Context for a swap list page: one status tab of the user's inbox plus the tab counts."""
+    status = request.GET.get('status')
+    if status not in inbox.STATUSES:
+        status = None
     
+    swap_counts = inbox.counts(request.user)
+    swap_requests = inbox.swap_requests_for(request.user, role, status)
+    page_obj = paginate(
+        request, swap_requests, 10, ordering=inbox.ORDERING, count=swap_counts[role or 'all'][status or 'all'],
+    )
     context = {
         'page_obj': page_obj,
+        'swap_counts': swap_counts,
+        'current_status': status,
     }
+    if role:
+        context['bulk_form'] = SwapBulkActionForm(user=request.user, role=role)
+    return context
+
+
+@login_required
+def swap_list(request):
+    """List user's swap requests."""
+    context = _inbox_page(request)
     return render(request, 'swaps/swap_list.html', context)
 
 
@@ -124,20 +136,19 @@ def swap_detail(request, swap_id):
 @login_required
 def swap_accept(request, swap_id):
     """Accept a swap request."""
-    swap_request = get_object_or_404(SwapRequest, id=swap_id, requested_user=request.user, status='pending')
+    swap_request = get_object_or_404(SwapRequest, id=swap_id, requested_user=request.user)
     
     if request.method == 'POST':
-        swap_request.status = 'accepted'
-        swap_request.save()
+        result = transitions.accept(swap_request.id, request.user)
+        if not result.applied:
+            messages.warning(request, result.message)
+            return redirect('swaps:swap_detail', swap_id=swap_request.id)
         
         # Create notification for the requesting user
-        Notification.objects.create(
-            user=swap_request.requesting_user,
-            notification_type='swap_accepted',
-            title='Swap Request Accepted',
-            message=f'{request.user.get_full_name()} accepted your swap request.',
-            related_object_id=swap_request.id,
-            related_object_type='SwapRequest'
+        notify(
+            result.swap.requesting_user, 'swap_accepted', 'Swap Request Accepted',
+            f'{request.user.get_full_name()} accepted your swap request.',
+            related=result.swap, coalesce=True,
         )
         
         messages.success(request, 'Swap request accepted!')
@@ -149,20 +160,19 @@ def swap_accept(request, swap_id):
 @login_required
 def swap_reject(request, swap_id):
     """Reject a swap request."""
-    swap_request = get_object_or_404(SwapRequest, id=swap_id, requested_user=request.user, status='pending')
+    swap_request = get_object_or_404(SwapRequest, id=swap_id, requested_user=request.user)
     
     if request.method == 'POST':
-        swap_request.status = 'rejected'
-        swap_request.save()
+        result = transitions.reject(swap_request.id, request.user)
+        if not result.applied:
+            messages.warning(request, result.message)
+            return redirect('swaps:swap_detail', swap_id=swap_request.id)
         
         # Create notification for the requesting user
-        Notification.objects.create(
-            user=swap_request.requesting_user,
-            notification_type='swap_rejected',
-            title='Swap Request Rejected',
-            message=f'{request.user.get_full_name()} rejected your swap request.',
-            related_object_id=swap_request.id,
-            related_object_type='SwapRequest'
+        notify(
+            result.swap.requesting_user, 'swap_rejected', 'Swap Request Rejected',
+            f'{request.user.get_full_name()} rejected your swap request.',
+            related=result.swap, coalesce=True,
         )
         
         messages.success(request, 'Swap request rejected.')
@@ -177,31 +187,28 @@ def swap_complete(request, swap_id):
     swap_request = get_object_or_404(
         SwapRequest, 
         Q(requesting_user=request.user) | Q(requested_user=request.user),
-        id=swap_id, 
-        status='accepted'
+        id=swap_id
     )
+    if swap_request.status != 'accepted':
+        messages.warning(request, transitions.blocked(swap_request, 'complete').message)
+        return redirect('swaps:swap_detail', swap_id=swap_request.id)
     
     if request.method == 'POST':
-        form = SwapTransactionForm(request.POST)
+        form = SwapTransactionForm(request.POST, swap_request=swap_request)
         if form.is_valid():
-            transaction = form.save(commit=False)
-            transaction.swap_request = swap_request
-            transaction.save()
-            
-            swap_request.status = 'completed'
-            swap_request.completed_at = timezone.now()
-            swap_request.save()
-            
-            # Update user swap counts
-            swap_request.requesting_user.total_swaps += 1
-            swap_request.requesting_user.save()
-            swap_request.requested_user.total_swaps += 1
-            swap_request.requested_user.save()
-            
-            messages.success(request, 'Swap marked as completed!')
-            return redirect('swaps:swap_detail', swap_id=swap_request.id)
+            # Counters, the transaction record and the status change happen atomically;
+            # the form's overlap check is advisory, the transition books the session locked
+            result = transitions.complete(swap_request.id, request.user, **form.cleaned_data)
+            if result.outcome == transitions.CLASH:
+                form.add_error(None, result.message)
+            else:
+                if result.applied:
+                    messages.success(request, 'Swap marked as completed!')
+                else:
+                    messages.warning(request, result.message)
+                return redirect('swaps:swap_detail', swap_id=swap_request.id)
     else:
-        form = SwapTransactionForm()
+        form = SwapTransactionForm(swap_request=swap_request)
     
     context = {
         'form': form,
@@ -210,52 +217,171 @@ def swap_complete(request, swap_id):
     return render(request, 'swaps/swap_complete_form.html', context)
 
 
+@login_required
+def swap_schedule(request, swap_id):
+    """Schedule the session of an accepted swap on both participants' calendars."""
+    swap_request = get_object_or_404(
+        SwapRequest, 
+        Q(requesting_user=request.user) | Q(requested_user=request.user),
+        id=swap_id
+    )
+    if swap_request.status != 'accepted':
+        messages.warning(request, 'Only accepted swaps can be scheduled.')
+        return redirect('swaps:swap_detail', swap_id=swap_request.id)
+    
+    if request.method == 'POST':
+        form = SwapSessionForm(request.POST, swap_request=swap_request)
+        if form.is_valid():
+            # The form check is advisory; book() repeats it with the participants locked
+            clashes = scheduling.book(swap_request, form.cleaned_data['start'], form.cleaned_data['end'])
+            if not clashes:
+                messages.success(request, 'Swap session scheduled!')
+                return redirect('swaps:swap_detail', swap_id=swap_request.id)
+            form.add_error(None, 'Another session was booked at this time. Please pick a different slot.')
+    else:
+        form = SwapSessionForm(swap_request=swap_request)
+    
+    context = {
+        'form': form,
+        'swap_request': swap_request,
+        'sessions': swap_request.sessions.filter(user=request.user),
+    }
+    return render(request, 'swaps/swap_schedule_form.html', context)
+
+
 @login_required
 def swap_cancel(request, swap_id):
     """Cancel a swap request."""
     swap_request = get_object_or_404(
         SwapRequest, 
         id=swap_id, 
-        requesting_user=request.user,
-        status='pending'
+        requesting_user=request.user
     )
     
     if request.method == 'POST':
-        swap_request.status = 'cancelled'
-        swap_request.save()
+        result = transitions.cancel(swap_request.id, request.user)
+        if not result.applied:
+            messages.warning(request, result.message)
+            return redirect('swaps:swap_detail', swap_id=swap_request.id)
         messages.success(request, 'Swap request cancelled.')
         return redirect('swaps:swap_list')
     
     return redirect('swaps:swap_detail', swap_id=swap_request.id)
 
 
+BULK_NOTIFICATIONS = {
+    'accept': ('swap_accepted', 'Swap Request Accepted', 'accepted'),
+    'reject': ('swap_rejected', 'Swap Request Rejected', 'rejected'),
+}
+
+
 @login_required
-def sent_requests(request):
-    """View sent swap requests."""
-    requests = SwapRequest.objects.filter(requesting_user=request.user).order_by('-created_at')
+def swap_bulk_action(request):
+    """Accept, reject or cancel several swap requests in one transaction."""
+    if request.method != 'POST':
+        return redirect('swaps:swap_list')
     
-    # Pagination
-    paginator = Paginator(requests, 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    form = SwapBulkActionForm(request.POST, user=request.user)
+    if not form.is_valid():
+        for errors in form.errors.values():
+            messages.error(request, errors[0])
+        return redirect('swaps:swap_list')
     
-    context = {
-        'page_obj': page_obj,
-    }
+    action = form.cleaned_data['action']
+    swap_ids = [swap.id for swap in form.cleaned_data['swap_requests']]
+    result = transitions.bulk_transition(swap_ids, action, request.user)
+    
+    if action in BULK_NOTIFICATIONS:
+        notification_type, title, verb = BULK_NOTIFICATIONS[action]
+        notify_many([
+            notification(
+                swap.requesting_user, notification_type, title,
+                f'{request.user.get_full_name()} {verb} your swap request.',
+                related=swap, coalesce=True,
+            )
+            for swap in result.applied
+        ])
+    
+    target = transitions.TRANSITIONS[action][1]
+    if result.applied:
+        messages.success(request, f'{len(result.applied)} swap requests {target}.')
+    if result.skipped:
+        messages.warning(request, f'{result.skipped} swap requests could not be {target} and were skipped.')
+    return redirect('swaps:sent_requests' if action == 'cancel' else 'swaps:received_requests')
+
+
+@login_required
+def sent_requests(request):
+    """View sent swap requests."""
+    context = _inbox_page(request, role='sent')
     return render(request, 'swaps/sent_requests.html', context)
 
 
 @login_required
 def received_requests(request):
     """View received swap requests."""
-    requests = SwapRequest.objects.filter(requested_user=request.user).order_by('-created_at')
+    context = _inbox_page(request, role='received')
+    return render(request, 'swaps/received_requests.html', context) 
+
+
+@login_required
+def match_list(request):
+    """Reciprocal skill matches for the current user, as JSON."""
+    try:
+        limit = min(int(request.GET.get('limit', 20)), 100)
+    except ValueError:
+        limit = 20
     
-    # Pagination
-    paginator = Paginator(requests, 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    matches = [
+        {
+            'user_id': match.matched_user_id,
+            'name': match.matched_user.get_full_name(),
+            'score': match.score,
+            'they_offer_count': match.wanted_count,
+            'they_request_count': match.offered_count,
+            'url': reverse('users:user_detail', args=[match.matched_user_id]),
+        }
+        for match in top_matches(request.user, limit)
+    ]
+    return JsonResponse({'matches': matches})
+
+
+@login_required
+def my_calendar(request):
+    """The user's swap sessions between ``start`` and ``end`` (ISO 8601), as JSON."""
+    now = timezone.now()
+    start = _parse_calendar_bound(request.GET.get('start')) or now
+    end = _parse_calendar_bound(request.GET.get('end')) or start + timedelta(days=30)
+    if end <= start:
+        return JsonResponse({'error': 'end must be after start.'}, status=400)
+    end = min(end, start + scheduling.MAX_CALENDAR_RANGE)
     
-    context = {
-        'page_obj': page_obj,
-    }
-    return render(request, 'swaps/received_requests.html', context) 
\ No newline at end of file
+    sessions = [
+        {
+            'swap_id': session.swap_request_id,
+            'start': session.start.isoformat(),
+            'end': session.end.isoformat(),
+            'status': session.status,
+            'with': (
+                session.swap_request.requested_user
+                if session.swap_request.requesting_user_id == request.user.id
+                else session.swap_request.requesting_user
+            ).get_full_name(),
+            'skills': [session.swap_request.requesting_skill.title, session.swap_request.requested_skill.title],
+            'url': reverse('swaps:swap_detail', args=[session.swap_request_id]),
+        }
+        for session in scheduling.calendar(request.user, start, end)
+    ]
+    return JsonResponse({'start': start.isoformat(), 'end': end.isoformat(), 'sessions': sessions})
+
+
+def _parse_calendar_bound(value):
+    if not value:
+        return None
+    try:
+        parsed = parse_datetime(value)
+    except ValueError:
+        return None
+    if parsed is not None and timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
\ No newline at end of file
@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from .models import User, UserProfile, Notification
+from .models import ArchivedNotification, User, UserProfile, Notification
 
 
 @admin.register(User)
@@ -9,11 +9,13 @@ class CustomUserAdmin(UserAdmin):
     list_filter = ['is_verified', 'is_staff', 'is_active', 'date_joined']
     search_fields = ['email', 'username', 'first_name', 'last_name']
     ordering = ['-date_joined']
+    # Maintained by users.reputation; edit reviews and swaps instead
+    readonly_fields = ['rating', 'rating_count', 'total_swaps']
     
     fieldsets = (
         (None, {'fields': ('email', 'username', 'password')}),
         ('Personal info', {'fields': ('first_name', 'last_name', 'bio', 'location', 'profile_picture')}),
-        ('Status', {'fields': ('is_verified', 'rating', 'total_swaps')}),
+        ('Status', {'fields': ('is_verified', 'rating', 'rating_count', 'total_swaps')}),
         ('Permissions', {'fields': ('is_active', 'is_staff', 'is_superuser', 'groups', 'user_permissions')}),
         ('Important dates', {'fields': ('last_login', 'date_joined')}),
     )
@@ -36,8 +38,17 @@ class UserProfileAdmin(admin.ModelAdmin):
 
 @admin.register(Notification)
 class NotificationAdmin(admin.ModelAdmin):
-    list_display = ['user', 'notification_type', 'title', 'is_read', 'created_at']
+    list_display = ['user', 'notification_type', 'title', 'event_count', 'is_read', 'last_event_at']
     list_filter = ['notification_type', 'is_read', 'created_at']
     search_fields = ['user__email', 'title', 'message']
-    ordering = ['-created_at']
-    readonly_fields = ['created_at'] 
\ No newline at end of file
+    ordering = ['-last_event_at']
+    readonly_fields = ['created_at', 'last_event_at', 'event_count', 'coalesce_key']
+
+
+@admin.register(ArchivedNotification)
+class ArchivedNotificationAdmin(admin.ModelAdmin):
+    list_display = ['user', 'notification_type', 'title', 'event_count', 'last_event_at', 'archived_at']
+    list_filter = ['notification_type', 'archived_at']
+    search_fields = ['user__email', 'title', 'message']
+    ordering = ['-last_event_at']
+    readonly_fields = ['created_at', 'last_event_at', 'archived_at']
\ No newline at end of file
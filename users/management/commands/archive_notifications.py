@@ -0,0 +1,65 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from users import retention
+
+
+class Command(BaseCommand):
+    help = (
+        'Move read notifications older than the retention period to the archive table, in primary-key '
+        'batches. Each batch commits on its own, so an interrupted run resumes where it stopped when run again.'
+    )
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.NOTIFICATION_RETENTION_DAYS,
+                            help='Archive read notifications whose last event is older than this many days.')
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help='Notifications moved per transaction, capped at what one statement can take.')
+        parser.add_argument('--sleep', type=float, default=0.0,
+                            help='Seconds to pause between batches, to leave room for site traffic.')
+        parser.add_argument('--limit', type=int, help='Stop after moving this many notifications.')
+        parser.add_argument('--delete', action='store_true', help='Delete the notifications instead of archiving them.')
+        parser.add_argument('--dry-run', action='store_true', help='Count the notifications that would be moved.')
+    
+    def handle(self, *args, **options):
+        before = retention.cutoff(options['days'])
+        batch_size = min(max(options['batch_size'], 1), retention.max_batch_size())
+        if batch_size < options['batch_size']:
+            self.stdout.write(self.style.WARNING(f'Batch size capped at {batch_size}, the most one statement can take.'))
+        limit = options['limit']
+        keep = not options['delete']
+        
+        started = time.perf_counter()
+        last_id = 0
+        moved = batches = 0
+        while limit is None or moved < limit:
+            size = batch_size if limit is None else min(batch_size, limit - moved)
+            notification_ids = retention.next_batch(before, last_id, size)
+            if not notification_ids:
+                break
+            last_id = notification_ids[-1]
+            batches += 1
+            
+            if options['dry_run']:
+                moved += len(notification_ids)
+                continue
+            removed = retention.archive(notification_ids, before, keep=keep)
+            moved += removed
+            
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f'batch {batches}: {removed} moved through id {last_id} ({moved} total, {moved / elapsed:.0f}/s)'
+            )
+            if options['sleep']:
+                time.sleep(options['sleep'])
+        
+        elapsed = time.perf_counter() - started
+        if options['dry_run']:
+            verb = 'Would archive' if keep else 'Would delete'
+        else:
+            verb = 'Archived' if keep else 'Deleted'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} {moved} read notifications older than {before:%Y-%m-%d %H:%M} in {batches} batches, '
+            f'{elapsed:.1f}s ({moved / elapsed if elapsed else 0:.0f}/s).'
+        ))
\ No newline at end of file
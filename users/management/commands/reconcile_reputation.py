@@ -0,0 +1,31 @@
+from collections import Counter
+
+from django.core.management.base import BaseCommand, CommandError
+from users.reputation import reconcile
+
+
+class Command(BaseCommand):
+    help = 'Recompute every user\'s rating and total_swaps from reviews and completed swaps, and report drift.'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Users checked per batch.')
+        parser.add_argument('--check', action='store_true',
+                            help='Only report drift without fixing it; exits non-zero if any is found.')
+    
+    def handle(self, *args, **options):
+        fields = Counter()
+        
+        def on_drift(user_id, differences):
+            fields.update(differences)
+            if options['verbosity'] > 1:
+                details = ', '.join(f'{name} {stored} -> {expected}' for name, (stored, expected) in differences.items())
+                self.stdout.write(f'user {user_id}: {details}')
+        
+        checked, drifted = reconcile(batch_size=options['batch_size'], fix=not options['check'], on_drift=on_drift)
+        for name, count in sorted(fields.items()):
+            self.stdout.write(f'{name:<14} {count} users drifted')
+        
+        if options['check'] and drifted:
+            raise CommandError(f'{drifted} of {checked} users have drifted reputation.')
+        verb = 'Found' if options['check'] else 'Fixed'
+        self.stdout.write(self.style.SUCCESS(f'Checked {checked} users. {verb} drift on {drifted}.'))
\ No newline at end of file
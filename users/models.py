@@ -11,7 +11,10 @@ class User(AbstractUser):
     location = models.CharField(max_length=100, blank=True)
     profile_picture = models.ImageField(upload_to='profile_pics/', blank=True, null=True)
     is_verified = models.BooleanField(default=False)
+    # Reputation, maintained incrementally by users.reputation
     rating = models.DecimalField(max_digits=3, decimal_places=2, default=0.00)
+    rating_sum = models.PositiveIntegerField(default=0)
+    rating_count = models.PositiveIntegerField(default=0)
     total_swaps = models.PositiveIntegerField(default=0)
     date_joined = models.DateTimeField(default=timezone.now)
     
@@ -40,12 +43,17 @@ class UserProfile(models.Model):
         return f"{self.user.email} Profile"
 
 
+# Notifications that new events with the same coalesce key are folded into
+COALESCING = models.Q(is_read=False) & ~models.Q(coalesce_key='')
+
+
 class Notification(models.Model):
     """User notifications for various events."""
     NOTIFICATION_TYPES = [
         ('swap_request', 'Swap Request'),
         ('swap_accepted', 'Swap Accepted'),
         ('swap_rejected', 'Swap Rejected'),
+        ('swap_expired', 'Swap Expired'),
         ('message', 'New Message'),
         ('announcement', 'Platform Announcement'),
         ('review', 'New Review'),
@@ -59,10 +67,53 @@ class Notification(models.Model):
     is_read = models.BooleanField(default=False)
     related_object_id = models.PositiveIntegerField(null=True, blank=True)
     related_object_type = models.CharField(max_length=50, blank=True)
+    # Events with the same key are folded into one unread notification; blank never coalesces
+    coalesce_key = models.CharField(max_length=100, blank=True)
+    event_count = models.PositiveIntegerField(default=1)
     created_at = models.DateTimeField(auto_now_add=True)
+    last_event_at = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        ordering = ['-last_event_at']
+        indexes = [
+            models.Index(fields=['user', 'is_read', '-last_event_at'], name='users_notification_inbox_idx'),
+            models.Index(fields=['user', '-last_event_at'], name='users_notification_user_idx'),
+            models.Index(
+                fields=['user'],
+                condition=models.Q(is_read=False),
+                name='users_notification_unread_idx',
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'coalesce_key'],
+                condition=COALESCING,
+                name='users_notification_coalesce_uniq',
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.user.email} - {self.title}"
+
+
+class ArchivedNotification(models.Model):
+    """A read notification moved out of the Notification table by ``archive_notifications``."""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_notifications')
+    notification_type = models.CharField(max_length=20, choices=Notification.NOTIFICATION_TYPES)
+    title = models.CharField(max_length=200)
+    message = models.TextField()
+    related_object_id = models.PositiveIntegerField(null=True, blank=True)
+    related_object_type = models.CharField(max_length=50, blank=True)
+    event_count = models.PositiveIntegerField(default=1)
+    created_at = models.DateTimeField()
+    last_event_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
-        ordering = ['-created_at']
+        ordering = ['-last_event_at']
+        indexes = [
+            models.Index(fields=['user', '-last_event_at'], name='users_archived_user_idx'),
+        ]
     
     def __str__(self):
-        return f"{self.user.email} - {self.title}" 
\ No newline at end of file
+        return f"{self.user.email} - {self.title} (archived)"
\ No newline at end of file
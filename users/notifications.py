@@ -0,0 +1,139 @@
+"""
+Queued notifications.
+
+Views describe a notification with ``notification()`` and hand it to
+``notify`` or ``notify_many``, which queue it as a background job instead of
+writing the Notification row while the user waits. The job pushes it to the
+user's open streams once the row is committed, so a client that refetches on
+the event sees it; with a separate run_jobs worker that takes a PUSH_BROKER
+that relays between processes.
+
+Notifications created with ``coalesce=True`` fold into the user's unread
+notification about the same object: a busy conversation keeps one unread
+"New Message" row whose ``event_count`` and ``last_event_at`` move with
+every message. Each batch of such events is written with a single
+INSERT ... ON CONFLICT DO UPDATE against the partial unique constraint on
+unread (user, coalesce_key) rows.
+"""
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F
+from django.db.models.sql import Query
+from django.utils import timezone
+from jobs import queue
+from skillexchange import badges, push
+from .models import COALESCING, Notification
+
+UPSERT_VENDORS = ('sqlite', 'postgresql')
+
+
+def notification(user, notification_type, title, message, related=None, coalesce=False):
+    """
+    The payload for one notification; ``related`` is the object it refers to.
+    
+    With ``coalesce``, the notification is folded into the user's unread
+    notification about the same ``related`` object, if there is one.
+    """
+    related_type = type(related).__name__ if related is not None else ''
+    return {
+        'user_id': getattr(user, 'id', user),
+        'notification_type': notification_type,
+        'title': title,
+        'message': message,
+        'related_object_id': related.id if related is not None else None,
+        'related_object_type': related_type,
+        'coalesce_key': f'{related_type}:{related.id}' if coalesce and related is not None else '',
+    }
+
+
+def notify(user, notification_type, title, message, related=None, coalesce=False):
+    notify_many([notification(user, notification_type, title, message, related, coalesce)])
+
+
+def notify_many(payloads):
+    queue.enqueue_many(create_notifications, payloads)
+
+
+def _merge_events(payloads):
+    """One ``(payload, event_count)`` per user and coalesce key, keeping the latest payload."""
+    merged = {}
+    for payload in payloads:
+        key = (payload['user_id'], payload['coalesce_key'])
+        merged[key] = (payload, merged[key][1] + 1 if key in merged else 1)
+    return list(merged.values())
+
+
+def _condition_sql():
+    """The constraint's WHERE clause, compiled the way the schema editor compiles it."""
+    query = Query(model=Notification, alias_cols=False)
+    compiler = query.get_compiler(connection=connection)
+    sql, params = query.build_where(COALESCING).as_sql(compiler, connection)
+    # ON CONFLICT only picks a partial index whose predicate matches, so inline the values
+    schema_editor = connection.schema_editor()
+    return sql % tuple(schema_editor.quote_value(param) for param in params)
+
+
+def _upsert(rows, now):
+    fields = [
+        'user_id', 'notification_type', 'title', 'message', 'related_object_id', 'related_object_type',
+        'coalesce_key', 'is_read', 'event_count', 'created_at', 'last_event_at',
+    ]
+    values = []
+    for payload, event_count in rows:
+        row = dict(payload, is_read=False, event_count=event_count, created_at=now, last_event_at=now)
+        values.extend(row[name] for name in fields)
+    
+    qn = connection.ops.quote_name
+    table = qn(Notification._meta.db_table)
+    placeholders = ', '.join(['(' + ', '.join(['%s'] * len(fields)) + ')'] * len(rows))
+    replaced = ['notification_type', 'title', 'message', 'last_event_at']
+    sql = (
+        f"INSERT INTO {table} ({', '.join(qn(name) for name in fields)}) VALUES {placeholders} "
+        f"ON CONFLICT ({qn('user_id')}, {qn('coalesce_key')}) WHERE {_condition_sql()} DO UPDATE SET "
+        + ', '.join(f'{qn(name)} = EXCLUDED.{qn(name)}' for name in replaced)
+        + f", {qn('event_count')} = {table}.{qn('event_count')} + EXCLUDED.{qn('event_count')}"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, values)
+
+
+def _update_or_create(rows, now):
+    """Fallback for databases without ON CONFLICT ... WHERE: one conditional UPDATE, else INSERT, per row."""
+    for payload, event_count in rows:
+        unread = Notification.objects.filter(COALESCING, user_id=payload['user_id'], coalesce_key=payload['coalesce_key'])
+        changes = {
+            'notification_type': payload['notification_type'], 'title': payload['title'],
+            'message': payload['message'], 'last_event_at': now, 'event_count': F('event_count') + event_count,
+        }
+        if unread.update(**changes):
+            continue
+        try:
+            with transaction.atomic():
+                Notification.objects.create(**payload, event_count=event_count, last_event_at=now)
+        except IntegrityError:
+            # Another worker inserted the row first
+            unread.update(**changes)
+
+
+def coalesce(payloads):
+    """Fold coalescing notifications into the matching unread rows, inserting those that have none."""
+    rows = _merge_events(payloads)
+    if not rows:
+        return
+    if connection.vendor in UPSERT_VENDORS:
+        _upsert(rows, timezone.now())
+    else:
+        _update_or_create(rows, timezone.now())
+
+
+@queue.task(batch=True)
+def create_notifications(payloads):
+    Notification.objects.bulk_create([
+        Notification(**payload) for payload in payloads if not payload.get('coalesce_key')
+    ])
+    coalesce([payload for payload in payloads if payload.get('coalesce_key')])
+    # Neither bulk_create nor the upsert run the post_save handlers
+    badges.bump(*{f"notifications:{payload['user_id']}" for payload in payloads})
+    for payload in payloads:
+        push.publish([payload['user_id']], 'notification', {
+            key: payload[key] for key in ('notification_type', 'title', 'message', 'related_object_id', 'related_object_type')
+        })
\ No newline at end of file
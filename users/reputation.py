@@ -0,0 +1,136 @@
+"""
+Denormalized reputation for users.
+
+Every User stores the sum and count of the swap review ratings they received,
+the resulting average in ``rating``, and the number of swaps they completed in
+``total_swaps``. Reviews and completions adjust those columns with a single
+UPDATE, so recording one costs O(1) no matter how many reviews the user has.
+``reconcile`` recomputes everything from the review and swap tables to repair
+drift, e.g. from a stale User instance being saved over a concurrent update.
+"""
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.db.models import Case, Count, DecimalField, F, FloatField, Sum, Value, When
+from django.db.models.functions import Cast
+from .models import User
+from swaps.models import SwapRequest, SwapReview
+
+RATING_FIELD = DecimalField(max_digits=3, decimal_places=2)
+FIELDS = ['rating', 'rating_sum', 'rating_count', 'total_swaps']
+
+
+def average(rating_sum, rating_count):
+    if not rating_count:
+        return Decimal('0.00')
+    return (Decimal(rating_sum) / rating_count).quantize(Decimal('0.01'), ROUND_HALF_UP)
+
+
+def apply_rating(user_id, rating, sign=1):
+    """Add (sign=1) or remove (sign=-1) one received review of ``rating`` stars."""
+    count = F('rating_count') + sign
+    total = F('rating_sum') + sign * rating
+    
+    # Every expression in an UPDATE sees the pre-update row, so the average is
+    # computed from the same new count and sum that are being written.
+    User.objects.filter(id=user_id).update(
+        rating_count=count,
+        rating_sum=total,
+        rating=Case(
+            When(rating_count__gt=-sign, then=Cast(Cast(total, FloatField()) / count, RATING_FIELD)),
+            default=Value(Decimal('0.00')),
+            output_field=RATING_FIELD,
+        ),
+    )
+
+
+def review_added(review):
+    apply_rating(review.reviewed_user_id, review.rating, 1)
+
+
+def review_removed(review):
+    loaded = getattr(review, '_loaded_values', {})
+    apply_rating(loaded.get('reviewed_user_id', review.reviewed_user_id), loaded.get('rating', review.rating), -1)
+
+
+def review_changed(review):
+    """Move an edited review's contribution if its rating or reviewed user changed."""
+    loaded = getattr(review, '_loaded_values', None)
+    if not loaded:
+        return
+    
+    old_user_id, old_rating = loaded['reviewed_user_id'], loaded['rating']
+    if (old_user_id, old_rating) == (review.reviewed_user_id, review.rating):
+        return
+    
+    apply_rating(old_user_id, old_rating, -1)
+    apply_rating(review.reviewed_user_id, review.rating, 1)
+    review._loaded_values.update(reviewed_user_id=review.reviewed_user_id, rating=review.rating)
+
+
+def swap_completed(swap):
+    """Count a completed swap for both participants."""
+    User.objects.filter(id__in=[swap.requesting_user_id, swap.requested_user_id]).update(
+        total_swaps=F('total_swaps') + 1
+    )
+
+
+def _expected(user_ids):
+    """Recompute the reputation of a batch of users with three grouped aggregate queries."""
+    expected = {user_id: {'rating_sum': 0, 'rating_count': 0, 'total_swaps': 0} for user_id in user_ids}
+    reviews = SwapReview.objects.filter(reviewed_user_id__in=user_ids).values('reviewed_user_id').annotate(
+        rating_sum=Sum('rating'), rating_count=Count('id'),
+    ).order_by()
+    for row in reviews:
+        expected[row['reviewed_user_id']].update(rating_sum=row['rating_sum'], rating_count=row['rating_count'])
+    
+    completed = SwapRequest.objects.filter(status='completed')
+    for column in ('requesting_user_id', 'requested_user_id'):
+        rows = completed.filter(**{f'{column}__in': user_ids}).values(column).annotate(swaps=Count('id')).order_by()
+        for row in rows:
+            expected[row[column]]['total_swaps'] += row['swaps']
+    
+    for values in expected.values():
+        values['rating'] = average(values['rating_sum'], values['rating_count'])
+    return expected
+
+
+def reconcile(batch_size=1000, fix=True, on_drift=None):
+    """
+    Compare every user's stored reputation with the review and swap tables.
+    
+    Users are processed in primary-key batches; only users whose values
+    drifted are written back, with one bulk update per batch. ``on_drift`` is
+    called with ``(user_id, {field: (stored, expected)})`` for each of them.
+    Returns ``(users_checked, users_drifted)``.
+    """
+    checked = 0
+    drifted = 0
+    last_id = 0
+    
+    while True:
+        users = list(User.objects.filter(id__gt=last_id).order_by('id').only('id', *FIELDS)[:batch_size])
+        if not users:
+            break
+        last_id = users[-1].id
+        checked += len(users)
+        
+        expected = _expected([user.id for user in users])
+        changed = []
+        for user in users:
+            differences = {
+                name: (getattr(user, name), value)
+                for name, value in expected[user.id].items()
+                if getattr(user, name) != value
+            }
+            if differences:
+                drifted += 1
+                if on_drift:
+                    on_drift(user.id, differences)
+                for name, (stored, value) in differences.items():
+                    setattr(user, name, value)
+                changed.append(user)
+        
+        if fix and changed:
+            User.objects.bulk_update(changed, FIELDS)
+    
+    return checked, drifted
\ No newline at end of file
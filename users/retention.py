@@ -0,0 +1,60 @@
+"""
+Retention for the Notification table.
+
+Read notifications whose last event is older than the retention period move
+to ArchivedNotification, or are deleted outright, in primary-key batches
+that each commit on their own. Unread notifications are never touched, so
+the hot table only holds what users still act on plus a short tail of
+history, while the archive keeps older history out of the unread queries.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+from .models import ArchivedNotification, Notification
+
+ARCHIVED_FIELDS = [
+    'user_id', 'notification_type', 'title', 'message', 'related_object_id', 'related_object_type',
+    'event_count', 'created_at', 'last_event_at',
+]
+
+
+def max_batch_size():
+    """
+    The largest batch ``archive`` can take: its ids are sent as one ``IN``
+    list alongside the two parameters of the expiry filter.
+    """
+    # PostgreSQL reports no limit, but its wire protocol caps a statement at 65535 parameters
+    return (connection.features.max_query_params or 65535) - 2
+
+
+def cutoff(days=None):
+    return timezone.now() - timedelta(days=settings.NOTIFICATION_RETENTION_DAYS if days is None else days)
+
+
+def expired(before):
+    """Read notifications whose last event happened before ``before``."""
+    return Notification.objects.filter(is_read=True, last_event_at__lt=before)
+
+
+def next_batch(before, after_id, size):
+    """Ids of the next ``size`` expired notifications after ``after_id``."""
+    return list(expired(before).filter(id__gt=after_id).order_by('id').values_list('id', flat=True)[:size])
+
+
+@transaction.atomic
+def archive(notification_ids, before, keep=True):
+    """
+    Move one batch of expired notifications to the archive, or only delete
+    them when ``keep`` is false. Returns the number removed from the hot table.
+    """
+    rows = list(expired(before).filter(id__in=notification_ids).values('id', *ARCHIVED_FIELDS))
+    if not rows:
+        return 0
+    if keep:
+        ArchivedNotification.objects.bulk_create([
+            ArchivedNotification(**{name: row[name] for name in ARCHIVED_FIELDS}) for row in rows
+        ])
+    deleted, _ = expired(before).filter(id__in=[row['id'] for row in rows]).delete()
+    return deleted
\ No newline at end of file
@@ -0,0 +1,10 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from skillexchange import badges
+from .models import Notification
+
+
+@receiver(post_save, sender=Notification)
+@receiver(post_delete, sender=Notification)
+def refresh_notification_badge(sender, instance, **kwargs):
+    badges.bump(f'notifications:{instance.user_id}')
\ No newline at end of file
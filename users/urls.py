@@ -7,7 +7,10 @@ urlpatterns = [
     path('', views.user_list, name='user_list'),
     path('<int:user_id>/', views.user_detail, name='user_detail'),
     path('notifications/', views.notifications, name='notifications'),
+    path('notifications/archive/', views.notification_archive, name='notification_archive'),
     path('notifications/<int:notification_id>/read/', views.mark_notification_read, name='mark_notification_read'),
     path('notifications/mark-all-read/', views.mark_all_notifications_read, name='mark_all_notifications_read'),
     path('notifications/unread-count/', views.get_unread_count, name='get_unread_count'),
+    path('notifications/stream/', views.notification_stream, name='notification_stream'),
+    path('notifications/poll/', views.notification_poll, name='notification_poll'),
 ] 
\ No newline at end of file
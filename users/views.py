@@ -1,25 +1,31 @@
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth import login, authenticate
 from django.contrib import messages
-from django.contrib.auth.models import User
+from django.db import connections
 from django.db.models import Q
 from django.core.paginator import Paginator
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
 from .forms import UserRegistrationForm, UserProfileForm, UserUpdateForm, UserSearchForm
-from .models import UserProfile, Notification
+from .models import ArchivedNotification, User, UserProfile, Notification
 from skills.models import SkillListing
-from swaps.models import SwapRequest
-from messaging.models import Conversation
+from swaps import inbox
+from swaps.matching import top_matches
+from messaging import announcements, pairs, summaries
+from skillexchange.page_cache import cache_anonymous_page
+from skillexchange.pagination import paginate
+from skillexchange import badges, push
 
 
+@cache_anonymous_page('catalog')
 def home(request):
     """Home page view."""
     if request.user.is_authenticated:
         return redirect('dashboard')
     
     # Show some featured skill listings for non-authenticated users
-    featured_skills = SkillListing.objects.filter(is_active=True).order_by('-created_at')[:6]
+    featured_skills = SkillListing.objects.filter(is_active=True).select_related('user', 'category').order_by('-created_at')[:6]
     
     context = {
         'featured_skills': featured_skills,
@@ -53,22 +59,28 @@ def dashboard(request):
     # Get user's skill listings
     user_skills = SkillListing.objects.filter(user=user).order_by('-created_at')[:5]
     
-    # Get recent swap requests
-    received_requests = SwapRequest.objects.filter(requested_user=user, status='pending').order_by('-created_at')[:5]
-    sent_requests = SwapRequest.objects.filter(requesting_user=user).order_by('-created_at')[:5]
+    # Get recent swap requests and per-status counts from the swap inbox
+    received_requests = inbox.swap_requests_for(user, 'received', 'pending')[:5]
+    sent_requests = inbox.swap_requests_for(user, 'sent')[:5]
+    swap_counts = inbox.counts(user)
     
-    # Get unread notifications
-    unread_notifications = Notification.objects.filter(user=user, is_read=False).order_by('-created_at')[:5]
+    # Get unread notifications, announcements included
+    unread_notifications = announcements.unread_feed(user, 5)
     
     # Get recent conversations
-    conversations = Conversation.objects.filter(participants=user).order_by('-updated_at')[:5]
+    conversations = summaries.inbox(user)[:5]
+    
+    # Get best reciprocal skill matches
+    skill_matches = top_matches(user, 5)
     
     context = {
         'user_skills': user_skills,
         'received_requests': received_requests,
         'sent_requests': sent_requests,
+        'swap_counts': swap_counts,
         'unread_notifications': unread_notifications,
         'conversations': conversations,
+        'skill_matches': skill_matches,
     }
     return render(request, 'users/dashboard.html', context)
 
@@ -95,9 +107,7 @@ def profile(request):
     skill_listings = SkillListing.objects.filter(user=user).order_by('-created_at')
     
     # Get user's swap history
-    swap_requests = SwapRequest.objects.filter(
-        Q(requesting_user=user) | Q(requested_user=user)
-    ).order_by('-created_at')
+    swap_requests = inbox.swap_requests_for(user)
     
     context = {
         'user_form': user_form,
@@ -161,7 +171,7 @@ def user_detail(request, user_id):
     skill_listings = SkillListing.objects.filter(user=user, is_active=True).order_by('-created_at')
     
     # Check if there's an existing conversation
-    existing_conversation = Conversation.objects.filter(participants=request.user).filter(participants=user).first()
+    existing_conversation = pairs.between(request.user, user)
     
     context = {
         'profile_user': user,
@@ -174,12 +184,11 @@ def user_detail(request, user_id):
 @login_required
 def notifications(request):
     """User notifications view."""
-    notifications = Notification.objects.filter(user=request.user).order_by('-created_at')
+    # Announcements are merged in at read time rather than copied to every user
+    notifications = announcements.NotificationFeed(request.user)
     
     # Pagination
-    paginator = Paginator(notifications, 20)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    page_obj = paginate(request, notifications, 20, allow_keyset=False)
     
     context = {
         'page_obj': page_obj,
@@ -187,6 +196,18 @@ def notifications(request):
     return render(request, 'users/notifications.html', context)
 
 
+@login_required
+def notification_archive(request):
+    """Read notifications moved out of the live table by the retention policy."""
+    archived = ArchivedNotification.objects.filter(user=request.user).order_by('-last_event_at', '-id')
+    page_obj = paginate(request, archived, 20, ordering=('-last_event_at', '-id'))
+    
+    context = {
+        'page_obj': page_obj,
+    }
+    return render(request, 'users/notification_archive.html', context)
+
+
 @login_required
 def mark_notification_read(request, notification_id):
     """Mark a notification as read."""
@@ -198,23 +219,66 @@ def mark_notification_read(request, notification_id):
         return JsonResponse({'status': 'success'})
     
     messages.success(request, 'Notification marked as read.')
-    return redirect('notifications')
+    return redirect('users:notifications')
 
 
 @login_required
 def mark_all_notifications_read(request):
     """Mark all notifications as read."""
-    Notification.objects.filter(user=request.user, is_read=False).update(is_read=True)
+    if Notification.objects.filter(user=request.user, is_read=False).update(is_read=True):
+        badges.bump(f'notifications:{request.user.id}')
+    announcements.mark_seen(request.user)
     
     if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
         return JsonResponse({'status': 'success'})
     
     messages.success(request, 'All notifications marked as read.')
-    return redirect('notifications')
+    return redirect('users:notifications')
 
 
 @login_required
+@badges.cached_count('notifications:{user_id}', 'announcements:{user_id}', 'announcements')
 def get_unread_count(request):
     """Get unread notification count for AJAX requests."""
     count = Notification.objects.filter(user=request.user, is_read=False).count()
-    return JsonResponse({'count': count}) 
\ No newline at end of file
+    count += announcements.unread_count(request.user)
+    return count 
+
+
+def _load_push_user_id(request):
+    user_id = request.user.id if request.user.is_authenticated else None
+    # A stream stays open for minutes; it must not hold a database connection all that time
+    connections.close_all()
+    return user_id
+
+
+async def _push_user_id(request):
+    """The signed-in user's id; reading the session touches the database, so it runs off the event loop."""
+    return await sync_to_async(_load_push_user_id)(request)
+
+
+def _last_event_id(request):
+    return (request.headers.get('Last-Event-ID') or request.GET.get('after') or '').strip() or None
+
+
+async def notification_stream(request):
+    """Push notification and message events as server-sent events (needs ASGI)."""
+    user_id = await _push_user_id(request)
+    if user_id is None:
+        return JsonResponse({'error': 'Authentication required.'}, status=401)
+    
+    response = StreamingHttpResponse(push.stream(user_id, _last_event_id(request)), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Stop reverse proxies from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+async def notification_poll(request):
+    """Long-poll fallback for clients without EventSource: waits for the next events after ``?after=``."""
+    user_id = await _push_user_id(request)
+    if user_id is None:
+        return JsonResponse({'error': 'Authentication required.'}, status=401)
+    
+    events = await push.wait(user_id, _last_event_id(request))
+    return JsonResponse({'events': events})
\ No newline at end of file